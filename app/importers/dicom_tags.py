@@ -0,0 +1,135 @@
+import os
+import json
+from typing import Dict, Any, Optional, List, Tuple
+
+# Value representations holding bulk binary data (pixels, overlays, waveforms)
+BINARY_VRS = frozenset({"OB", "OD", "OF", "OL", "OV", "OW", "UN"})
+
+# Keywords kept for a modality. "*" keeps every non-binary element. Modalities
+# without an entry use "default".
+DEFAULT_TAG_ALLOWLISTS: Dict[str, Any] = {
+    "default": "*"
+}
+
+# Nested sequences deeper than this are dropped (0 drops all sequences)
+DEFAULT_MAX_SEQUENCE_DEPTH = 1
+
+# Longer string values are dropped rather than stored
+DEFAULT_MAX_VALUE_LENGTH = 1024
+
+_MISSING = object()
+
+
+class DicomTagProjection:
+    """Selects which DICOM elements are stored as ``dicom_tags``.
+
+    Bulk binary elements (PixelData and friends) and, by default, private
+    tags are never stored. Per modality an allow-list of keywords can
+    restrict the projection further. The configuration can be loaded from a
+    JSON file named by ``UMDF_DICOM_TAGS_CONFIG``::
+
+        {
+            "modalities": {"default": "*", "CT": ["PatientID", "KVP", ...]},
+            "max_sequence_depth": 1,
+            "max_value_length": 1024,
+            "include_private": false
+        }
+    """
+
+    def __init__(
+        self,
+        allowlists: Optional[Dict[str, Any]] = None,
+        max_sequence_depth: int = DEFAULT_MAX_SEQUENCE_DEPTH,
+        max_value_length: int = DEFAULT_MAX_VALUE_LENGTH,
+        include_private: bool = False
+    ):
+        self.allowlists = {
+            modality.upper(): keywords if keywords == "*" else frozenset(keywords)
+            for modality, keywords in (allowlists or DEFAULT_TAG_ALLOWLISTS).items()
+        }
+        self.allowlists.setdefault("DEFAULT", "*")
+        self.max_sequence_depth = max_sequence_depth
+        self.max_value_length = max_value_length
+        self.include_private = include_private
+
+    @classmethod
+    def from_env(cls) -> "DicomTagProjection":
+        """Build a projection from ``UMDF_DICOM_TAGS_CONFIG``, or the defaults if unset."""
+        config_path = os.getenv("UMDF_DICOM_TAGS_CONFIG")
+        if not config_path:
+            return cls()
+
+        try:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read DICOM tag config {config_path}: {e}")
+            return cls()
+
+        return cls(
+            allowlists=config.get("modalities"),
+            max_sequence_depth=int(config.get("max_sequence_depth", DEFAULT_MAX_SEQUENCE_DEPTH)),
+            max_value_length=int(config.get("max_value_length", DEFAULT_MAX_VALUE_LENGTH)),
+            include_private=bool(config.get("include_private", False))
+        )
+
+    def allowlist_for(self, modality: Optional[str]):
+        return self.allowlists.get(str(modality or "").upper(), self.allowlists["DEFAULT"])
+
+    def project(self, ds) -> Dict[str, Any]:
+        """Return the projected tags of a dataset as {element name: value}."""
+        allowlist = self.allowlist_for(getattr(ds, 'Modality', None))
+        if allowlist == "*":
+            return self._project_elements(ds, 0)
+
+        # Look up only the requested keywords instead of walking the whole dataset
+        tags = {}
+        for keyword in allowlist:
+            elem = ds.data_element(keyword)
+            if elem is not None:
+                self._add_element(tags, elem, 0)
+        return tags
+
+    def _project_elements(self, ds, depth: int) -> Dict[str, Any]:
+        tags = {}
+        for elem in ds:
+            self._add_element(tags, elem, depth)
+        return tags
+
+    def _add_element(self, tags: Dict[str, Any], elem, depth: int) -> None:
+        if elem.VR in BINARY_VRS or (elem.tag.is_private and not self.include_private):
+            return
+        if not elem.name or not elem.value:
+            return
+
+        if elem.VR == "SQ":
+            if depth < self.max_sequence_depth:
+                tags[elem.name] = [self._project_elements(item, depth + 1) for item in elem.value]
+            return
+
+        value = str(elem.value)
+        if len(value) <= self.max_value_length:
+            tags[elem.name] = value
+
+
+def split_common_tags(tag_sets: List[Dict[str, Any]]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Split per-slice tags into tags shared by the whole series and per-slice differences.
+
+    Returns (common, differences) where common holds every tag present with
+    the same value on all slices and differences[i] holds the remaining tags
+    of slice i.
+    """
+    if not tag_sets:
+        return {}, []
+
+    first = tag_sets[0]
+    common_keys = [
+        key for key, value in first.items()
+        if all(tags.get(key, _MISSING) == value for tags in tag_sets[1:])
+    ]
+    common = {key: first[key] for key in common_keys}
+    differences = [
+        {key: value for key, value in tags.items() if key not in common}
+        for tags in tag_sets
+    ]
+    return common, differences
@@ -0,0 +1,288 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+from cpp_interface.umdf_interface import UMDFWriter, build_image_module_data
+
+# Same schema the /api/import-dicom endpoint writes image modules with
+DEFAULT_IMAGE_SCHEMA_PATH = './schemas/image/CT/v1.0.json'
+
+DICOM_EXTENSIONS = ('.dcm', '.dicom')
+
+
+def _series_signature(folder: str) -> Optional[Tuple[int, int, int]]:
+    """Summarise the DICOM files directly in folder as (count, total size, newest mtime).
+
+    Returns None when the folder holds no DICOM files. A single scandir pass
+    is enough - the stat results are usually served from the directory entry.
+    """
+    count = 0
+    total_size = 0
+    newest_mtime = 0
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.is_file() or not entry.name.lower().endswith(DICOM_EXTENSIONS):
+                    continue
+                stat = entry.stat()
+                count += 1
+                total_size += stat.st_size
+                newest_mtime = max(newest_mtime, stat.st_mtime_ns)
+    except OSError:
+        return None
+    return (count, total_size, newest_mtime) if count else None
+
+
+class DicomWatchService:
+    """Background ingest of DICOM series dropped into watched directories.
+
+    Every folder (at any depth) below a watched directory that directly
+    contains DICOM files is treated as one series. Folders are polled; a
+    series is considered complete once its file count, total size and newest
+    mtime have not changed for ``settle_seconds``. Complete series are
+    converted in a bounded thread pool and written to ``target_file`` in
+    one writer session per batch, each batch in a new encounter (or in
+    ``encounter_id`` when configured).
+
+    What has been processed is recorded in a JSON ledger next to the target
+    file, keyed by series folder and signature, so restarts do not re-import
+    series and a folder that changes afterwards is imported again.
+    """
+
+    def __init__(
+        self,
+        watch_dirs: List[str],
+        target_file: str,
+        converter_factory: Callable[[], Any],
+        author: str = "dicom_ingest",
+        password: str = "",
+        encounter_id: Optional[str] = None,
+        schema_path: str = DEFAULT_IMAGE_SCHEMA_PATH,
+        poll_interval: float = 5.0,
+        settle_seconds: float = 30.0,
+        max_workers: int = 2,
+        max_batch_size: int = 16,
+        state_path: Optional[str] = None
+    ):
+        self.watch_dirs = [os.path.abspath(d) for d in watch_dirs]
+        self.target_file = target_file
+        self.converter_factory = converter_factory
+        self.author = author
+        self.password = password
+        self.encounter_id = encounter_id
+        self.schema_path = schema_path
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.max_workers = max(1, max_workers)
+        self.max_batch_size = max(1, max_batch_size)
+        self.state_path = state_path or f"{target_file}.ingest.json"
+
+        # folder -> (signature, monotonic time the signature was first seen)
+        self._pending: Dict[str, Tuple[Tuple[int, int, int], float]] = {}
+        self._ledger = self._load_ledger()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def from_env(cls, converter_factory: Callable[[], Any]) -> Optional["DicomWatchService"]:
+        """Build a service from UMDF_WATCH_* environment variables, or None if not configured."""
+        watch_dirs = [d for d in os.getenv("UMDF_WATCH_DIRS", "").split(os.pathsep) if d]
+        target_file = os.getenv("UMDF_WATCH_TARGET")
+        if not watch_dirs or not target_file:
+            return None
+
+        return cls(
+            watch_dirs=watch_dirs,
+            target_file=target_file,
+            converter_factory=converter_factory,
+            author=os.getenv("UMDF_WATCH_AUTHOR", "dicom_ingest"),
+            password=os.getenv("UMDF_WATCH_PASSWORD", ""),
+            encounter_id=os.getenv("UMDF_WATCH_ENCOUNTER_ID") or None,
+            schema_path=os.getenv("UMDF_WATCH_SCHEMA_PATH", DEFAULT_IMAGE_SCHEMA_PATH),
+            poll_interval=float(os.getenv("UMDF_WATCH_INTERVAL", "5")),
+            settle_seconds=float(os.getenv("UMDF_WATCH_SETTLE", "30")),
+            max_workers=int(os.getenv("UMDF_WATCH_WORKERS", "2")),
+            max_batch_size=int(os.getenv("UMDF_WATCH_BATCH_SIZE", "16"))
+        )
+
+    def start(self) -> None:
+        """Start polling in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="dicom-watch", daemon=True)
+        self._thread.start()
+        print(f"=== DEBUG: DICOM watch service started for {self.watch_dirs} -> {self.target_file} ===")
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop polling; an in-flight batch is allowed to finish."""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                ready = self.scan_once()
+                if ready:
+                    self.import_series(ready)
+            except Exception as e:
+                print(f"Warning: DICOM watch cycle failed: {e}")
+            self._stop_event.wait(self.poll_interval)
+
+    def _load_ledger(self) -> Dict[str, Any]:
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: Could not read ingest ledger {self.state_path}: {e}")
+        return {"series": {}}
+
+    def _save_ledger(self) -> None:
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._ledger, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _is_processed(self, folder: str, signature: Tuple[int, int, int]) -> bool:
+        entry = self._ledger["series"].get(folder)
+        return bool(entry) and tuple(entry.get("signature", ())) == signature
+
+    def _candidate_folders(self) -> List[str]:
+        folders = []
+        for watch_dir in self.watch_dirs:
+            if not os.path.isdir(watch_dir):
+                continue
+            for dirpath, _, filenames in os.walk(watch_dir):
+                if any(name.lower().endswith(DICOM_EXTENSIONS) for name in filenames):
+                    folders.append(dirpath)
+        return folders
+
+    def scan_once(self) -> List[str]:
+        """Poll the watched directories once and return series folders that have settled."""
+        now = time.monotonic()
+        ready = []
+        seen = set()
+
+        for folder in self._candidate_folders():
+            seen.add(folder)
+            signature = _series_signature(folder)
+            if signature is None or self._is_processed(folder, signature):
+                self._pending.pop(folder, None)
+                continue
+
+            pending = self._pending.get(folder)
+            if pending is None or pending[0] != signature:
+                # New or still changing - restart the debounce timer
+                self._pending[folder] = (signature, now)
+            elif now - pending[1] >= self.settle_seconds:
+                ready.append(folder)
+
+        # Forget folders that disappeared before settling
+        for folder in list(self._pending):
+            if folder not in seen:
+                del self._pending[folder]
+
+        return sorted(ready)[:self.max_batch_size]
+
+    def _convert(self, folder: str) -> List[Dict[str, Any]]:
+        """Convert one folder to the converter's series list (runs in the worker pool)."""
+        converter = self.converter_factory()
+        umdf_data = converter.convert_folder(folder)
+        if not isinstance(umdf_data, dict) or not umdf_data.get('series'):
+            raise ValueError("Invalid DICOM conversion output structure")
+        return umdf_data['series']
+
+    def _open_writer(self) -> UMDFWriter:
+        writer = UMDFWriter()
+        if os.path.exists(self.target_file):
+            opened = writer.open_file(self.target_file, self.author, self.password)
+        else:
+            opened = writer.create_new_file(self.target_file, self.author, self.password)
+        if not opened:
+            raise RuntimeError(f"Could not open ingest target {self.target_file}")
+        return writer
+
+    def _write_series(self, writer, encounter_uuid, encounter_id: str, folder: str, signature, future) -> Dict[str, Any]:
+        """Write the converted series of one folder and describe the outcome for the ledger."""
+        outcome = {
+            "signature": list(signature or ()),
+            "processed_at": datetime.now().isoformat(),
+            "encounter_id": encounter_id
+        }
+        try:
+            module_ids = []
+            for series in future.result():
+                frames = series.get('data', {}).get('frames', [])
+                if not frames:
+                    continue
+                module_data = build_image_module_data(series.get('metadata', {}), frames)
+                result = writer.writer.addModuleToEncounter(encounter_uuid, self.schema_path, module_data)
+                if not result.has_value():
+                    raise RuntimeError(result.error())
+                module_ids.append(result.value().toString())
+            if not module_ids:
+                raise ValueError("No frames found in converted DICOM data")
+            outcome.update({"status": "imported", "module_ids": module_ids})
+            print(f"=== DEBUG: Ingested {folder} as {module_ids} ===")
+        except Exception as e:
+            # Failed series are recorded too, so they are only retried once their files change
+            outcome.update({"status": "failed", "error": str(e)})
+            print(f"Warning: Failed to ingest {folder}: {e}")
+        return outcome
+
+    def import_series(self, folders: List[str]) -> Dict[str, Any]:
+        """Convert the given series folders and write them to the target file in one session.
+
+        Conversion runs with at most ``max_workers`` folders in flight; writing
+        is done sequentially on this thread because the writer is not
+        thread-safe. Returns the per-folder outcome that was recorded in the
+        ledger, or an empty dict if the batch could not be committed.
+        """
+        signatures = {folder: _series_signature(folder) for folder in folders}
+        outcomes = {}
+
+        import umdf
+
+        writer = self._open_writer()
+        try:
+            encounter_id = self.encounter_id or writer.create_new_encounter()
+            if not encounter_id:
+                raise RuntimeError("Could not create encounter for ingest batch")
+            encounter_uuid = umdf.UUID.fromString(encounter_id)
+
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dicom-convert") as pool:
+                # Keep at most max_workers conversions queued ahead of the writer so
+                # finished-but-unwritten series do not pile up in memory
+                in_flight = deque()
+                remaining = iter(folders)
+                for folder in islice(remaining, self.max_workers):
+                    in_flight.append((folder, pool.submit(self._convert, folder)))
+
+                while in_flight:
+                    folder, future = in_flight.popleft()
+                    next_folder = next(remaining, None)
+                    if next_folder is not None:
+                        in_flight.append((next_folder, pool.submit(self._convert, next_folder)))
+                    outcomes[folder] = self._write_series(writer, encounter_uuid, encounter_id, folder, signatures[folder], future)
+        finally:
+            closed = writer.close_file()
+
+        if not closed:
+            # Nothing in this batch was made durable - let the next poll retry it
+            print(f"Warning: Failed to close ingest target {self.target_file}")
+            return {}
+
+        self._ledger["series"].update(outcomes)
+        self._save_ledger()
+        for folder in folders:
+            self._pending.pop(folder, None)
+        return outcomes
@@ -1,7 +1,12 @@
 import json
 import base64
 import io
-from typing import Dict, Any, Optional, List
+import os
+import asyncio
+import inspect
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, List, Callable, Tuple
 from pathlib import Path
 import pydicom
 from PIL import Image
@@ -9,12 +14,102 @@ from ..models.medical_file import Module
 from ..schemas.schema_manager import SchemaManager
 import numpy as np
 from .umdf_importer import UMDFImporter
+from .preview_encoder import PreviewEncoder
+from .dicom_tags import DicomTagProjection, split_common_tags
+from .tiled_image import open_image, needs_tiling, preview_image, pyramid_layout
+
+# Map FHIR resource types to schemas
+FHIR_SCHEMA_MAPPING = {
+    "Patient": "patient",
+    "Observation": "lab_results",
+    "MedicationRequest": "medication",
+    "ImagingStudy": "imaging"
+}
+
+# Schema files that tabular modules for each schema are written with
+FHIR_SCHEMA_PATHS = {
+    "patient": "./schemas/patient/v1.0.json",
+    "lab_results": "./schemas/lab_results/v1.0.json",
+    "medication": "./schemas/medication/v1.0.json",
+    "imaging": "./schemas/image/v1.0.json"
+}
+
+# Bundles with fewer entries than this are converted inline - a process pool
+# costs more to start than converting a few hundred resources
+BUNDLE_PARALLEL_THRESHOLD = 500
+BUNDLE_BATCH_SIZE = 500
+
+# Converter used by FHIR worker processes, created once per process
+_worker_importer = None
+
+
+def _init_fhir_worker():
+    global _worker_importer
+    _worker_importer = FileImporter()
+
+
+def _convert_fhir_resources(resources: List[Any], schema_id: Optional[str]) -> Tuple[List[Tuple[str, str, Dict[str, Any]]], int]:
+    """Convert a batch of FHIR resources in a worker process.
+    
+    Resources may be dicts or raw NDJSON lines (bytes/str), which are parsed here.
+    Returns (rows, error_count) where each row is (resource_type, schema_id, converted_data).
+    Resources that fail to parse or convert are counted and skipped.
+    """
+    importer = _worker_importer or FileImporter()
+    rows = []
+    errors = 0
+    for resource in resources:
+        try:
+            if not isinstance(resource, dict):
+                resource = json.loads(resource)
+            resource_type = resource.get("resourceType", "Unknown")
+            target_schema_id = schema_id or FHIR_SCHEMA_MAPPING.get(resource_type, "patient")
+            rows.append((resource_type, target_schema_id, importer._convert_fhir_to_schema(resource, target_schema_id)))
+        except Exception:
+            errors += 1
+    return rows, errors
+
+
+def _build_fhir_tabular_module(
+    filename: str,
+    resource_type: str,
+    schema_id: str,
+    rows: List[Dict[str, Any]],
+    source: str,
+    part: Optional[int] = None
+) -> Dict[str, Any]:
+    """Build one tabular module holding the converted rows of a resource type."""
+    suffix = f"_part{part}" if part is not None else ""
+    metadata = {
+        "source": source,
+        "resource_type": resource_type,
+        "original_filename": filename,
+        "schema_path": FHIR_SCHEMA_PATHS.get(schema_id)
+    }
+    if part is not None:
+        metadata["part"] = part
+    
+    module = Module(
+        id=f"{filename}:{resource_type}" + (f":{part}" if part is not None else ""),
+        name=f"FHIR_{resource_type}_{filename}{suffix}",
+        schema_id=schema_id,
+        data={
+            "type": "tabular",
+            "record_count": len(rows),
+            "rows": rows
+        },
+        metadata=metadata
+    )
+    return module.dict()
+
 
 class FileImporter:
     """Handles importing various file formats into the medical file format."""
     
-    def __init__(self):
+    def __init__(self, preview_encoder: Optional[PreviewEncoder] = None):
         self.schema_manager = SchemaManager()
+        self.preview_encoder = preview_encoder or PreviewEncoder()
+        self.tag_projection = DicomTagProjection.from_env()
     
     async def import_file(
         self, 
@@ -65,16 +160,33 @@ class FileImporter:
             # Sort files by instance number for proper ordering
             dicom_files.sort(key=lambda x: x[1].get('InstanceNumber', 0))
             
+            # Tags shared by every slice are stored once on the volume, each
+            # slice keeps only the tags that differ
+            common_tags, slice_tags = split_common_tags([self._extract_dicom_tags(ds) for _, ds in dicom_files])
+            
             # Extract volume metadata from first file
             first_ds = dicom_files[0][1]
-            volume_metadata = self._extract_volume_metadata(first_ds, len(dicom_files))
+            volume_metadata = self._extract_volume_metadata(first_ds, len(dicom_files), common_tags)
+            
+            # Window the whole series at once so every slice gets the same contrast
+            windowed_volume, window_center, window_width = self._window_volume([ds for _, ds in dicom_files])
+            if windowed_volume is not None:
+                volume_metadata["windowCenter"] = window_center
+                volume_metadata["windowWidth"] = window_width
             
             # Process all slices
             slices_data = []
-            for file_path, ds in dicom_files:
-                slice_data = self._extract_slice_data(ds, file_path.name)
+            for (file_path, ds), tags in zip(dicom_files, slice_tags):
+                slice_data = self._extract_slice_data(ds, file_path.name, encode_image=windowed_volume is None, dicom_tags=tags)
                 slices_data.append(slice_data)
             
+            # Encode the windowed slices (views into the volume) in parallel, in slice order
+            if windowed_volume is not None:
+                encoded_slices = await self.preview_encoder.encode_many_async(windowed_volume)
+                for slice_data, image_data in zip(slices_data, encoded_slices):
+                    slice_data["imageData"] = image_data
+                    slice_data["imageFormat"] = self.preview_encoder.format
+            
             # Create 3D volume module
             module = Module(
                 name=f"DICOM_Volume_{folder.name}",
@@ -105,8 +217,12 @@ class FileImporter:
         except Exception as e:
             raise ValueError(f"Error processing DICOM folder: {e}")
     
-    def _extract_volume_metadata(self, ds, num_slices: int) -> Dict[str, Any]:
-        """Extract metadata for the entire 3D volume."""
+    def _extract_volume_metadata(self, ds, num_slices: int, dicom_tags: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Extract metadata for the entire 3D volume.
+        
+        dicom_tags are the tags common to the series; without them the tags
+        of ds are used.
+        """
         return {
             "modality": str(ds.Modality) if hasattr(ds, 'Modality') else "Unknown",
             "bodyPart": str(ds.BodyPartExamined) if hasattr(ds, 'BodyPartExamined') else "",
@@ -125,73 +241,101 @@ class FileImporter:
             "seriesInstanceUID": str(ds.SeriesInstanceUID) if hasattr(ds, 'SeriesInstanceUID') else "",
             "sliceThickness": ds.SliceThickness if hasattr(ds, 'SliceThickness') else 0,
             "pixelSpacing": list(ds.PixelSpacing) if hasattr(ds, 'PixelSpacing') else [1, 1],
-            "dicom_tags": self._extract_dicom_tags(ds)
+            "dicom_tags": dicom_tags if dicom_tags is not None else self._extract_dicom_tags(ds)
         }
     
-    def _extract_slice_data(self, ds, filename: str) -> Dict[str, Any]:
-        """Extract data for a single slice."""
+    def _window_volume(self, datasets: List[Any]) -> Tuple[Optional[np.ndarray], Optional[float], Optional[float]]:
+        """Stack the slices of a series and apply one window/level to the whole volume.
+        
+        Returns (uint8 volume, window center, window width), or (None, None, None)
+        when the slices have no pixel data or differ in shape - callers then
+        fall back to windowing each slice on its own.
+        """
+        try:
+            arrays = [ds.pixel_array for ds in datasets if hasattr(ds, 'PixelData')]
+            if not arrays or len(arrays) != len(datasets) or len({a.shape for a in arrays}) != 1:
+                return None, None, None
+            volume = np.stack(arrays)
+        except Exception as e:
+            print(f"Warning: Could not build volume for windowing: {e}")
+            return None, None, None
+        
+        window_center, window_width = self._compute_window(volume)
+        print(f"DICOM volume window settings: Center={window_center:.1f}, Width={window_width:.1f}")
+        return self._apply_window(volume, window_center, window_width), window_center, window_width
+    
+    def _compute_window(self, pixel_array: np.ndarray) -> Tuple[float, float]:
+        """Pick a window center/width for a slice or volume.
+        
+        CT-like data (HU range) gets a window spanning the 5th-95th percentile,
+        anything else a soft tissue window.
+        """
+        pixel_min = pixel_array.min()
+        pixel_max = pixel_array.max()
+        
+        # Check if this looks like CT data (HU range)
+        if pixel_min < -500 and pixel_max > 500:
+            # Both percentiles from one O(n) selection instead of a full sort
+            flat = pixel_array.ravel()
+            k5 = int(0.05 * flat.size)
+            k95 = int(0.95 * flat.size)
+            partitioned = np.partition(flat, (k5, k95))
+            p5 = float(partitioned[k5])
+            p95 = float(partitioned[k95])
+            
+            # Use percentile-based window for better contrast, with a minimum width
+            window_center = (p5 + p95) / 2
+            window_width = max(p95 - p5, 100)
+        else:
+            # Non-CT data or unusual range - use soft tissue window
+            window_center = 40
+            window_width = 350
+        
+        return float(window_center), float(window_width)
+    
+    def _apply_window(self, pixel_array: np.ndarray, window_center: float, window_width: float) -> np.ndarray:
+        """Map pixel values through a window to 0-255 in one vectorized pass."""
+        min_val = window_center - window_width / 2
+        max_val = window_center + window_width / 2
+        
+        # Single float32 working buffer, updated in place
+        scaled = np.clip(pixel_array, min_val, max_val, dtype=np.float32)
+        scaled -= min_val
+        scaled *= 255.0 / (max_val - min_val)
+        return scaled.astype(np.uint8)
+    
+    def _extract_slice_data(
+        self,
+        ds,
+        filename: str,
+        encode_image: bool = True,
+        dicom_tags: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """Extract data for a single slice.
+        
+        With encode_image the slice is windowed on its own and its preview
+        encoded; folder imports window and encode the whole volume instead.
+        Folder imports also pass only the slice's tags that differ from the
+        series as dicom_tags.
+        """
         slice_data = {
             "instanceNumber": ds.InstanceNumber if hasattr(ds, 'InstanceNumber') else 0,
             "sliceLocation": ds.SliceLocation if hasattr(ds, 'SliceLocation') else 0,
             "imagePosition": list(ds.ImagePositionPatient) if hasattr(ds, 'ImagePositionPatient') else [0, 0, 0],
             "imageOrientation": list(ds.ImageOrientationPatient) if hasattr(ds, 'ImageOrientationPatient') else [1, 0, 0, 0, 1, 0],
             "filename": filename,
-            "dicom_tags": self._extract_dicom_tags(ds)
+            "dicom_tags": dicom_tags if dicom_tags is not None else self._extract_dicom_tags(ds)
         }
         
         # Convert pixel data to base64 if available
-        if hasattr(ds, 'pixel_array'):
+        if encode_image and hasattr(ds, 'pixel_array'):
             try:
-                # Get pixel data
                 pixel_array = ds.pixel_array
-                
-                # Adaptive window/level detection
-                pixel_min = pixel_array.min()
-                pixel_max = pixel_array.max()
-                
-                # Check if this looks like CT data (HU range)
-                if pixel_min < -500 and pixel_max > 500:
-                    # CT data - use adaptive window
-                    # Find the 5th and 95th percentiles for better contrast
-                    sorted_pixels = np.sort(pixel_array.flatten())
-                    p5 = sorted_pixels[int(0.05 * len(sorted_pixels))]
-                    p95 = sorted_pixels[int(0.95 * len(sorted_pixels))]
-                    
-                    # Use percentile-based window for better contrast
-                    window_center = (p5 + p95) / 2
-                    window_width = p95 - p5
-                    
-                    # Ensure minimum window width
-                    if window_width < 100:
-                        window_width = 100
-                else:
-                    # Non-CT data or unusual range - use soft tissue window
-                    window_center = 40
-                    window_width = 350
-                
-                # Debug: Print window settings
+                window_center, window_width = self._compute_window(pixel_array)
                 print(f"DICOM window settings: Center={window_center:.1f}, Width={window_width:.1f}")
-                print(f"Pixel range: {pixel_min:.1f} to {pixel_max:.1f}")
                 
-                # Calculate window/level
-                min_val = window_center - window_width / 2
-                max_val = window_center + window_width / 2
-                
-                # Clip values to window
-                pixel_array = np.clip(pixel_array, min_val, max_val)
-                
-                # Normalize to 0-255
-                pixel_array = ((pixel_array - min_val) / (max_val - min_val) * 255).astype(np.uint8)
-                
-                # Convert to PIL Image
-                img = Image.fromarray(pixel_array, mode='L')  # 'L' for grayscale
-                
-                # Convert to PNG and then to base64
-                img_buffer = io.BytesIO()
-                img.save(img_buffer, format='PNG')
-                img_buffer.seek(0)
-                image_data = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
-                slice_data["imageData"] = image_data
+                slice_data["imageData"] = self.preview_encoder.encode(self._apply_window(pixel_array, window_center, window_width))
+                slice_data["imageFormat"] = self.preview_encoder.format
                 
             except Exception as e:
                 print(f"Warning: Could not process pixel data: {e}")
@@ -208,16 +352,11 @@ class FileImporter:
             # Determine resource type
             resource_type = fhir_data.get("resourceType", "Unknown")
             
-            # Map FHIR resource types to schemas
-            schema_mapping = {
-                "Patient": "patient",
-                "Observation": "lab_results",
-                "MedicationRequest": "medication",
-                "ImagingStudy": "imaging"
-            }
+            if resource_type == "Bundle":
+                return await self._import_fhir_bundle(fhir_data, filename, schema_id)
             
             # Use provided schema_id or map from FHIR resource type
-            target_schema_id = schema_id or schema_mapping.get(resource_type, "patient")
+            target_schema_id = schema_id or FHIR_SCHEMA_MAPPING.get(resource_type, "patient")
             
             # Convert FHIR data to our format
             converted_data = self._convert_fhir_to_schema(fhir_data, target_schema_id)
@@ -234,8 +373,10 @@ class FileImporter:
                 }
             )
             
+            # Same shape as a Bundle import, which yields several modules
             return {
-                "module": module.dict(),
+                "modules": [module.dict()],
+                "module_count": 1,
                 "schema_id": target_schema_id,
                 "resource_type": resource_type
             }
@@ -243,6 +384,151 @@ class FileImporter:
         except json.JSONDecodeError as e:
             raise ValueError(f"Invalid JSON in FHIR file: {e}")
     
+    async def _import_fhir_bundle(self, bundle: Dict[str, Any], filename: str, schema_id: Optional[str]) -> Dict[str, Any]:
+        """Import a FHIR Bundle as one tabular module per contained resource type.
+        
+        Entries (including those of nested Bundles) are converted in worker
+        processes in batches when the Bundle is large, then grouped so e.g. all
+        Observations become rows of a single lab_results module.
+        """
+        resources = list(self._iter_bundle_resources(bundle))
+        
+        if len(resources) < BUNDLE_PARALLEL_THRESHOLD:
+            results = [_convert_fhir_resources(resources, schema_id)]
+        else:
+            loop = asyncio.get_running_loop()
+            batches = [resources[i:i + BUNDLE_BATCH_SIZE] for i in range(0, len(resources), BUNDLE_BATCH_SIZE)]
+            with ProcessPoolExecutor(initializer=_init_fhir_worker) as pool:
+                results = await asyncio.gather(*[
+                    loop.run_in_executor(pool, _convert_fhir_resources, batch, schema_id)
+                    for batch in batches
+                ])
+        
+        # Group rows per resource type, keeping Bundle order within each group
+        grouped: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        errors = 0
+        for rows, batch_errors in results:
+            errors += batch_errors
+            for resource_type, target_schema_id, row in rows:
+                grouped.setdefault((resource_type, target_schema_id), []).append(row)
+        
+        modules = [
+            _build_fhir_tabular_module(filename, resource_type, target_schema_id, rows, "fhir_bundle")
+            for (resource_type, target_schema_id), rows in grouped.items()
+        ]
+        
+        print(f"=== DEBUG: FHIR Bundle {filename}: {len(resources)} entries -> {len(modules)} modules, {errors} errors ===")
+        
+        return {
+            "modules": modules,
+            "module_count": len(modules),
+            "resource_type": "Bundle",
+            "bundle_type": bundle.get("type", "unknown"),
+            "entry_count": len(resources),
+            "errors": errors,
+            "resource_counts": {resource_type: len(rows) for (resource_type, _), rows in grouped.items()}
+        }
+    
+    def _iter_bundle_resources(self, bundle: Dict[str, Any]):
+        """Yield the resources of a Bundle, flattening nested Bundles."""
+        for entry in bundle.get("entry", []) or []:
+            resource = entry.get("resource") if isinstance(entry, dict) else None
+            if not isinstance(resource, dict):
+                continue
+            if resource.get("resourceType") == "Bundle":
+                yield from self._iter_bundle_resources(resource)
+            else:
+                yield resource
+    
+    async def import_fhir_ndjson(
+        self,
+        file_path: str,
+        schema_id: Optional[str] = None,
+        module_sink: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        rows_per_module: int = 10000,
+        lines_per_batch: int = 1000,
+        max_workers: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Stream a FHIR Bulk Data NDJSON export into tabular modules.
+        
+        The file is read line by line and batches of lines are converted with
+        _convert_fhir_to_schema in worker processes. Rows are grouped per
+        resource type and handed to module_sink as one tabular module every
+        rows_per_module rows (plus a final partial module per type), so memory
+        is bounded by the number of resource types, not the export size.
+        The sink may be a coroutine function, in which case each module is
+        awaited before reading continues. Without a sink the modules are
+        collected and returned instead.
+        """
+        filename = os.path.basename(file_path)
+        max_workers = max_workers or os.cpu_count() or 1
+        collected = [] if module_sink is None else None
+        sink = module_sink or collected.append
+        
+        buffers: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        part_numbers: Dict[Tuple[str, str], int] = {}
+        counts: Dict[str, int] = {}
+        summary = {"lines": 0, "errors": 0, "modules_written": 0}
+        
+        async def flush(key: Tuple[str, str]) -> None:
+            rows = buffers.pop(key, None)
+            if not rows:
+                return
+            resource_type, target_schema_id = key
+            part_numbers[key] = part_numbers.get(key, 0) + 1
+            module = _build_fhir_tabular_module(filename, resource_type, target_schema_id, rows, "fhir_ndjson", part_numbers[key])
+            written = sink(module)
+            if inspect.isawaitable(written):
+                await written
+            summary["modules_written"] += 1
+        
+        async def collect(result: Tuple[List[Tuple[str, str, Dict[str, Any]]], int]) -> None:
+            rows, errors = result
+            summary["errors"] += errors
+            for resource_type, target_schema_id, row in rows:
+                key = (resource_type, target_schema_id)
+                buffers.setdefault(key, []).append(row)
+                counts[resource_type] = counts.get(resource_type, 0) + 1
+                if len(buffers[key]) >= rows_per_module:
+                    await flush(key)
+        
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_fhir_worker) as pool:
+            # Bound the batches in flight so reading never runs far ahead of conversion
+            in_flight = deque()
+            batch = []
+            with open(file_path, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    summary["lines"] += 1
+                    batch.append(line)
+                    if len(batch) >= lines_per_batch:
+                        in_flight.append(loop.run_in_executor(pool, _convert_fhir_resources, batch, schema_id))
+                        batch = []
+                        if len(in_flight) >= max_workers * 2:
+                            await collect(await in_flight.popleft())
+                if batch:
+                    in_flight.append(loop.run_in_executor(pool, _convert_fhir_resources, batch, schema_id))
+            
+            # Results are consumed in submission order, so rows keep file order
+            while in_flight:
+                await collect(await in_flight.popleft())
+        
+        for key in list(buffers):
+            await flush(key)
+        
+        print(f"=== DEBUG: NDJSON import of {filename}: {summary['lines']} lines, {summary['errors']} errors, {summary['modules_written']} modules ===")
+        
+        result = {
+            "file_path": filename,
+            "resource_counts": counts,
+            **summary
+        }
+        if collected is not None:
+            result["modules"] = collected
+        return result
+    
     async def _import_dicom(self, content: bytes, filename: str, schema_id: Optional[str]) -> Dict[str, Any]:
         """Import DICOM file."""
         try:
@@ -291,52 +577,12 @@ class FileImporter:
                     pixel_array = ds.pixel_array
                     
                     # Adaptive window/level detection
-                    pixel_min = pixel_array.min()
-                    pixel_max = pixel_array.max()
-                    
-                    # Check if this looks like CT data (HU range)
-                    if pixel_min < -500 and pixel_max > 500:
-                        # CT data - use adaptive window
-                        # Find the 5th and 95th percentiles for better contrast
-                        sorted_pixels = np.sort(pixel_array.flatten())
-                        p5 = sorted_pixels[int(0.05 * len(sorted_pixels))]
-                        p95 = sorted_pixels[int(0.95 * len(sorted_pixels))]
-                        
-                        # Use percentile-based window for better contrast
-                        window_center = (p5 + p95) / 2
-                        window_width = p95 - p5
-                        
-                        # Ensure minimum window width
-                        if window_width < 100:
-                            window_width = 100
-                    else:
-                        # Non-CT data or unusual range - use soft tissue window
-                        window_center = 40
-                        window_width = 350
-                    
-                    # Debug: Print window settings
+                    window_center, window_width = self._compute_window(pixel_array)
                     print(f"DICOM window settings: Center={window_center:.1f}, Width={window_width:.1f}")
-                    print(f"Pixel range: {pixel_min:.1f} to {pixel_max:.1f}")
-                    
-                    # Calculate window/level
-                    min_val = window_center - window_width / 2
-                    max_val = window_center + window_width / 2
                     
-                    # Clip values to window
-                    pixel_array = np.clip(pixel_array, min_val, max_val)
-                    
-                    # Normalize to 0-255
-                    pixel_array = ((pixel_array - min_val) / (max_val - min_val) * 255).astype(np.uint8)
-                    
-                    # Convert to PIL Image
-                    img = Image.fromarray(pixel_array, mode='L')  # 'L' for grayscale
-                    
-                    # Convert to PNG and then to base64
-                    img_buffer = io.BytesIO()
-                    img.save(img_buffer, format='PNG')
-                    img_buffer.seek(0)
-                    image_data = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
-                    dicom_data["imageData"] = image_data
+                    windowed = self._apply_window(pixel_array, window_center, window_width)
+                    dicom_data["imageData"] = await self.preview_encoder.encode_async(windowed)
+                    dicom_data["imageFormat"] = self.preview_encoder.format
                     
                 except Exception as e:
                     print(f"Warning: Could not process pixel data: {e}")
@@ -376,28 +622,35 @@ class FileImporter:
         """Import image file (JPEG, PNG, etc.)."""
         try:
             # Open image
-            image = Image.open(io.BytesIO(content))
+            image = open_image(io.BytesIO(content))
+            image_format, image_size, image_mode = image.format, image.size, image.mode
+            
+            # Very large images only get a downscaled preview here; the full
+            # resolution is imported as a tile pyramid (/api/import/tiled-image)
+            tiled = needs_tiling(image)
+            preview = preview_image(image) if tiled else image
             
-            # Convert to base64
-            img_buffer = io.BytesIO()
-            image.save(img_buffer, format='PNG')
-            img_buffer.seek(0)
-            image_data = base64.b64encode(img_buffer.getvalue()).decode('utf-8')
+            # Convert to base64 on the encoder pool
+            image_data = await self.preview_encoder.encode_async(preview)
             
             # Extract image metadata
             image_info = {
                 "modality": "Image",
                 "bodyPart": "Unknown",
                 "imageData": image_data,
+                "imageFormat": self.preview_encoder.format,
                 "metadata": {
-                    "format": image.format,
-                    "size": image.size,
-                    "mode": image.mode,
+                    "format": image_format,
+                    "size": image_size,
+                    "mode": image_mode,
                     "acquisitionDate": "",  # Would need to be provided separately
                     "institution": "",
                     "technician": ""
                 }
             }
+            if tiled:
+                image_info["previewSize"] = preview.size
+                image_info["pyramid"] = pyramid_layout(*image_size)
             
             # Use imaging schema by default
             target_schema_id = schema_id or "imaging"
@@ -529,12 +782,8 @@ class FileImporter:
         return ""
     
     def _extract_dicom_tags(self, ds) -> Dict[str, Any]:
-        """Extract relevant DICOM tags."""
-        tags = {}
-        for elem in ds:
-            if elem.name and elem.value:
-                tags[elem.name] = str(elem.value)
-        return tags
+        """Extract relevant DICOM tags (see DicomTagProjection)."""
+        return self.tag_projection.project(ds)
     
     async def _import_umdf(self, content: bytes, filename: str, schema_id: Optional[str]) -> Dict[str, Any]:
         """Import a UMDF file and convert it to modules."""
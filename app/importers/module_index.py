@@ -0,0 +1,113 @@
+import os
+import json
+import hashlib
+from typing import Dict, Any, Optional
+
+# Bump when the layout of the index file changes; older files are ignored
+INDEX_VERSION = 2
+
+# Bytes at the start of a file hashed into the cache key (the header and
+# the start of the module table)
+HEADER_HASH_BYTES = 64 * 1024
+
+# PBKDF2 iterations for the stored password check
+PASSWORD_CHECK_ITERATIONS = 100_000
+
+
+def header_hash(file_path: str, length: int = HEADER_HASH_BYTES) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read(length)).hexdigest()
+
+
+def _password_check(password: str, salt: bytes) -> str:
+    return hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, PASSWORD_CHECK_ITERATIONS).hex()
+
+
+class ModuleIndexCache:
+    """Sidecar cache of the module listing of UMDF files.
+
+    Holds what opening a file builds from ``getFileInfo()`` - the module
+    list with schema titles, module graph, encounters and the module
+    directory - so reopening an unchanged file can show
+    it without the C++ reader. Entries are keyed by path, size, mtime and a
+    hash of the file header; any change to the file misses the cache.
+
+    The index is written next to the file as ``<file>.index.json``, or in
+    ``index_dir`` when given. It holds a salted PBKDF2 hash of the password
+    the file was opened with, and is only served for the same password.
+    """
+
+    def __init__(self, index_dir: Optional[str] = None):
+        self.index_dir = index_dir
+        if index_dir:
+            os.makedirs(index_dir, mode=0o700, exist_ok=True)
+
+    @classmethod
+    def from_env(cls) -> Optional["ModuleIndexCache"]:
+        """Build a cache from ``UMDF_INDEX_SIDECAR``/``UMDF_INDEX_DIR``, or None if disabled."""
+        index_dir = os.getenv("UMDF_INDEX_DIR")
+        enabled = os.getenv("UMDF_INDEX_SIDECAR", "0").lower() in ("1", "true", "yes")
+        if not enabled and not index_dir:
+            return None
+        return cls(index_dir=index_dir)
+
+    def index_path(self, file_path: str) -> str:
+        if not self.index_dir:
+            return f"{file_path}.index.json"
+        name = hashlib.sha1(os.path.realpath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.index_dir, f"{name}.index.json")
+
+    def _key(self, file_path: str) -> Dict[str, Any]:
+        stat = os.stat(file_path)
+        return {
+            "version": INDEX_VERSION,
+            "path": os.path.realpath(file_path),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "header_sha256": header_hash(file_path)
+        }
+
+    def load(self, file_path: str, password: str = "") -> Optional[Dict[str, Any]]:
+        """Return the cached listing of file_path, or None if missing, stale or for another password."""
+        index_path = self.index_path(file_path)
+        if not os.path.exists(index_path):
+            return None
+
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            key = self._key(file_path)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not read module index {index_path}: {e}")
+            return None
+
+        if any(index.get(field) != value for field, value in key.items()):
+            return None
+        check = index.get("password_check", {})
+        if _password_check(password, bytes.fromhex(check.get("salt", ""))) != check.get("hash"):
+            return None
+        return index.get("listing")
+
+    def store(self, file_path: str, password: str, listing: Dict[str, Any]) -> None:
+        """Write the listing of a file that was just opened successfully."""
+        index_path = self.index_path(file_path)
+        try:
+            salt = os.urandom(16)
+            index = {
+                **self._key(file_path),
+                "password_check": {"salt": salt.hex(), "hash": _password_check(password, salt)},
+                "listing": listing
+            }
+            tmp_path = f"{index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            os.replace(tmp_path, index_path)
+        except (OSError, TypeError, ValueError) as e:
+            # The cache is optional - a read-only directory just disables it
+            print(f"Warning: Could not write module index {index_path}: {e}")
+
+    def invalidate(self, file_path: str) -> None:
+        try:
+            os.remove(self.index_path(file_path))
+        except OSError:
+            pass
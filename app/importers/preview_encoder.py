@@ -0,0 +1,99 @@
+import io
+import os
+import base64
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Any, Iterable, Iterator, List, Optional
+
+import numpy as np
+from PIL import Image
+
+SUPPORTED_CODECS = ("png", "webp", "jpeg")
+
+
+class PreviewEncoder:
+    """Encodes preview images to base64 on a shared thread pool.
+
+    PIL releases the GIL while compressing, so encoding many slices on a
+    thread pool scales with cores. The codec and level come from the
+    constructor or the UMDF_PREVIEW_* environment variables:
+
+    - ``png``: lossless, ``level`` is the zlib compress_level (0-9, lower is faster)
+    - ``webp``: lossless, ``level`` is the encoder effort (0-100, lower is faster)
+    - ``jpeg``: lossy, ``level`` is the quality (1-95); meant for photographic tiles
+    """
+
+    def __init__(self, codec: Optional[str] = None, level: Optional[int] = None, max_workers: Optional[int] = None):
+        self.codec = (codec or os.getenv("UMDF_PREVIEW_CODEC", "png")).lower()
+        if self.codec not in SUPPORTED_CODECS:
+            raise ValueError(f"Unsupported preview codec: {self.codec} (expected one of {SUPPORTED_CODECS})")
+
+        env_level = os.getenv("UMDF_PREVIEW_LEVEL")
+        if level is None and env_level:
+            level = int(env_level)
+        # PIL's own defaults, so output is unchanged unless configured
+        self.level = level if level is not None else {"png": 6, "webp": 80, "jpeg": 90}[self.codec]
+
+        self.max_workers = max_workers or int(os.getenv("UMDF_PREVIEW_WORKERS", "0")) or min(8, os.cpu_count() or 1)
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="preview-encode")
+
+    @property
+    def format(self) -> str:
+        """Short format name stored next to the encoded data (e.g. "png")."""
+        return self.codec
+
+    def encode_bytes(self, image: Any) -> bytes:
+        """Encode a PIL image or an 8-bit grayscale array and return the raw file bytes."""
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image, mode='L')  # 'L' for grayscale
+
+        buffer = io.BytesIO()
+        if self.codec == "webp":
+            image.save(buffer, format='WEBP', lossless=True, quality=self.level)
+        elif self.codec == "jpeg":
+            if image.mode not in ("L", "RGB"):
+                image = image.convert("RGB")
+            image.save(buffer, format='JPEG', quality=self.level)
+        else:
+            image.save(buffer, format='PNG', compress_level=self.level)
+        return buffer.getvalue()
+
+    def encode(self, image: Any) -> str:
+        """Encode a PIL image or an 8-bit grayscale array and return base64 text."""
+        return base64.b64encode(self.encode_bytes(image)).decode('utf-8')
+
+    async def encode_async(self, image: Any) -> str:
+        """Encode on the pool without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self.encode, image)
+
+    def encode_many(self, images: Iterable[Any], raw: bool = False) -> Iterator[Any]:
+        """Encode images in parallel, yielding results in input order.
+
+        Only a bounded number of images is queued ahead of the consumer, so
+        the caller can stream a long series without holding every encoded
+        slice at once. With ``raw`` the file bytes are yielded instead of
+        base64 text.
+        """
+        encode = self.encode_bytes if raw else self.encode
+        window = self.max_workers * 2
+        source = iter(images)
+        in_flight = deque(self._pool.submit(encode, image) for image in islice(source, window))
+
+        while in_flight:
+            result = in_flight.popleft().result()
+            next_image = next(source, None)
+            if next_image is not None:
+                in_flight.append(self._pool.submit(encode, next_image))
+            yield result
+
+    async def encode_many_async(self, images: Iterable[Any], raw: bool = False) -> List[Any]:
+        """encode_many without blocking the event loop; returns every result, in input order."""
+        loop = asyncio.get_running_loop()
+        # Driven from the default executor: a pool thread waiting on its own pool could deadlock
+        return await loop.run_in_executor(None, lambda: list(self.encode_many(images, raw)))
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=True)
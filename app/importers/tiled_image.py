@@ -0,0 +1,424 @@
+import os
+import math
+import tempfile
+import threading
+from bisect import bisect_right
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+from PIL import Image
+
+from .preview_encoder import PreviewEncoder
+
+# Edge length of the square tiles every pyramid level is cut into
+TILE_SIZE = int(os.getenv("UMDF_TILE_SIZE", "256"))
+
+# Codec used for tile images (see PreviewEncoder for the options)
+TILE_CODEC = os.getenv("UMDF_TILE_CODEC", "jpeg")
+
+# Images with more pixels than this are imported as a tiled pyramid
+TILED_IMAGE_MIN_PIXELS = int(os.getenv("UMDF_TILED_MIN_PIXELS", str(4096 * 4096)))
+
+# Upper bound on the pixels of an image accepted for tiling (well above
+# PIL's own decompression bomb limit, which is only lifted for the tiler)
+MAX_TILED_IMAGE_PIXELS = int(os.getenv("UMDF_TILED_MAX_PIXELS", str(4 * 1024 ** 3)))
+
+# Edge length of the single preview image stored for tiled images
+PREVIEW_MAX_SIZE = 1024
+
+# Compressed formats (JPEG, PNG, compressed TIFF) are decoded whole by PIL;
+# above this many pixels only uncompressed images are accepted for tiling
+TILED_FULL_DECODE_MAX_PIXELS = int(os.getenv("UMDF_TILED_FULL_DECODE_PIXELS", str(256 * 1024 ** 2)))
+
+# Tiles written per part module of a tiled image (all from one pyramid level)
+TILES_PER_PART = int(os.getenv("UMDF_TILES_PER_PART", "256"))
+
+# Serialises the tiler's opens, during which PIL's decompression bomb check
+# (a process-wide setting) is switched off
+_pixel_limit_lock = threading.Lock()
+
+
+def _check_pixels(width: int, height: int, limit: int = MAX_TILED_IMAGE_PIXELS) -> None:
+    if width * height > limit:
+        raise ValueError(f"Image of {width}x{height} pixels exceeds the limit of {limit} pixels")
+
+
+@contextmanager
+def _open_unchecked(path: str) -> Iterator[Image.Image]:
+    """Image.open without PIL's pixel limit; the callers check the size themselves.
+
+    Only the open (reading the header) runs without the limit, so every
+    other Image.open in the process keeps PIL's decompression bomb guard
+    except for that moment.
+    """
+    with _pixel_limit_lock:
+        previous = Image.MAX_IMAGE_PIXELS
+        Image.MAX_IMAGE_PIXELS = None
+        try:
+            image = Image.open(path)
+        finally:
+            Image.MAX_IMAGE_PIXELS = previous
+    with image:
+        yield image
+
+
+def open_image(source) -> Image.Image:
+    """Open an image for the plain (untiled) import.
+
+    PIL's decompression bomb guard applies, and images over
+    TILED_FULL_DECODE_MAX_PIXELS are refused before anything is decoded;
+    larger images go through /api/import/tiled-image.
+    """
+    image = Image.open(source)
+    _check_pixels(image.width, image.height, TILED_FULL_DECODE_MAX_PIXELS)
+    return image
+
+
+class BandReader:
+    """Decodes an image file one band of full-width rows at a time.
+
+    Uncompressed images (raw TIFF strips or tiles, BMP, PPM, ...) are read
+    band by band straight from the file, so memory stays proportional to
+    the band. PIL can only decode compressed formats whole; those are
+    accepted up to TILED_FULL_DECODE_MAX_PIXELS.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with _open_unchecked(path) as image:
+            self.width, self.height = image.size
+            self.mode = image.mode
+            self.format = image.format
+            tiles = list(image.tile)
+        _check_pixels(self.width, self.height)
+
+        self._tiles = self._raw_tiles(tiles)
+        if self._tiles is None and self.width * self.height > TILED_FULL_DECODE_MAX_PIXELS:
+            raise ValueError(
+                f"{self.format} images over {TILED_FULL_DECODE_MAX_PIXELS} pixels cannot be tiled without "
+                f"decoding them whole; convert the image to an uncompressed TIFF"
+            )
+
+    @property
+    def streamable(self) -> bool:
+        return self._tiles is not None
+
+    def _raw_tiles(self, tiles) -> Optional[List[tuple]]:
+        """The file's raw tile descriptors with explicit strides, or None if any part is compressed."""
+        raw_tiles = []
+        for decoder, extents, offset, args in tiles:
+            if decoder != "raw":
+                return None
+            if isinstance(args, str):
+                args = (args,)
+            rawmode, stride, orientation = (tuple(args) + (0, 1))[:3]
+            x0, y0, x1, y1 = extents
+            if not stride:
+                try:
+                    # Bytes of one packed row in this raw mode
+                    stride = len(Image.new(self.mode, (x1 - x0, 1)).tobytes("raw", rawmode))
+                except (ValueError, OSError):
+                    return None
+            raw_tiles.append((extents, offset, rawmode, stride, orientation))
+        return raw_tiles or None
+
+    def bands(self, band_height: int) -> Iterator[Image.Image]:
+        """Yield the image as consecutive bands of band_height rows (the last may be shorter)."""
+        if not self.streamable:
+            with _open_unchecked(self.path) as image:
+                image.load()
+                for top in range(0, self.height, band_height):
+                    yield image.crop((0, top, self.width, min(self.height, top + band_height)))
+            return
+
+        for top in range(0, self.height, band_height):
+            yield self._read_band(top, min(band_height, self.height - top))
+
+    def _read_band(self, top: int, height: int) -> Image.Image:
+        tiles = []
+        for (x0, y0, x1, y1), offset, rawmode, stride, orientation in self._tiles:
+            first, last = max(y0, top), min(y1, top + height)
+            if first >= last:
+                continue
+            # Rows of bottom-up tiles (orientation -1) are stored last row first
+            skip = first - y0 if orientation > 0 else y1 - last
+            tiles.append(("raw", (x0, first - top, x1, last - top), offset + skip * stride, (rawmode, stride, orientation)))
+
+        # Let PIL decode only the rows of this band, as if they were the whole image
+        with _open_unchecked(self.path) as image:
+            image._size = (self.width, height)
+            image.tile = tiles
+            image.load()
+            return image.copy()
+
+
+def needs_tiling(image: Image.Image) -> bool:
+    return image.width * image.height > TILED_IMAGE_MIN_PIXELS
+
+
+def pyramid_layout(width: int, height: int, tile_size: int = TILE_SIZE) -> Dict[str, Any]:
+    """Describe the pyramid of an image: level 0 is full resolution, each
+    following level halves both dimensions until the image fits in one tile."""
+    levels = []
+    level_width, level_height = width, height
+    while True:
+        level = len(levels)
+        levels.append({
+            "level": level,
+            "width": level_width,
+            "height": level_height,
+            "columns": math.ceil(level_width / tile_size),
+            "rows": math.ceil(level_height / tile_size),
+            "downsample": 2 ** level
+        })
+        if level_width <= tile_size and level_height <= tile_size:
+            break
+        level_width = max(1, math.ceil(level_width / 2))
+        level_height = max(1, math.ceil(level_height / 2))
+
+    return {
+        "width": width,
+        "height": height,
+        "tileSize": tile_size,
+        "levelCount": len(levels),
+        "levels": levels
+    }
+
+
+def _iter_band_tiles(band: Image.Image, level: int, top: int, tile_size: int) -> Iterator[Tuple[Dict[str, Any], Image.Image]]:
+    """Cut a band of a level, starting at row ``top`` (a multiple of tile_size), into tiles."""
+    row = top // tile_size
+    for column in range(math.ceil(band.width / tile_size)):
+        x = column * tile_size
+        tile = band.crop((x, 0, min(x + tile_size, band.width), band.height))
+        yield {
+            "level": level,
+            "column": column,
+            "row": row,
+            "x": x,
+            "y": top,
+            "width": tile.width,
+            "height": tile.height
+        }, tile
+
+
+def _stack(upper: Image.Image, lower: Image.Image) -> Image.Image:
+    stacked = Image.new(upper.mode, (upper.width, upper.height + lower.height))
+    stacked.paste(upper, (0, 0))
+    stacked.paste(lower, (0, upper.height))
+    return stacked
+
+
+def _iter_pyramid_images(reader: BandReader, tile_size: int) -> Iterator[Tuple[Dict[str, Any], Image.Image]]:
+    """Yield (tile info, tile image) for every level of the pyramid.
+
+    Level 0 is read one band of tile_size rows at a time. Each band is cut
+    into tiles and halved into the band of the next level, which is cut
+    once it holds tile_size rows, and so on. Only one partial band per
+    level is held, never a whole level. Within a level, tiles come in
+    row-major order; the levels are interleaved.
+    """
+    level_count = pyramid_layout(reader.width, reader.height, tile_size)["levelCount"]
+    pending: List[Optional[Image.Image]] = [None] * level_count
+    tops = [0] * level_count
+
+    def convert(band: Image.Image) -> Image.Image:
+        return band if band.mode in ("L", "RGB", "RGBA") else band.convert("RGB")
+
+    def emit(level: int, band: Image.Image):
+        yield from _iter_band_tiles(band, level, tops[level], tile_size)
+        tops[level] += band.height
+        if level + 1 < level_count:
+            half = band.resize((max(1, math.ceil(band.width / 2)), max(1, math.ceil(band.height / 2))), Image.BOX)
+            yield from push(level + 1, half)
+
+    def push(level: int, band: Image.Image):
+        if pending[level] is not None:
+            band = _stack(pending[level], band)
+            pending[level] = None
+        top = 0
+        while band.height - top >= tile_size:
+            yield from emit(level, band.crop((0, top, band.width, top + tile_size)))
+            top += tile_size
+        if top < band.height:
+            pending[level] = band.crop((0, top, band.width, band.height))
+
+    for band in reader.bands(tile_size):
+        yield from push(0, convert(band))
+
+    # The last, shorter band of each level; flushing one feeds the next
+    for level in range(level_count):
+        if pending[level] is not None:
+            band, pending[level] = pending[level], None
+            yield from emit(level, band)
+
+
+def iter_pyramid_tiles(
+    reader: BandReader,
+    encoder: PreviewEncoder,
+    tile_size: int = TILE_SIZE
+) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+    """Cut an image into a tile pyramid and yield (tile metadata, encoded tile).
+
+    Tiles are encoded in parallel on the encoder's pool (a long-lived, shared
+    encoder) with only a bounded number in flight, so the encoded pyramid is
+    produced as a stream.
+    """
+    # Tile infos wait here while their images are in flight on the encoder
+    pending_infos = deque()
+
+    def images():
+        for info, tile in _iter_pyramid_images(reader, tile_size):
+            pending_infos.append(info)
+            yield tile
+
+    for tile_bytes in encoder.encode_many(images(), raw=True):
+        yield {**pending_infos.popleft(), "format": encoder.format}, tile_bytes
+
+
+def iter_tile_parts(
+    tiles: Iterable[Tuple[Dict[str, Any], bytes]],
+    layout: Dict[str, Any],
+    tiles_per_part: int = TILES_PER_PART
+) -> Iterator[Dict[str, Any]]:
+    """Group a tile stream into parts of up to tiles_per_part tiles of one level.
+
+    Yields ``{"level", "first", "tiles"}``, where ``first`` is the row-major
+    number (row * columns + column) of the part's first tile; the tiles of a
+    part are consecutive in that order.
+    """
+    buffers: Dict[int, List[Tuple[Dict[str, Any], bytes]]] = {}
+    for info, tile_bytes in tiles:
+        buffer = buffers.setdefault(info["level"], [])
+        buffer.append((info, tile_bytes))
+        if len(buffer) >= tiles_per_part:
+            yield _tile_part(buffers.pop(info["level"]), layout)
+    for level in sorted(buffers):
+        yield _tile_part(buffers[level], layout)
+
+
+def _tile_part(tiles: List[Tuple[Dict[str, Any], bytes]], layout: Dict[str, Any]) -> Dict[str, Any]:
+    first = tiles[0][0]
+    columns = layout["levels"][first["level"]]["columns"]
+    return {"level": first["level"], "first": first["row"] * columns + first["column"], "tiles": tiles}
+
+
+class TileSpool:
+    """Encoded tile parts parked in a temporary file until the whole pyramid is ready.
+
+    Nothing is written to the UMDF file while the image is still being
+    decoded and encoded, so a failure there leaves no part modules behind.
+    Only the tile metadata and file offsets are kept in memory.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Deleted by the OS as soon as it is closed
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self.parts: List[Dict[str, Any]] = []
+
+    def add(self, part: Dict[str, Any]) -> None:
+        entries = []
+        for info, tile_bytes in part["tiles"]:
+            entries.append((info, self._file.tell(), len(tile_bytes)))
+            self._file.write(tile_bytes)
+        self.parts.append({**part, "tiles": entries})
+
+    def tiles(self, part: Dict[str, Any]) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+        """The (tile metadata, encoded tile) pairs of one of ``parts``."""
+        for info, offset, length in part["tiles"]:
+            self._file.seek(offset)
+            yield info, self._file.read(length)
+        self._file.seek(0, os.SEEK_END)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "TileSpool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def tiled_image_metadata(reader: BandReader, filename: str, tile_size: int = TILE_SIZE, codec: str = TILE_CODEC) -> Dict[str, Any]:
+    """Metadata of a tiled image module, before its parts are listed in ``tileParts``.
+
+    The tiles themselves are stored in part modules (see iter_tile_parts);
+    the tiled image module holds the layout, the part list and one preview
+    frame, the top pyramid level.
+    """
+    return {
+        "modality": "Image",
+        "source": "image",
+        "original_filename": filename,
+        "image_format": reader.format,
+        "mode": reader.mode,
+        "encoding": "tiled",
+        "tileFormat": codec,
+        "pyramid": pyramid_layout(reader.width, reader.height, tile_size),
+        "tileParts": []
+    }
+
+
+def tile_part_metadata(metadata: Dict[str, Any], part: Dict[str, Any]) -> Dict[str, Any]:
+    """Metadata of one part module; its frames are the part's tiles."""
+    return {
+        "modality": "Image",
+        "source": "image",
+        "original_filename": metadata["original_filename"],
+        "encoding": "tile-part",
+        "tileFormat": metadata["tileFormat"],
+        "level": part["level"],
+        "first": part["first"],
+        "count": len(part["tiles"])
+    }
+
+
+def preview_image(image: Image.Image, max_size: int = PREVIEW_MAX_SIZE) -> Image.Image:
+    """Downscaled copy of an image for a single-image preview.
+
+    JPEGs are decoded at a reduced scale (draft), so the full resolution is
+    never held; this changes ``image.size``, so read it before calling.
+    """
+    image.draft(None, (max_size, max_size))
+    # reduce() shrinks by an integer factor without an intermediate full-size copy
+    factor = max(1, max(image.width, image.height) // max_size)
+    preview = image.reduce(factor) if factor > 1 else image.copy()
+    if preview.mode not in ("L", "RGB", "RGBA"):
+        preview = preview.convert("RGB")
+    preview.thumbnail((max_size, max_size))
+    return preview
+
+
+def index_tiles(metadata: Dict[str, Any]) -> Dict[int, Tuple[List[int], List[Dict[str, Any]]]]:
+    """Per level, the sorted first tile numbers and the parts from ``tileParts``.
+
+    Use with locate_tile; nothing but the tiled image's metadata is read.
+    """
+    levels: Dict[int, List[Dict[str, Any]]] = {}
+    for part in metadata.get("tileParts", []):
+        levels.setdefault(int(part["level"]), []).append(part)
+    index = {}
+    for level, parts in levels.items():
+        parts.sort(key=lambda part: part["first"])
+        index[level] = ([part["first"] for part in parts], parts)
+    return index
+
+
+def locate_tile(metadata: Dict[str, Any], index, level: int, column: int, row: int) -> Optional[Tuple[str, int]]:
+    """(part module id, frame index) holding a tile, or None if there is no such tile."""
+    levels = metadata["pyramid"]["levels"]
+    if not 0 <= level < len(levels) or level not in index:
+        return None
+    grid = levels[level]
+    if not (0 <= column < grid["columns"] and 0 <= row < grid["rows"]):
+        return None
+    number = row * grid["columns"] + column
+    firsts, parts = index[level]
+    position = bisect_right(firsts, number) - 1
+    if position < 0 or number >= parts[position]["first"] + parts[position]["count"]:
+        return None
+    return parts[position]["module_id"], number - parts[position]["first"]
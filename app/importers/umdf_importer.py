@@ -10,9 +10,11 @@ project_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from ..schemas.schema_registry import get_schema_registry
+
 def get_schema_title(schema_path: str, base_dir: str = None) -> str:
     """
-    Read a schema JSON file and extract the title field.
+    Get the title field of a schema.
     
     Args:
         schema_path: The schema path from the module (e.g., './schemas/image/v1.0.json')
@@ -21,45 +23,26 @@ def get_schema_title(schema_path: str, base_dir: str = None) -> str:
     Returns:
         The title from the schema, or a fallback name if schema can't be read
     """
-    try:
-        # Resolve the schema path
-        if base_dir is None:
-            base_dir = project_root
-        
-        # Handle relative paths starting with ./
-        if schema_path.startswith('./'):
-            schema_path = schema_path[2:]  # Remove ./
-        
-        # Construct full path
-        full_path = os.path.join(base_dir, schema_path)
-        
-        print(f"🔍 DEBUG: Reading schema from: {full_path}")
-        
-        # Check if file exists
-        if not os.path.exists(full_path):
-            print(f"⚠️  Warning: Schema file not found: {full_path}")
-            return "Unknown Schema"
-        
-        # Read and parse the JSON
-        with open(full_path, 'r', encoding='utf-8') as f:
-            schema_data = json.load(f)
-        
-        # Extract the title
-        title = schema_data.get('title', 'Unknown Schema')
-        print(f"✅ Successfully read schema title: {title}")
-        return title
-        
-    except Exception as e:
-        print(f"❌ Error reading schema {schema_path}: {e}")
-        return "Unknown Schema"
+    # Served from the in-memory schema registry - no file read per module
+    registry = get_schema_registry(os.path.join(base_dir or project_root, "schemas"))
+    return registry.title(schema_path, "Unknown Schema")
 
 try:
-    from cpp_interface.umdf_interface import UMDFReader, read_umdf_file
+    from cpp_interface.umdf_interface import UMDFReader, UMDFReaderPool, read_umdf_file, module_directory
     print("Successfully imported UMDF interface")
 except ImportError as e:
     print(f"Warning: Could not import UMDF interface: {e}")
     UMDFReader = None
+    UMDFReaderPool = None
     read_umdf_file = None
+    module_directory = None
+
+from .module_index import ModuleIndexCache
+
+def _file_signature(file_path: str) -> tuple:
+    """(real path, size, mtime) identifying one version of a file on disk."""
+    stat = os.stat(file_path)
+    return (os.path.realpath(file_path), stat.st_size, stat.st_mtime_ns)
 
 class UMDFImporter:
     """Importer for UMDF files using the C++ reader."""
@@ -67,6 +50,16 @@ class UMDFImporter:
     def __init__(self):
         """Initialize the UMDF importer."""
         self.reader = UMDFReader() if UMDFReader else None
+        # Extra readers on the open file for concurrent module reads
+        self.reader_pool = UMDFReaderPool() if UMDFReaderPool else None
+        # (signature, password, result) of the file the reader last opened, for reopen_path
+        self._open_state = None
+        # Optional sidecar index of module listings (UMDF_INDEX_SIDECAR / UMDF_INDEX_DIR)
+        self.index_cache = ModuleIndexCache.from_env()
+        # Module directory of the open file when known without the reader (see list_modules)
+        self.directory = None
+        # Temporary copy written by import_file; kept on disk while it is the open file
+        self._temp_path = None
     
     def can_import(self) -> bool:
         """Check if UMDF import is available."""
@@ -82,17 +75,6 @@ class UMDFImporter:
         temp_file = None
         temp_path = None
         try:
-            # Create temporary file with .umdf extension
-            temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix='.umdf', delete=False)
-            temp_path = temp_file.name
-            
-            # Write file content
-            temp_file.write(file_content)
-            temp_file.close()
-            
-            print(f"Temporary file created: {temp_path}")
-            print(f"File size: {len(file_content)} bytes")
-            
             # Basic file validation - check if it's not empty and has some content
             if len(file_content) == 0:
                 raise RuntimeError("File is empty")
@@ -102,170 +84,279 @@ class UMDFImporter:
             if len(file_content) < 4:
                 raise RuntimeError("File is too small to be a valid UMDF file")
             
-            print(f"File validation passed - proceeding with UMDF reader")
-            
-            # Read the file using the UMDF reader
-            print("Opening UMDF file with reader...")
-            print(f"Temporary file path: {temp_path}")
-            print(f"Temporary file exists: {os.path.exists(temp_path)}")
-            print(f"Temporary file size: {os.path.getsize(temp_path) if os.path.exists(temp_path) else 'N/A'}")
-            
-            # Add file header inspection for debugging
-            if os.path.exists(temp_path):
-                try:
-                    with open(temp_path, 'rb') as f:
-                        header_bytes = f.read(64)  # Read first 64 bytes to inspect header
-                        print(f"File header (first 64 bytes): {header_bytes.hex()}")
-                        print(f"File header as string: {header_bytes.decode('utf-8', errors='ignore')}")
-                except Exception as header_error:
-                    print(f"Could not read file header: {header_error}")
-            
-            try:
-                # Open the file using the C++ reader
-                print("Opening UMDF file with reader.openFile...")
-                print(f"=== DEBUG: Password parameter type: {type(password)}")
-                print(f"=== DEBUG: Password parameter length: {len(password) if password else 'None'}")
-                print(f"=== DEBUG: Password parameter value: {repr(password)}")
-                
-                # Use the password provided by the frontend
-                result = self.reader.reader.openFile(temp_path, password)
-                print(f"openFile result: {result}")
-                print(f"openFile success: {result.success}")
-                print(f"openFile message: {result.message}")
-                
-                if not result.success:
-                    print(f"Failed to open UMDF file: {result.message}")
-                    raise RuntimeError(f"Failed to open UMDF file: {result.message}")
-                    
-            except Exception as open_error:
-                print(f"Exception during openFile: {open_error}")
-                import traceback
-                traceback.print_exc()
-                raise RuntimeError(f"Exception during file open: {open_error}")
-            
-            # Get file information
-            print("Getting file info...")
-            file_info = self.reader.reader.getFileInfo()
-            print(f"File info received: {type(file_info)}")
-            print(f"File info content: {file_info}")
-            
-            # Debug: Check if schema_path is in the modules data
-            if file_info and 'modules' in file_info:
-                print("=== DEBUG: Checking modules for schema_path ===")
-                for i, module in enumerate(file_info['modules']):
-                    print(f"Module {i}: {module}")
-                    if 'schema_path' in module:
-                        print(f"  ✓ Module {i} has schema_path: {module['schema_path']}")
-                    else:
-                        print(f"  ✗ Module {i} missing schema_path")
-                        print(f"    Available keys: {list(module.keys())}")
-                print("=== END DEBUG ===")
-            
-            # Don't close the file here - keep it open for module data access
-            # The file will be closed when the importer is cleaned up or when explicitly requested
-            print("UMDF file kept open for module data access")
-            
-            # Check if the file info indicates success
-            if not file_info or not file_info.get('success', False):
-                error_msg = file_info.get('error', 'Unknown error occurred') if file_info else 'No file info received'
-                print(f"File processing failed: {error_msg}")
-                raise RuntimeError(f"Failed to process UMDF file: {error_msg}")
-            
-            # Extract module information from the JSON response
-            module_count = file_info.get('module_count', 0)
-            modules_data = file_info.get('modules', [])
-            module_graph = file_info.get('module_graph', {})
-            encounters = module_graph.get('encounters', [])
-            
-            print(f"Successfully processed file with {module_count} modules and {len(encounters)} encounters")
-            
-            # Convert to internal format
-            modules = []
-            
-            # Create module entries from the modules array
-            for module_data in modules_data:
-                print(f"=== DEBUG: Processing module_data ===")
-                print(f"  module_data: {module_data}")
-                print(f"  Available keys: {list(module_data.keys())}")
-                print(f"  schema_path value: {module_data.get('schema_path', 'NOT_FOUND')}")
-                
-                # Get the schema title for a meaningful module name
-                schema_path = module_data.get('schema_path', 'unknown')
-                if schema_path != 'unknown':
-                    schema_title = get_schema_title(schema_path)
-                    module_name = f"{schema_title.title()} Module"
-                else:
-                    module_name = f"UMDF_Module_{module_data.get('type', 'unknown')}"
-                
-                print(f"  Schema title: {schema_title if schema_path != 'unknown' else 'N/A'}")
-                print(f"  Final module name: {module_name}")
-                
-                module = {
-                    "id": module_data.get('uuid', 'unknown'),
-                    "name": module_name,
-                    "schema_id": module_data.get('schema_id', 'unknown'),
-                    "schema_path": schema_path,  # New field for schema path
-                    "type": module_data.get('type', 'unknown'),
-                    "schema_url": "unknown",
-                    "metadata": {"uuid": module_data.get('uuid', 'unknown')},
-                    "data": {},
-                    "created_at": datetime.now().isoformat(),
-                    "source_file": filename
-                }
-                print(f"  Created module: {module}")
-                modules.append(module)
+            # Create temporary file with .umdf extension
+            temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix='.umdf', delete=False)
+            temp_path = temp_file.name
             
-            result = {
-                "file_type": "umdf",
-                "file_path": filename,
-                "modules": modules,
-                "file_info": file_info,
-                "module_count": module_count,
-                "encounters": encounters,
-                "module_graph": module_graph
-            }
+            # Write file content
+            temp_file.write(file_content)
+            temp_file.close()
             
-            print("=== DEBUG: Final result being returned ===")
-            print(f"  modules count: {len(modules)}")
-            for i, module in enumerate(modules):
-                print(f"  Module {i} schema_path: {module.get('schema_path', 'NOT_FOUND')}")
-            print("=== END DEBUG ===")
+            print(f"Temporary file created: {temp_path}")
+            print(f"File size: {len(file_content)} bytes")
             
+            # The reader pool and a deferred open read the file lazily, so the
+            # copy stays on disk until another file is opened or this one is
+            # closed. It is not indexed: the next import gets a new name.
+            result = self.open_path(temp_path, filename, password, use_index=False)
+            self._temp_path = temp_path
             return result
             
         except Exception as e:
             print(f"Error in import_file: {e}")
             import traceback
             traceback.print_exc()
+            if temp_file:
+                self._remove_temp_file(temp_path)
             raise RuntimeError(f"Failed to import UMDF file: {e}")
-            
-        finally:
-            # Clean up temporary file
-            if temp_file and os.path.exists(temp_path):
-                try:
-                    os.unlink(temp_path)
-                    print(f"Temporary file cleaned up: {temp_path}")
-                except Exception as cleanup_error:
-                    print(f"Warning: Failed to clean up temporary file {temp_path}: {cleanup_error}")
     
-    def import_file_from_path(self, file_path: str, password: str = "") -> Dict[str, Any]:
-        """Import a UMDF file from a file path."""
+    def _remove_temp_file(self, temp_path: str):
+        """Delete a temporary copy made by import_file."""
+        if temp_path and os.path.exists(temp_path):
+            try:
+                os.unlink(temp_path)
+                print(f"Temporary file cleaned up: {temp_path}")
+            except Exception as cleanup_error:
+                print(f"Warning: Failed to clean up temporary file {temp_path}: {cleanup_error}")
+    
+    def _set_open_state(self, file_path: str, password: str, result: Dict[str, Any]):
+        """Record the file now open, dropping the temporary copy of a previous import."""
+        self._open_state = (_file_signature(file_path), password, result)
+        if self._temp_path and self._temp_path != file_path:
+            self._remove_temp_file(self._temp_path)
+            self._temp_path = None
+    
+    def open_path(self, file_path: str, filename: Optional[str] = None, password: str = "",
+                  use_index: bool = True) -> Dict[str, Any]:
+        """Open a UMDF file in place with the reader and convert to internal module format.
+        
+        Unlike import_file(), no copy of the file is made - the reader opens
+        file_path directly, so the file must stay on disk while it is in use.
+        """
+        if not self.can_import():
+            raise ImportError("UMDF reader module not available")
+        
+        if filename is None:
+            filename = os.path.basename(file_path)
+        
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        with open(file_path, 'rb') as f:
-            file_content = f.read()
+        file_size = os.path.getsize(file_path)
+        if file_size == 0:
+            raise RuntimeError("File is empty")
+        if file_size < 4:
+            raise RuntimeError("File is too small to be a valid UMDF file")
+        
+        print(f"File validation passed - proceeding with UMDF reader")
+        
+        if self.index_cache and use_index:
+            listing = self.index_cache.load(file_path, password)
+            if listing is not None:
+                # Unchanged since it was last indexed: serve the listing and
+                # leave opening the file to the first module read
+                print(f"=== DEBUG: Using module index for {file_path}, reader opens on first read ===")
+                self.reader.defer_open(file_path, password)
+                self.reader_pool.open(file_path, password)
+                self.directory = listing.get("directory")
+                result = {
+                    "file_type": "umdf",
+                    "file_path": filename,
+                    "modules": listing.get("modules", []),
+                    "file_info": {"success": True, "module_count": listing.get("module_count", 0), "from_index": True},
+                    "module_count": listing.get("module_count", 0),
+                    "encounters": listing.get("encounters", []),
+                    "module_graph": listing.get("module_graph", {})
+                }
+                self._set_open_state(file_path, password, result)
+                return result
+        
+        # Read the file using the UMDF reader
+        print("Opening UMDF file with reader...")
+        print(f"File path: {file_path}")
+        print(f"File size: {file_size}")
+        
+        # Add file header inspection for debugging
+        try:
+            with open(file_path, 'rb') as f:
+                header_bytes = f.read(64)  # Read first 64 bytes to inspect header
+                print(f"File header (first 64 bytes): {header_bytes.hex()}")
+                print(f"File header as string: {header_bytes.decode('utf-8', errors='ignore')}")
+        except Exception as header_error:
+            print(f"Could not read file header: {header_error}")
         
-        return self.import_file(file_content, os.path.basename(file_path), password)
+        try:
+            # Open the file using the C++ reader
+            print("Opening UMDF file with reader.openFile...")
+            print(f"=== DEBUG: Password parameter length: {len(password) if password else 'None'}")
+            
+            # Use the password provided by the frontend
+            self.reader.cancel_deferred_open()
+            self.directory = None
+            result = self.reader.reader.openFile(file_path, password)
+            print(f"openFile success: {result.success}")
+            print(f"openFile message: {result.message}")
+            
+            if not result.success:
+                print(f"Failed to open UMDF file: {result.message}")
+                raise RuntimeError(f"Failed to open UMDF file: {result.message}")
+            self.reader.current_file = file_path
+            self.reader_pool.open(file_path, password)
+                
+        except Exception as open_error:
+            print(f"Exception during openFile: {open_error}")
+            import traceback
+            traceback.print_exc()
+            raise RuntimeError(f"Exception during file open: {open_error}")
+        
+        # Get file information
+        print("Getting file info...")
+        file_info = self.reader.reader.getFileInfo()
+        print(f"File info received: {type(file_info)}")
+        
+        # Debug: Check if schema_path is in the modules data
+        if file_info and 'modules' in file_info:
+            print("=== DEBUG: Checking modules for schema_path ===")
+            for i, module in enumerate(file_info['modules']):
+                if 'schema_path' not in module:
+                    print(f"  ✗ Module {i} missing schema_path")
+                    print(f"    Available keys: {list(module.keys())}")
+            print("=== END DEBUG ===")
+        
+        # Don't close the file here - keep it open for module data access
+        # The file will be closed when the importer is cleaned up or when explicitly requested
+        print("UMDF file kept open for module data access")
+        
+        # Check if the file info indicates success
+        if not file_info or not file_info.get('success', False):
+            error_msg = file_info.get('error', 'Unknown error occurred') if file_info else 'No file info received'
+            print(f"File processing failed: {error_msg}")
+            raise RuntimeError(f"Failed to process UMDF file: {error_msg}")
+        
+        # Extract module information from the JSON response
+        module_count = file_info.get('module_count', 0)
+        modules_data = file_info.get('modules', [])
+        module_graph = file_info.get('module_graph', {})
+        encounters = module_graph.get('encounters', [])
+        
+        print(f"Successfully processed file with {module_count} modules and {len(encounters)} encounters")
+        
+        # Convert to internal format
+        modules = []
+        
+        # Create module entries from the modules array
+        for module_data in modules_data:
+            # Get the schema title for a meaningful module name
+            schema_path = module_data.get('schema_path', 'unknown')
+            if schema_path != 'unknown':
+                schema_title = get_schema_title(schema_path)
+                module_name = f"{schema_title.title()} Module"
+            else:
+                module_name = f"UMDF_Module_{module_data.get('type', 'unknown')}"
+            
+            module = {
+                "id": module_data.get('uuid', 'unknown'),
+                "name": module_name,
+                "schema_id": module_data.get('schema_id', 'unknown'),
+                "schema_path": schema_path,  # New field for schema path
+                "type": module_data.get('type', 'unknown'),
+                "schema_url": "unknown",
+                "metadata": {"uuid": module_data.get('uuid', 'unknown')},
+                "data": {},
+                "created_at": datetime.now().isoformat(),
+                "source_file": filename
+            }
+            modules.append(module)
+        
+        print(f"=== DEBUG: Returning {len(modules)} modules ===")
+        
+        result = {
+            "file_type": "umdf",
+            "file_path": filename,
+            "modules": modules,
+            "file_info": file_info,
+            "module_count": module_count,
+            "encounters": encounters,
+            "module_graph": module_graph
+        }
+        if self.index_cache and use_index:
+            self.directory = module_directory(self.reader.reader)
+            self.index_cache.store(file_path, password, {
+                "modules": modules,
+                "module_count": module_count,
+                "encounters": encounters,
+                "module_graph": module_graph,
+                "directory": self.directory
+            })
+        
+        self._set_open_state(file_path, password, result)
+        return result
+    
+    def schema_paths(self) -> List[str]:
+        """Schema paths used by the modules of the open file."""
+        if not self._open_state:
+            return []
+        modules = self._open_state[2].get("modules", [])
+        return sorted({m["schema_path"] for m in modules if m.get("schema_path") not in (None, "", "unknown")})
+    
+    def import_file_from_path(self, file_path: str, password: str = "") -> Dict[str, Any]:
+        """Import a UMDF file from a file path (opened in place, see open_path)."""
+        return self.open_path(file_path, os.path.basename(file_path), password)
+    
+    def reopen_path(self, file_path: str, password: str = "") -> Dict[str, Any]:
+        """Reopen a file with the reader after an edit session ends.
+        
+        If the reader still has this file open and it has not changed on disk
+        since (same size and modification time, e.g. after a cancelled edit),
+        the existing reader, pool and module directory are reused as they
+        are. Otherwise the file is opened in place with open_path.
+        """
+        if self._open_state and self.reader and self.reader.current_file:
+            signature, open_password, result = self._open_state
+            try:
+                unchanged = signature == _file_signature(file_path) and open_password == password
+            except OSError:
+                unchanged = False
+            if unchanged and os.path.realpath(self.reader.current_file) == signature[0]:
+                print(f"=== DEBUG: {file_path} unchanged since it was opened, reusing reader state ===")
+                return result
+        
+        return self.open_path(file_path, os.path.basename(file_path), password)
+    
+    async def get_module_data(self, module_id: str):
+        """Read a module's ExpectedModuleData on a pooled reader, off the event loop."""
+        return await self.reader_pool.get_module_data(module_id)
+    
+    async def get_frames(self, module_id: str, start: int = 0, count: int = 1) -> Dict[str, Any]:
+        """Read frames [start, start + count) of an image module on a pooled reader."""
+        return await self.reader_pool.get_frames(module_id, start, count)
+    
+    async def get_modules_data(self, module_ids: List[str]) -> Dict[str, Any]:
+        """Read several modules in one call on a pooled reader."""
+        return await self.reader_pool.get_modules_data(module_ids)
+    
+    async def get_frame_view(self, module_id: str, index: int):
+        """Return (frame count, read-only view of one frame or None), memory-mapped when enabled."""
+        return await self.reader_pool.get_frame_view(module_id, index)
     
-    def close_file(self):
-        """Close the currently open file when done with it."""
-        if hasattr(self, 'reader') and self.reader and hasattr(self.reader, 'reader'):
+    def close_file(self) -> bool:
+        """Close the currently open file when done with it; returns whether the reader closed it."""
+        self._open_state = None
+        self.directory = None
+        closed = True
+        if getattr(self, 'reader_pool', None):
+            self.reader_pool.close()
+        if getattr(self, 'reader', None):
             try:
-                self.reader.reader.closeFile()
+                closed = self.reader.close_file()
                 print("UMDF file closed successfully")
             except Exception as e:
                 print(f"Warning: Error closing file: {e}")
+                closed = False
+        if getattr(self, '_temp_path', None):
+            self._remove_temp_file(self._temp_path)
+            self._temp_path = None
+        return closed
     
     def __del__(self):
         """Cleanup when the importer is destroyed."""
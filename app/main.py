@@ -1,17 +1,35 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Form
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request, Form, Query
+from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 import json
 import os
+import asyncio
+import functools
 import re
 import sys
 from typing import List
+from collections import OrderedDict
+
+import numpy as np
 
 from .models.medical_file import MedicalFile, Module
 from .importers.umdf_importer import UMDFImporter
+from .importers.dicom_watch import DicomWatchService
+from .importers.file_importer import FileImporter
+from .importers.tiled_image import (
+    BandReader, TileSpool, iter_pyramid_tiles, iter_tile_parts, tiled_image_metadata, tile_part_metadata, index_tiles, locate_tile,
+    TILE_CODEC
+)
+from .importers.preview_encoder import PreviewEncoder
 from .schemas.schema_manager import SchemaManager
-from cpp_interface.umdf_interface import UMDFWriter
+from .schemas.schema_registry import get_schema_registry
+from .uploads.chunked_upload import ChunkedUploadManager, UploadError, DEFAULT_CHUNK_SIZE, DEFAULT_UPLOAD_DIR
+from .uploads.spool import spool_request, prune_directory, DEFAULT_SPOOL_DIR, SPOOL_KEEP_FILES
+from cpp_interface.umdf_interface import (
+    UMDFWriter, WriterOperation, FailedOperationsError, EditSessionReader, AsyncUMDFBridge, AsyncUMDFReader, AsyncUMDFWriter,
+    build_image_module_data, build_tiled_image_module_data, frame_buffer, set_frame_buffer, plain_json, AUDIT_PAGE_SIZE
+)
 # Removed old import - now using UMDFReader directly in the importer
 
 # Add DICOM converter to Python path
@@ -38,8 +56,44 @@ app.mount("/static", StaticFiles(directory="static"), name="static")
 
 # Initialize managers
 schema_manager = SchemaManager()
+schema_registry = get_schema_registry(Path(__file__).parent.parent / "schemas")
 umdf_importer = UMDFImporter()
 umdf_writer = UMDFWriter()
+file_importer = FileImporter()
+
+# All blocking C++ calls made by routes go through the bridge, so the event
+# loop keeps serving other clients while a file is opened or decrypted
+umdf_bridge = AsyncUMDFBridge()
+async_reader = AsyncUMDFReader(umdf_importer.reader, umdf_bridge)
+async_writer = AsyncUMDFWriter(umdf_writer, umdf_bridge)
+
+# Serves module data in edit mode: unchanged modules come from the viewer's
+# reader, still open on the file, and newly written ones from the writer
+edit_reader = EditSessionReader(umdf_writer, umdf_importer.reader)
+upload_manager = ChunkedUploadManager()
+
+# Optional watch-folder ingest, enabled by setting UMDF_WATCH_DIRS and UMDF_WATCH_TARGET
+dicom_watch_service = DicomWatchService.from_env(DICOMConverter) if DICOM_CONVERTER_AVAILABLE else None
+
+@app.on_event("startup")
+async def start_dicom_watch():
+    """Start the DICOM watch-folder service if it is configured."""
+    if dicom_watch_service:
+        dicom_watch_service.start()
+    elif os.getenv("UMDF_WATCH_DIRS"):
+        print("=== DEBUG: UMDF_WATCH_DIRS set but DICOM watch service unavailable (needs DICOM converter and UMDF_WATCH_TARGET) ===")
+
+@app.on_event("shutdown")
+async def stop_dicom_watch():
+    """Stop the DICOM watch-folder service."""
+    if dicom_watch_service:
+        dicom_watch_service.stop(timeout=30)
+
+@app.on_event("shutdown")
+async def stop_preview_encoder():
+    """Stop the preview and tile encoders' thread pools."""
+    file_importer.preview_encoder.shutdown()
+    tile_encoder.shutdown()
 
 # Store user credentials (simple in-memory storage for prototype)
 stored_credentials = {
@@ -89,32 +143,18 @@ async def debug_credentials():
 
 @app.get("/schemas/{schema_path:path}")
 async def get_schema_file(schema_path: str):
-    """Serve schema files dynamically from the local schemas folder."""
+    """Serve schema files from the local schemas folder (via the in-memory schema registry)."""
     try:
-        import os
-        from pathlib import Path
-        
-        # Construct the full path to the schema file
-        schemas_dir = Path(__file__).parent.parent / "schemas"
-        schema_file_path = schemas_dir / schema_path
-        
-        # Security check: ensure the path is within the schemas directory
-        try:
-            schema_file_path.resolve().relative_to(schemas_dir.resolve())
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Invalid schema path")
-        
-        # Check if file exists
-        if not schema_file_path.exists():
+        # Only files the registry found under the schemas folder can be
+        # served, so paths outside it never reach the filesystem
+        schema_content = schema_registry.content(schema_path)
+        if schema_content is None:
             raise HTTPException(status_code=404, detail=f"Schema file not found: {schema_path}")
         
-        # Read and return the schema file
-        with open(schema_file_path, 'r', encoding='utf-8') as f:
-            schema_content = f.read()
-        
-        print(f"=== DEBUG: Served schema file: {schema_path} ===")
         return {"content": schema_content, "path": schema_path}
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"=== DEBUG: Error serving schema {schema_path}: {e} ===")
         raise HTTPException(status_code=500, detail=f"Error reading schema file: {str(e)}")
@@ -123,42 +163,7 @@ async def get_schema_file(schema_path: str):
 async def discover_schemas():
     """Discover available schemas in the local schemas folder."""
     try:
-        import os
-        from pathlib import Path
-        
-        schemas_dir = Path(__file__).parent.parent / "schemas"
-        schemas = []
-        
-        # Scan the schemas directory for JSON files
-        for schema_file in schemas_dir.rglob("*.json"):
-            if schema_file.is_file():
-                # Get relative path from schemas directory
-                relative_path = schema_file.relative_to(schemas_dir)
-                schema_path = f"./schemas/{relative_path}"
-                
-                # Read schema to get title and description
-                try:
-                    with open(schema_file, 'r', encoding='utf-8') as f:
-                        schema_data = json.loads(f.read())
-                    
-                    schemas.append({
-                        "path": str(schema_path),
-                        "title": schema_data.get("title", f"{relative_path.stem} Module"),
-                        "description": schema_data.get("description", "No description available"),
-                        "type": schema_data.get("module_type", "unknown"),
-                        "version": relative_path.parent.name if relative_path.parent.name != "schemas" else "v1.0"
-                    })
-                except Exception as e:
-                    print(f"=== DEBUG: Error reading schema {schema_file}: {e} ===")
-                    # Add basic info even if we can't read the full schema
-                    schemas.append({
-                        "path": str(schema_path),
-                        "title": f"{relative_path.stem} Module",
-                        "description": "Schema file (could not read details)",
-                        "type": "unknown",
-                        "version": relative_path.parent.name if relative_path.parent.name != "schemas" else "v1.0"
-                    })
-        
+        schemas = schema_registry.listing()
         print(f"=== DEBUG: Discovered {len(schemas)} schemas ===")
         return {"schemas": schemas}
         
@@ -166,46 +171,150 @@ async def discover_schemas():
         print(f"=== DEBUG: Error discovering schemas: {e} ===")
         raise HTTPException(status_code=500, detail=f"Error discovering schemas: {str(e)}")
 
+@app.get("/api/schemas/bundle")
+async def get_schema_bundle(request: Request, path: List[str] = Query(None)):
+    """Every schema the open file uses (or the given ``path`` schemas) in one response.
+    
+    Includes all schemas they reference, both as written and with $refs
+    resolved. The encoded bundle is cached until a schema file changes,
+    served gzip-compressed when the client accepts it, and revalidated by ETag.
+    """
+    schema_paths = path or umdf_importer.schema_paths()
+    if not schema_paths:
+        raise HTTPException(status_code=400, detail="No file open and no schema paths given")
+    
+    encoded = schema_registry.encoded_bundle(schema_paths)
+    headers = {"ETag": encoded["etag"], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == encoded["etag"]:
+        return Response(status_code=304, headers=headers)
+    
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=encoded["gzip"], media_type="application/json", headers=headers)
+    return Response(content=encoded["json"], media_type="application/json", headers=headers)
+
 @app.post("/api/upload/umdf")
-async def upload_umdf_file(
-    file: UploadFile = File(...)
-):
-    """Upload and process a UMDF file."""
+async def upload_umdf_file(request: Request):
+    """Upload and process a UMDF file.
+    
+    The body (multipart field "file", or a raw body with an X-Filename header)
+    is streamed to the managed spool directory and opened there by path.
+    """
     print("=== DEBUG: /api/upload/umdf route registered ===")
     
     try:
-        if not file.filename.endswith('.umdf'):
-            raise HTTPException(status_code=400, detail="Only .umdf files are supported")
-        
         # Check if we have stored credentials
         if not stored_credentials["password"]:
             return {"success": False, "error": "No credentials stored. Please log in first."}
         
         print(f"=== DEBUG: Using stored credentials for user: {stored_credentials['username']}")
-        print(f"=== DEBUG: Password length: {len(stored_credentials['password'])}")
-        print(f"=== DEBUG: Password starts with: {stored_credentials['password'][:3]}...")
         
-        # Read file content
-        file_content = await file.read()
-        print(f"=== DEBUG: File content size: {len(file_content)} bytes")
+        # Stream the upload to disk, hashing it on the way; the filename is
+        # checked as soon as it is known, before the body is read
+        try:
+            spooled = await spool_request(request, extensions=('.umdf',))
+        except UploadError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        print(f"=== DEBUG: Spooled {spooled['size']} bytes to {spooled['path']} (sha256 {spooled['sha256']})")
         
-        # Import the UMDF file with stored password
-        print(f"=== DEBUG: Calling umdf_importer.import_file with password length: {len(stored_credentials['password'])}")
-        result = umdf_importer.import_file(file_content, file.filename, stored_credentials["password"])
+        response = await _open_uploaded_file(spooled["path"], spooled["filename"])
+        response["sha256"] = spooled["sha256"]
+        return response
         
-        return {
-            "success": True,
-            "file_name": file.filename,
-            "file_size": len(file_content),
-            "modules": result.get('modules', []),
-            "module_count": result.get('module_count', 0),
-            "encounters": result.get('encounters', []),
-            "module_graph": result.get('module_graph', {})
-        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+async def _open_uploaded_file(file_path: str, filename: str) -> dict:
+    """Open an uploaded file with the reader and build the upload response."""
+    result = await async_reader.run(umdf_importer.open_path, file_path, filename, stored_credentials["password"])
+    # Build the schema bundle the viewer asks for next
+    if umdf_importer.schema_paths():
+        schema_registry.encoded_bundle(umdf_importer.schema_paths())
+    
+    # Keep a few recent uploads around; never the one the reader now holds
+    keep = [file_path]
+    if umdf_importer.index_cache:
+        keep.append(umdf_importer.index_cache.index_path(file_path))
+    prune_directory(DEFAULT_SPOOL_DIR, SPOOL_KEEP_FILES, exclude=keep)
+    prune_directory(upload_manager.files_dir, SPOOL_KEEP_FILES, exclude=keep)
+    
+    return {
+        "success": True,
+        "file_name": filename,
+        "file_size": os.path.getsize(file_path),
+        "modules": result.get('modules', []),
+        "module_count": result.get('module_count', 0),
+        "encounters": result.get('encounters', []),
+        "module_graph": result.get('module_graph', {})
+    }
+
+@app.post("/api/upload/umdf/init")
+async def init_chunked_upload(
+    filename: str = Form(...),
+    total_size: int = Form(...),
+    chunk_size: int = Form(DEFAULT_CHUNK_SIZE),
+    file_sha256: str = Form(None)
+):
+    """Start a resumable chunked upload of a UMDF file."""
+    try:
+        if not filename.endswith('.umdf'):
+            raise HTTPException(status_code=400, detail="Only .umdf files are supported")
+        
+        status = upload_manager.init_upload(filename, total_size, chunk_size, file_sha256)
+        return {"success": True, **status}
+        
+    except UploadError as e:
+        return {"success": False, "error": str(e)}
+
+@app.get("/api/upload/umdf/{upload_id}")
+async def get_chunked_upload_status(upload_id: str):
+    """Report which chunks of an upload have been received, for resuming."""
+    try:
+        return {"success": True, **upload_manager.get_status(upload_id)}
+    except UploadError as e:
+        return {"success": False, "error": str(e)}
+
+@app.put("/api/upload/umdf/{upload_id}/chunks/{index}")
+async def upload_chunk(upload_id: str, index: int, request: Request):
+    """Receive one chunk as the raw request body.
+    
+    The optional X-Chunk-SHA256 header is checked against the received bytes.
+    """
+    try:
+        chunk = await upload_manager.write_chunk(
+            upload_id,
+            index,
+            request.stream(),
+            request.headers.get("x-chunk-sha256")
+        )
+        return {"success": True, **chunk}
+    except UploadError as e:
+        return {"success": False, "error": str(e)}
+
+@app.post("/api/upload/umdf/{upload_id}/finalize")
+async def finalize_chunked_upload(upload_id: str):
+    """Verify a completed upload and open the assembled file with the reader."""
+    try:
+        if not stored_credentials["password"]:
+            return {"success": False, "error": "No credentials stored. Please log in first."}
+        
+        upload = upload_manager.finalize(upload_id)
+        return await _open_uploaded_file(upload["path"], upload["filename"])
         
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+@app.delete("/api/upload/umdf/{upload_id}")
+async def abort_chunked_upload(upload_id: str):
+    """Discard an unfinished upload."""
+    try:
+        upload_manager.abort(upload_id)
+        return {"success": True}
+    except UploadError as e:
+        return {"success": False, "error": str(e)}
 
 
 # Removed old write/read endpoints - now using UMDFReader directly in the importer
@@ -219,17 +328,19 @@ async def close_file():
         # Check if we have a UMDF importer with an open file
         if hasattr(umdf_importer, 'reader') and umdf_importer.reader:
             try:
-                # Close the file using the C++ reader
-                result = umdf_importer.reader.reader.closeFile()
-                if result.success:
+                # Close the file through the importer, which also drops its
+                # pooled readers, directory and open state (a file served
+                # from the module index may never have been opened)
+                result = await async_reader.run(umdf_importer.close_file)
+                if result:
                     print("=== DEBUG: File closed successfully ===")
                     
 
                     
                     return {"success": True, "message": "File closed successfully"}
                 else:
-                    print(f"=== DEBUG: Failed to close file: {result.message} ===")
-                    return {"success": False, "message": f"Failed to close file: {result.message}"}
+                    print(f"=== DEBUG: Failed to close file ===")
+                    return {"success": False, "message": "Failed to close file"}
             except Exception as close_error:
                 print(f"=== DEBUG: Error during file close: {close_error} ===")
                 return {"success": False, "message": f"Error closing file: {close_error}"}
@@ -266,13 +377,17 @@ async def edit_file(file_path: str = Form(...)):
             print(f"=== DEBUG: Writer object before open: {umdf_writer}")
             print(f"=== DEBUG: Writer current_file before open: {getattr(umdf_writer, 'current_file', 'NOT_SET')}")
             
-            result = umdf_writer.open_file(file_path, username, stored_credentials["password"])
+            result = await async_writer.open_file(file_path, username, stored_credentials["password"])
             
             print(f"=== DEBUG: open_file result: {result}")
             print(f"=== DEBUG: Writer current_file after open: {getattr(umdf_writer, 'current_file', 'NOT_SET')}")
             
             if result:
                 print("=== DEBUG: File opened successfully with writer ===")
+                reader_ready = await async_reader.run(edit_reader.open, file_path, stored_credentials["password"])
+                if not reader_ready:
+                    # get_module_data retries with the password it is given
+                    print("=== DEBUG: Warning: Could not open the file for reading during the edit session ===")
                 return {"success": True, "message": "File opened in edit mode"}
             else:
                 print("=== DEBUG: Failed to open file with writer ===")
@@ -298,7 +413,7 @@ async def cancel_edit(password: str = Form("")):
         
         # Call the writer's cancel and close method
         try:
-            result = umdf_writer.cancel_and_close()
+            result = await async_writer.cancel_and_close()
             if result:
                 print("=== DEBUG: Successfully canceled edit mode and closed writer ===")
                 
@@ -309,8 +424,8 @@ async def cancel_edit(password: str = Form("")):
                         # Use the password from the frontend
                         print(f"=== DEBUG: Using password for reopening: {'Yes' if password else 'No'}")
                         
-                        # Import the file again to reopen with reader
-                        result = umdf_importer.import_file_from_path(current_file, password)
+                        # Reopen with the reader (a no-op if the file is unchanged)
+                        result = await async_reader.run(umdf_importer.reopen_path, current_file, password)
                         if result:
                             print("=== DEBUG: Successfully reopened file with reader ===")
                             return {"success": True, "message": "Edit mode canceled and file reopened for viewing"}
@@ -356,7 +471,7 @@ async def add_encounter():
         
         # Call the writer's createNewEncounter method
         try:
-            encounter_id = umdf_writer.create_new_encounter()
+            encounter_id = await async_writer.create_new_encounter()
             
             if encounter_id:
                 print(f"=== DEBUG: Successfully created new encounter: {encounter_id} ===")
@@ -400,38 +515,25 @@ async def get_module_data(module_id: str, password: str = ""):
         
         # Check if we're in edit mode (writer is open) or view mode (reader is open)
         if hasattr(umdf_writer, 'current_file') and umdf_writer.current_file:
-            # We're in edit mode - use the writer's internal reader
-            print(f"=== DEBUG: In edit mode, using writer's internal reader for module: {module_id}")
+            # We're in edit mode - read through the edit session reader
+            print(f"=== DEBUG: In edit mode, using edit session reader for module: {module_id}")
             try:
-                # The writer should have its own internal reader for accessing module data
-                # We need to check what methods are available on the writer
-                print(f"=== DEBUG: Writer object: {umdf_writer}")
-                print(f"=== DEBUG: Writer methods: {dir(umdf_writer.writer)}")
+                if edit_reader.current_file != umdf_writer.current_file:
+                    opened = await async_reader.run(
+                        edit_reader.open,
+                        umdf_writer.current_file, password or stored_credentials["password"] or ""
+                    )
+                    if not opened:
+                        raise Exception("Failed to open the file for reading during the edit session")
                 
-                # Try to get module data through the writer
-                if hasattr(umdf_writer.writer, 'getModuleData'):
-                    module_data = umdf_writer.writer.getModuleData(module_id)
-                    print(f"=== DEBUG: Got module data through writer: {type(module_data)}")
-                else:
-                    # Fallback: try to reopen the file with the reader temporarily
-                    print(f"=== DEBUG: Writer doesn't have getModuleData, reopening with reader temporarily")
-                    # Store current writer state
-                    current_writer_file = umdf_writer.current_file
-                    
-                    # Temporarily reopen with reader using the password parameter
-                    print(f"=== DEBUG: Temporarily reopening file with password for module data access")
-                    temp_result = umdf_importer.import_file_from_path(current_writer_file, password)
-                    if temp_result:
-                        module_data = umdf_importer.reader.reader.getModuleData(module_id)
-                        print(f"=== DEBUG: Got module data through temporary reader: {type(module_data)}")
-                    else:
-                        raise Exception("Failed to temporarily reopen file with reader")
+                module_data = await async_reader.run(edit_reader.get_module_data, module_id)
+                print(f"=== DEBUG: Got module data through edit session reader: {type(module_data)}")
                         
             except Exception as writer_error:
-                print(f"=== DEBUG: Error getting module data through writer: {writer_error}")
+                print(f"=== DEBUG: Error getting module data through edit session reader: {writer_error}")
                 # Fallback to the original reader approach
                 if hasattr(umdf_importer, 'reader') and umdf_importer.reader:
-                    module_data = umdf_importer.reader.reader.getModuleData(module_id)
+                    module_data = await umdf_importer.get_module_data(module_id)
                     print(f"=== DEBUG: Fallback to reader: {type(module_data)}")
                 else:
                     raise writer_error
@@ -441,7 +543,8 @@ async def get_module_data(module_id: str, password: str = ""):
             if not hasattr(umdf_importer, 'reader') or not umdf_importer.reader:
                 raise Exception("No reader available")
             
-            module_data = umdf_importer.reader.reader.getModuleData(module_id)
+            # Read on a pooled reader so concurrent module requests run in parallel
+            module_data = await umdf_importer.get_module_data(module_id)
             print(f"=== DEBUG: Module data type: {type(module_data)}")
             print(f"=== DEBUG: Module data: {module_data}")
         
@@ -461,8 +564,8 @@ async def get_module_data(module_id: str, password: str = ""):
                 
                 # Handle different data types
                 if hasattr(actual_data, 'dump'):
-                    # This has a dump method (likely C++ object)
-                    data_content = actual_data.dump()
+                    # An nlohmann::json handle from bindings without the json type caster
+                    data_content = plain_json(actual_data)
                 elif isinstance(actual_data, list):
                     # Check if this is a list of ModuleData objects (image frames)
                     if actual_data and hasattr(actual_data[0], 'get_data'):
@@ -473,7 +576,8 @@ async def get_module_data(module_id: str, password: str = ""):
                         for i, frame in enumerate(actual_data):
                             try:
                                 # Each frame is a ModuleData object, extract its data
-                                frame_data = frame.get_data()
+                                # A view of the frame's buffer - no bytes copy before hexing
+                                frame_data = frame_buffer(frame)
                                 frame_metadata = frame.get_metadata()
                                 
                                 # Store frame information
@@ -489,10 +593,10 @@ async def get_module_data(module_id: str, password: str = ""):
                                     print(f"=== DEBUG: Frame {i} data type: {type(frame_data)}")
                                     print(f"=== DEBUG: Frame {i} metadata type: {type(frame_metadata)}")
                                     print(f"=== DEBUG: Frame {i} data length: {len(frame_data) if frame_data else 0}")
-                                    print(f"=== DEBUG: Frame {i} data first 20 bytes: {frame_data[:20] if frame_data else 'None'}")
-                                    print(f"=== DEBUG: Frame {i} data last 20 bytes: {frame_data[-20:] if frame_data else 'None'}")
-                                    print(f"=== DEBUG: Frame {i} hex string first 100 chars: {frame_data.hex()[:100] if frame_data else 'None'}")
-                                    print(f"=== DEBUG: Frame {i} hex string last 100 chars: {frame_data.hex()[-100:] if frame_data else 'None'}")
+                                    print(f"=== DEBUG: Frame {i} data first 20 bytes: {bytes(frame_data[:20]) if frame_data else 'None'}")
+                                    print(f"=== DEBUG: Frame {i} data last 20 bytes: {bytes(frame_data[-20:]) if frame_data else 'None'}")
+                                    print(f"=== DEBUG: Frame {i} hex string first 100 chars: {frame_data[:50].hex() if frame_data else 'None'}")
+                                    print(f"=== DEBUG: Frame {i} hex string last 100 chars: {frame_data[-50:].hex() if frame_data else 'None'}")
                                     
                             except Exception as frame_error:
                                 print(f"=== DEBUG: Error extracting frame {i}: {frame_error}")
@@ -508,13 +612,17 @@ async def get_module_data(module_id: str, password: str = ""):
                             "message": f"Image module with {len(actual_data)} frames loaded successfully",
                             "frame_data": frames_data
                         }
+                        if umdf_writer.current_file and module_id in umdf_writer.stripped_modules:
+                            # Added in this edit session beyond UMDF_PENDING_FRAME_BYTES
+                            data_content["frame_data_dropped"] = True
+                            data_content["message"] += "; frame data is readable once the file is saved"
                         
                         # For image modules, also extract the rich metadata structure
                         if hasattr(actual_module_data, 'get_metadata'):
                             try:
                                 image_metadata = actual_module_data.get_metadata()
                                 if hasattr(image_metadata, 'dump'):
-                                    image_metadata_content = image_metadata.dump()
+                                    image_metadata_content = plain_json(image_metadata)
                                 elif isinstance(image_metadata, list) and len(image_metadata) > 0:
                                     image_metadata_content = image_metadata[0]  # Get the first metadata item
                                 else:
@@ -583,7 +691,7 @@ async def get_module_data(module_id: str, password: str = ""):
                 # Handle metadata properly based on its type
                 try:
                     if hasattr(metadata, 'dump'):
-                        metadata_content = metadata.dump()
+                        metadata_content = plain_json(metadata)
                     elif isinstance(metadata, list):
                         metadata_content = {
                             "items": len(metadata),
@@ -657,12 +765,171 @@ async def get_module_data(module_id: str, password: str = ""):
             "data": {"type": "error", "message": f"Data extraction failed: {e}"}
         }
 
+def _frame_info(frame_index: int, frame) -> dict:
+    """Same per-frame structure get_module_data returns in frame_data."""
+    frame_view = frame_buffer(frame)
+    return {
+        "frame_index": frame_index,
+        "data": frame_view.hex() if frame_view else None,
+        "data_size": frame_view.nbytes,
+        "metadata": plain_json(frame.get_metadata())
+    }
+
+@app.get("/api/module/{module_id}/frames")
+async def get_module_frames(module_id: str, start: int = 0, count: int = 16):
+    """Get a range of frames of an image module, for viewers that load frames lazily."""
+    if not umdf_importer.reader or not umdf_importer.reader.current_file:
+        raise HTTPException(status_code=400, detail="No file open")
+    if count < 1 or count > 512:
+        raise HTTPException(status_code=400, detail="count must be between 1 and 512")
+    
+    try:
+        frame_range = await umdf_importer.get_frames(module_id, start, count)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return {
+        "success": True,
+        "module_id": module_id,
+        "total": frame_range["total"],
+        "start": frame_range["start"],
+        "frame_data": [
+            _frame_info(frame_range["start"] + offset, frame)
+            for offset, frame in enumerate(frame_range["frames"])
+        ]
+    }
+
+@app.get("/api/module/{module_id}/frames/{index}/raw")
+async def get_module_frame_raw(module_id: str, index: int):
+    """Get the binary data of one frame as application/octet-stream."""
+    if not umdf_importer.reader or not umdf_importer.reader.current_file:
+        raise HTTPException(status_code=400, detail="No file open")
+    
+    try:
+        total, frame_view = await umdf_importer.get_frame_view(module_id, index)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if frame_view is None:
+        raise HTTPException(status_code=404, detail=f"Frame {index} out of range (module has {total} frames)")
+    
+    return Response(
+        content=frame_view.tobytes(),
+        media_type="application/octet-stream",
+        headers={"X-Frame-Count": str(total)}
+    )
+
+@app.post("/api/modules/data")
+async def get_modules_data(request: Request):
+    """Fetch several modules in one call (body: {"module_ids": [...]}).
+    
+    Returns each module's metadata and, for image modules, the frame count
+    only - frames are fetched separately through /api/module/{id}/frames.
+    """
+    if not umdf_importer.reader or not umdf_importer.reader.current_file:
+        raise HTTPException(status_code=400, detail="No file open")
+    
+    body = await request.json()
+    module_ids = body.get("module_ids") if isinstance(body, dict) else None
+    if not isinstance(module_ids, list) or not all(isinstance(module_id, str) for module_id in module_ids):
+        raise HTTPException(status_code=400, detail="module_ids must be a list of strings")
+    
+    results = await umdf_importer.get_modules_data(module_ids)
+    
+    modules = {}
+    for module_id, module_data in results.items():
+        if not module_data.has_value():
+            modules[module_id] = {"success": False, "error": module_data.error()}
+            continue
+        
+        actual_module_data = module_data.value()
+        data = actual_module_data.get_data()
+        if isinstance(data, list) and data and hasattr(data[0], 'get_data'):
+            data_content = {"type": "image", "frame_count": len(data)}
+        elif isinstance(data, list):
+            data_content = {"type": "tabular", "record_count": len(data), "data": data}
+        else:
+            data_content = {"type": "unknown", "raw_data": str(data)}
+        
+        metadata = plain_json(actual_module_data.get_metadata())
+        if isinstance(metadata, list) and len(metadata) == 1:
+            metadata = metadata[0]
+        modules[module_id] = {
+            "success": True,
+            "metadata": metadata,
+            "data": data_content
+        }
+    
+    return {"success": True, "modules": modules}
+
+# Historical versions fetched per /api/module/{module_id}/audit/versions call
+AUDIT_VERSIONS_MAX_BATCH = 100
+
+@app.get("/api/module/{module_id}/audit")
+async def get_module_audit(module_id: str, offset: int = 0, limit: int = AUDIT_PAGE_SIZE):
+    """Get a page of a module's audit trail, in the order the file records it."""
+    if not umdf_importer.reader or not umdf_importer.reader.current_file:
+        raise HTTPException(status_code=400, detail="No file open")
+    if offset < 0 or limit < 1 or limit > 500:
+        raise HTTPException(status_code=400, detail="offset must be >= 0 and limit between 1 and 500")
+    
+    try:
+        page = await async_reader.get_audit_page(module_id, offset, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return {"success": True, "module_id": module_id, "limit": limit, **page}
+
+@app.post("/api/module/{module_id}/audit/versions")
+async def get_module_audit_versions(module_id: str, request: Request):
+    """Reconstruct the module at several audit trail entries (body: {"indices": [...]}).
+    
+    Indices are the ``index`` values of /api/module/{module_id}/audit entries.
+    Reconstructed versions are cached, so paging back and forth through a
+    long history only reads each version once.
+    """
+    if not umdf_importer.reader or not umdf_importer.reader.current_file:
+        raise HTTPException(status_code=400, detail="No file open")
+    
+    body = await request.json()
+    indices = body.get("indices") if isinstance(body, dict) else None
+    if not isinstance(indices, list) or not all(isinstance(index, int) and not isinstance(index, bool) for index in indices):
+        raise HTTPException(status_code=400, detail="indices must be a list of integers")
+    if len(indices) > AUDIT_VERSIONS_MAX_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {AUDIT_VERSIONS_MAX_BATCH} versions per request")
+    
+    try:
+        versions = await async_reader.get_audit_versions(module_id, indices)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return {
+        "success": True,
+        "module_id": module_id,
+        # JSON object keys are strings
+        "versions": {str(index): version for index, version in versions.items()}
+    }
+
 @app.get("/api/modules/{file_id}")
 async def get_file_modules(file_id: str):
-    """Get modules from a medical file."""
-    # TODO: Use C++ reader to get modules
-    # For now, return empty list
-    return {"modules": []}
+    """List the modules of the open file without reading their data.
+    
+    ``file_id`` is the open file's name (or "current"). Each entry holds the
+    module's uuid, schema, type, encounter and parent.
+    """
+    current_file = async_reader.current_file
+    if not current_file:
+        raise HTTPException(status_code=400, detail="No file open")
+    if file_id not in ("current", os.path.basename(current_file)):
+        raise HTTPException(status_code=404, detail=f"File {file_id} is not open")
+    
+    modules = umdf_importer.directory
+    if modules is None:
+        modules = await async_reader.list_modules()
+    return {"file": os.path.basename(current_file), "module_count": len(modules), "modules": modules}
 
 @app.get("/api/cpp/schemas")
 async def get_cpp_schemas():
@@ -698,8 +965,12 @@ async def check_auth():
         }
 
 @app.post("/api/save-file")
-async def save_file():
-    """Save the current file and close the writer, then reopen with reader."""
+async def save_file(discard_failed: bool = False):
+    """Save the current file and close the writer, then reopen with reader.
+    
+    Refused with 409 while queued writes have failed, listing them; pass
+    discard_failed=true to save without them.
+    """
     try:
         # Check authentication
         if not stored_credentials["username"] or not stored_credentials["password"]:
@@ -713,7 +984,7 @@ async def save_file():
         
         # Close the file using the writer (this saves and finalizes the file)
         try:
-            result = umdf_writer.close_file()
+            result = await async_writer.close_file(discard_failed)
             print(f"=== DEBUG: Writer close_file result: {result}")
             
             if result:
@@ -725,7 +996,7 @@ async def save_file():
                     password = stored_credentials["password"]
                     
                     # Reopen the file with the reader
-                    reopen_result = umdf_importer.import_file_from_path(current_file_path, password)
+                    reopen_result = await async_reader.run(umdf_importer.reopen_path, current_file_path, password)
                     if reopen_result:
                         print(f"=== DEBUG: File reopened successfully with reader")
                     else:
@@ -739,6 +1010,12 @@ async def save_file():
                 print(f"=== DEBUG: Failed to save file")
                 raise HTTPException(status_code=500, detail="Failed to save file")
                 
+        except FailedOperationsError as failed_error:
+            print(f"=== DEBUG: Not saving, {failed_error} ===")
+            raise HTTPException(status_code=409, detail={
+                "message": "Some queued writes failed; save again with discard_failed=true to keep the file without them, or cancel the edit",
+                "failed_operations": [operation.to_dict() for operation in failed_error.operations]
+            })
         except Exception as writer_error:
             print(f"=== DEBUG: Error in writer.close_file: {writer_error} ===")
             raise HTTPException(status_code=500, detail=f"Failed to save file: {writer_error}")
@@ -787,6 +1064,18 @@ async def create_module(
         is_image_module = "image" in schema_path.lower()
         print(f"=== DEBUG: Is image module: {is_image_module} ===")
         
+        # Reject data that does not match the schema before it reaches the C++ writer.
+        # Frame data of image modules is pixel arrays, so only their metadata is checked.
+        validator = schema_registry.validator(schema_path)
+        if validator is None:
+            print(f"=== DEBUG: Schema {schema_path} not found, skipping validation ===")
+        else:
+            loop = asyncio.get_running_loop()
+            errors = await loop.run_in_executor(None, functools.partial(validator.validate, metadata, data, validate_data=not is_image_module))
+            if errors:
+                print(f"=== DEBUG: {errors.count} validation errors: {errors.errors[:5]} ===")
+                raise HTTPException(status_code=422, detail=f"Module data does not match {schema_path}: {errors.summary()}")
+        
         if is_image_module and "frames" in data:
             print(f"=== DEBUG: Processing image module with {len(data['frames'])} frames ===")
             
@@ -837,25 +1126,14 @@ async def create_module(
                     try:
                         retrieved_metadata = frame_module_data.get_metadata()
                         print(f"  Retrieved metadata type: {type(retrieved_metadata)}")
-                        if hasattr(retrieved_metadata, 'dump'):
-                            retrieved_content = retrieved_metadata.dump()
-                            print(f"  Retrieved metadata content: {retrieved_content}")
-                        else:
-                            print(f"  Retrieved metadata: {retrieved_metadata}")
+                        print(f"  Retrieved metadata: {plain_json(retrieved_metadata)}")
                     except Exception as e:
                         print(f"  Error retrieving metadata: {e}")
                     
                     # Set the pixel data as binary data
                     if pixel_data:
-                        # Flatten the 2D pixel array into 1D
-                        flattened_pixels = []
-                        for row in pixel_data:
-                            flattened_pixels.extend(row)
-                        
-                        # Convert to bytes for binary data
-                        import struct
-                        pixel_bytes = struct.pack(f'<{len(flattened_pixels)}H', *flattened_pixels)
-                        frame_module_data.set_binary_data(pixel_bytes)
+                        # Little-endian uint16 in row order, handed to the binding as a buffer
+                        set_frame_buffer(frame_module_data, np.asarray(pixel_data, dtype='<u2'))
                     
                     frame_module_data_list.append(frame_module_data)
                     print(f"=== DEBUG: Successfully created ModuleData for frame {i+1} ===")
@@ -909,7 +1187,7 @@ async def create_module(
                 print(f"=== DEBUG: Converted parent_module_id '{parent_module_id}' to UUID: {parent_module_uuid}")
                 
                 # Call the C++ method directly with the ModuleData object
-                result = umdf_writer.writer.addVariantModule(parent_module_uuid, schema_path, main_module_data)
+                result = await async_writer.add_module_data("addVariantModule", parent_module_uuid, schema_path, main_module_data)
                 print(f"=== DEBUG: Variant module creation result: {result} ===")
                 
             elif relationship_type == 'annotation' and parent_module_id:
@@ -924,8 +1202,8 @@ async def create_module(
                 parent_module_uuid = umdf.UUID.fromString(parent_module_id)
                 print(f"=== DEBUG: Converted parent_module_id '{parent_module_id}' to UUID: {parent_module_uuid}")
                 
-                # Call addAnnotationModule (assuming this function exists)
-                result = umdf_writer.add_annotation_module(parent_module_uuid, schema_path, main_module_data)
+                # Same C++ call /api/import-dicom uses for annotations
+                result = await async_writer.add_module_data("addAnnotation", parent_module_uuid, schema_path, main_module_data)
                 print(f"=== DEBUG: Annotation module creation result: {result} ===")
                 
             else:
@@ -937,7 +1215,7 @@ async def create_module(
                 print(f"=== DEBUG: main_module_data type: {type(main_module_data)} ===")
                 print(f"=== DEBUG: main_module_data attributes: {[attr for attr in dir(main_module_data) if not attr.startswith('_')]} ===")
                 
-                result = umdf_writer.writer.addModuleToEncounter(encounter_uuid, schema_path, main_module_data)
+                result = await async_writer.add_module_data("addModuleToEncounter", encounter_uuid, schema_path, main_module_data)
                 print(f"=== DEBUG: Module creation result: {result} ===")
             
             # Extract the UUID from the ExpectedUUID result
@@ -1033,7 +1311,7 @@ async def import_dicom(
         # Convert the DICOM folder
         print("=== DEBUG: Converting DICOM folder... ===")
         print(f"=== DEBUG: About to call converter.convert_folder with: '{full_folder_path}' ===")
-        umdf_data = converter.convert_folder(full_folder_path)
+        umdf_data = await asyncio.get_running_loop().run_in_executor(None, converter.convert_folder, full_folder_path)
         
         print("=== DEBUG: Raw converter output structure ===")
         print(f"  Top level keys: {list(umdf_data.keys())}")
@@ -1089,105 +1367,17 @@ async def import_dicom(
             if frames:
                 print(f"=== DEBUG: Processing {len(frames)} frames directly to UMDF writer ===")
                 
-                # Create frame ModuleData objects
-                frame_module_data_list = []
-                for i, frame in enumerate(frames):
-                    print(f"=== DEBUG: Processing frame {i+1}/{len(frames)} ===")
-                    
-                    # Extract frame metadata (all fields except pixelData)
-                    frame_metadata = {k: v for k, v in frame.items() if k != 'pixelData'}
-                    pixel_data = frame.get('pixelData', [])
-                    
-                    print(f"=== DEBUG: Frame {i+1} metadata: {list(frame_metadata.keys())} ===")
-                    
-                    try:
-                        # Create frame ModuleData
-                        import umdf
-                        frame_module_data = umdf.ModuleData()
-                        
-                        # Set the frame metadata
-                        frame_module_data.set_metadata(frame_metadata)
-                        
-                        # Set the pixel data as binary data
-                        if pixel_data:
-                            print(f"=== DEBUG: Frame {i+1} pixel data processing:")
-                            print(f"  Pixel data type: {type(pixel_data)}")
-                            print(f"  Pixel data length: {len(pixel_data) if isinstance(pixel_data, list) else 'N/A'}")
-                            
-                            if isinstance(pixel_data, list) and len(pixel_data) > 0:
-                                print(f"  First row length: {len(pixel_data[0]) if pixel_data[0] else 0}")
-                                print(f"  First row first 10 values: {pixel_data[0][:10] if pixel_data[0] else 'N/A'}")
-                                print(f"  First row last 10 values: {pixel_data[0][-10:] if pixel_data[0] else 'N/A'}")
-                                print(f"  Last row first 10 values: {pixel_data[-1][:10] if pixel_data[-1] else 'N/A'}")
-                                print(f"  Last row last 10 values: {pixel_data[-1][-10:] if pixel_data[-1] else 'N/A'}")
-                            
-                            # Flatten the 2D pixel array into 1D
-                            flattened_pixels = []
-                            for row in pixel_data:
-                                flattened_pixels.extend(row)
-                            
-                            print(f"  Flattened pixels length: {len(flattened_pixels)}")
-                            print(f"  Flattened pixels first 20: {flattened_pixels[:20]}")
-                            print(f"  Flattened pixels last 20: {flattened_pixels[-20:]}")
-                            print(f"  Min pixel value: {min(flattened_pixels) if flattened_pixels else 'N/A'}")
-                            print(f"  Max pixel value: {max(flattened_pixels) if flattened_pixels else 'N/A'}")
-                            
-                            # Convert to bytes for binary data
-                            import struct
-                            pixel_bytes = struct.pack(f'<{len(flattened_pixels)}H', *flattened_pixels)
-                            print(f"  Pixel bytes length: {len(pixel_bytes)}")
-                            print(f"  Pixel bytes first 40 chars (hex): {pixel_bytes[:20].hex()}")
-                            print(f"  Pixel bytes last 40 chars (hex): {pixel_bytes[-20:].hex()}")
-                            
-                            frame_module_data.set_binary_data(pixel_bytes)
-                            print(f"  Successfully set binary data for frame {i+1}")
-                        else:
-                            print(f"=== DEBUG: Frame {i+1} has no pixel data")
-                        
-                        frame_module_data_list.append(frame_module_data)
-                        print(f"=== DEBUG: Successfully created ModuleData for frame {i+1} ===")
-                    except Exception as frame_error:
-                        print(f"=== DEBUG: Error creating ModuleData for frame {i+1}: {frame_error} ===")
-                        raise HTTPException(status_code=500, detail=f"Failed to create frame {i+1}: {frame_error}")
-                
-                # Create the main ModuleData object
-                import umdf
-                main_module_data = umdf.ModuleData()
-                
-                # Set the image metadata
-                main_module_data.set_metadata(series_metadata)
-                
-                # Set the frame data as nested data
-                # This is how the UMDF reader expects to access image frame data
-                if frame_module_data_list:
-                    main_module_data.set_nested_data(frame_module_data_list)
-                    print(f"=== DEBUG: Set {len(frame_module_data_list)} frame objects as nested data ===")
+                # Build the image ModuleData (frames attached as nested data)
+                try:
+                    main_module_data = build_image_module_data(series_metadata, frames)
+                    print(f"=== DEBUG: Built image module with {len(frames)} frame objects as nested data ===")
+                except Exception as frame_error:
+                    print(f"=== DEBUG: Error creating frame ModuleData: {frame_error} ===")
+                    raise HTTPException(status_code=500, detail=f"Failed to create frames: {frame_error}")
                 
                 # Add the module to the encounter
                 try:
-                    # DEBUG: Analyze the pixel data being written
-                    print(f"=== DEBUG: PIXEL DATA ANALYSIS BEFORE WRITING ===")
-                    print(f"  Number of frames: {len(frame_module_data_list)}")
-                    
-                    for i, frame_data in enumerate(frame_module_data_list):
-                        print(f"  Frame {i} analysis:")
-                        print(f"    Type: {type(frame_data)}")
-                        print(f"    Object: {frame_data}")
-                        
-                        # Try to access the binary data that was set
-                        try:
-                            # Check if we can access the binary data
-                            print(f"    Frame {i} methods: {[m for m in dir(frame_data) if not m.startswith('_')]}")
-                            
-                            # This is a bit hacky but let's see what we can access
-                            if hasattr(frame_data, '_pybind11_conduit_v1_'):
-                                print(f"    Frame {i} has pybind11 conduit")
-                            
-                        except Exception as e:
-                            print(f"    Frame {i} error accessing data: {e}")
-                    
-                    print(f"  Main module data object: {main_module_data}")
-                    print(f"  Main module methods: {[m for m in dir(main_module_data) if not m.startswith('_')]}")
+                    import umdf
                     
                     # Determine which method to call based on parameters
                     schema_path = './schemas/image/CT/v1.0.json'
@@ -1206,7 +1396,7 @@ async def import_dicom(
                         print(f"=== DEBUG: Converted parent_module_id '{parent_module_id}' to UUID: {parent_module_uuid}")
                         
                         # Call the C++ method directly with the ModuleData object
-                        result = umdf_writer.writer.addVariantModule(parent_module_uuid, schema_path, main_module_data)
+                        result = await async_writer.add_module_data("addVariantModule", parent_module_uuid, schema_path, main_module_data)
                         
                         print(f"=== DEBUG: Variant module creation result: {result} ===")
                         
@@ -1224,7 +1414,7 @@ async def import_dicom(
                         print(f"=== DEBUG: Converted parent_module_id '{parent_module_id}' to UUID: {parent_module_uuid}")
                         
                         # Call the C++ method directly with the ModuleData object
-                        result = umdf_writer.writer.addAnnotation(parent_module_uuid, schema_path, main_module_data)
+                        result = await async_writer.add_module_data("addAnnotation", parent_module_uuid, schema_path, main_module_data)
                         
                         print(f"=== DEBUG: Annotation module creation result: {result} ===")
                         
@@ -1245,7 +1435,7 @@ async def import_dicom(
                         print(f"=== DEBUG: main_module_data type: {type(main_module_data)} ===")
                         print(f"=== DEBUG: main_module_data attributes: {[attr for attr in dir(main_module_data) if not attr.startswith('_')]} ===")
                         
-                        result = umdf_writer.writer.addModuleToEncounter(encounter_uuid, schema_path, main_module_data)
+                        result = await async_writer.add_module_data("addModuleToEncounter", encounter_uuid, schema_path, main_module_data)
                         print(f"=== DEBUG: Module creation result: {result} ===")
                     
                     # Extract the UUID from the ExpectedUUID result
@@ -1288,6 +1478,306 @@ async def import_dicom(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"DICOM import failed: {e}")
 
+async def _queue_tabular_module(encounter_id: str, module: dict) -> WriterOperation:
+    """Queue a tabular module built by the FHIR importers (rows plus a schema_path in its metadata)."""
+    metadata = module["metadata"]
+    schema_path = metadata.get("schema_path")
+    if not schema_path:
+        raise ValueError(f"No schema file configured for {module['schema_id']}")
+    return await async_writer.queue_module_to_encounter(
+        encounter_id,
+        schema_path,
+        {k: v for k, v in metadata.items() if k != "schema_path"},
+        module["data"]["rows"],
+        stored_credentials["username"]
+    )
+
+def _queued_outcome(queued_modules: list) -> tuple:
+    """Split flushed (name, WriterOperation) pairs into written module ids and failure reports."""
+    written = [operation.result for _, operation in queued_modules if operation.status == WriterOperation.APPLIED]
+    failed = [
+        {"name": name, **operation.to_dict()}
+        for name, operation in queued_modules if operation.status != WriterOperation.APPLIED
+    ]
+    return written, failed
+
+@app.post("/api/import/fhir-ndjson")
+async def import_fhir_ndjson(request: Request, encounter_id: str, schema_id: str = None):
+    """Stream a FHIR Bulk Data NDJSON export into the open file as tabular modules.
+    
+    The export (multipart field "file" or a raw body with X-Filename) is spooled
+    to disk, converted line by line and written in batches of rows, one
+    module per resource type per batch.
+    """
+    try:
+        # Check authentication
+        if not stored_credentials["username"] or not stored_credentials["password"]:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        
+        if not umdf_writer.current_file:
+            raise HTTPException(status_code=400, detail="Not in edit mode. Please enter edit mode first.")
+        
+        # Kept apart from the UMDF spool so pruning never touches an export mid-import
+        spooled = await spool_request(request, spool_dir=os.path.join(DEFAULT_UPLOAD_DIR, "ndjson"), suffix=".ndjson")
+        print(f"=== DEBUG: Spooled NDJSON export {spooled['filename']} ({spooled['size']} bytes) ===")
+        
+        # Modules are queued and written in batches (see UMDFWriter.flush)
+        queued_modules = []
+        
+        async def write_module(module: dict) -> None:
+            queued_modules.append((module["name"], await _queue_tabular_module(encounter_id, module)))
+        
+        try:
+            summary = await file_importer.import_fhir_ndjson(spooled["path"], schema_id, module_sink=write_module)
+        finally:
+            os.unlink(spooled["path"])
+            await async_writer.flush()
+        
+        written_modules, failed_modules = _queued_outcome(queued_modules)
+        
+        return {
+            "success": not failed_modules,
+            "message": f"Imported {summary['lines'] - summary['errors']} FHIR resources"
+                       + (f"; {len(failed_modules)} modules could not be written" if failed_modules else ""),
+            "module_ids": written_modules,
+            "failed_modules": failed_modules,
+            **summary
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"=== DEBUG: Error in FHIR NDJSON import: {e} ===")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"FHIR NDJSON import failed: {e}")
+
+@app.post("/api/import/fhir-bundle")
+async def import_fhir_bundle(request: Request, encounter_id: str, schema_id: str = None):
+    """Import a FHIR Bundle into the open file as one tabular module per resource type.
+    
+    The Bundle (multipart field "file" or a raw body with X-Filename) is
+    spooled to disk, then its entries, including those of nested Bundles,
+    are converted and grouped by resource type.
+    """
+    try:
+        # Check authentication
+        if not stored_credentials["username"] or not stored_credentials["password"]:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        
+        if not umdf_writer.current_file:
+            raise HTTPException(status_code=400, detail="Not in edit mode. Please enter edit mode first.")
+        
+        spooled = await spool_request(request, spool_dir=os.path.join(DEFAULT_UPLOAD_DIR, "fhir"), suffix=".json")
+        try:
+            with open(spooled["path"], "rb") as f:
+                content = f.read()
+        finally:
+            os.unlink(spooled["path"])
+        
+        try:
+            result = await file_importer.import_file(content, spooled["filename"], "fhir", schema_id)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if result.get("resource_type") != "Bundle":
+            raise HTTPException(status_code=400, detail=f"Expected a FHIR Bundle, got {result.get('resource_type')}")
+        
+        queued_modules = []
+        try:
+            for module in result["modules"]:
+                queued_modules.append((module["name"], await _queue_tabular_module(encounter_id, module)))
+        finally:
+            await async_writer.flush()
+        
+        written_modules, failed_modules = _queued_outcome(queued_modules)
+        
+        return {
+            "success": not failed_modules,
+            "message": f"Imported {result['entry_count'] - result['errors']} FHIR resources"
+                       + (f"; {len(failed_modules)} modules could not be written" if failed_modules else ""),
+            "module_ids": written_modules,
+            "failed_modules": failed_modules,
+            **{k: v for k, v in result.items() if k != "modules"}
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"=== DEBUG: Error in FHIR Bundle import: {e} ===")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"FHIR Bundle import failed: {e}")
+
+# Schema tiled image modules are written with
+TILED_IMAGE_SCHEMA_PATH = './schemas/image/v1.0.json'
+
+# Tile lookups of the most recently viewed tiled modules, keyed by (file, module id)
+TILE_CACHE_MODULES = 4
+tile_index_cache = OrderedDict()
+
+# Encodes the tiles of every tiled image import (stopped on shutdown)
+tile_encoder = PreviewEncoder(codec=TILE_CODEC)
+
+@app.post("/api/import/tiled-image")
+async def import_tiled_image(request: Request, encounter_id: str):
+    """Import a very large 2-D image (whole-slide scan, high-res photo) as a tile pyramid.
+    
+    The image (multipart field "file" or a raw body with X-Filename) is spooled
+    to disk and cut into fixed-size tiles at every pyramid level, a band of
+    rows at a time. The encoded tiles are parked in a temporary file until
+    the whole pyramid is done; only then are they written, in part modules
+    of up to TILES_PER_PART frames, followed by the tiled image module that
+    lists the parts. The viewer only fetches the tiles it shows through
+    /api/module/{module_id}/tiles.
+    """
+    try:
+        # Check authentication
+        if not stored_credentials["username"] or not stored_credentials["password"]:
+            raise HTTPException(status_code=401, detail="Not authenticated")
+        
+        if not umdf_writer.current_file:
+            raise HTTPException(status_code=400, detail="Not in edit mode. Please enter edit mode first.")
+        
+        image_dir = os.path.join(DEFAULT_UPLOAD_DIR, "images")
+        spooled = await spool_request(request, spool_dir=image_dir, suffix=".img")
+        print(f"=== DEBUG: Spooled image {spooled['filename']} ({spooled['size']} bytes) for tiling ===")
+        
+        import umdf
+        encounter_uuid = umdf.UUID.fromString(encounter_id)
+        loop = asyncio.get_running_loop()
+        
+        def encode_pyramid(tile_spool):
+            # Decoding, tiling and encoding are CPU bound - keep them off the event loop
+            reader = BandReader(spooled["path"])
+            metadata = tiled_image_metadata(reader, spooled["filename"])
+            for part in iter_tile_parts(iter_pyramid_tiles(reader, tile_encoder), metadata["pyramid"]):
+                tile_spool.add(part)
+            return metadata
+        
+        with TileSpool(image_dir) as tile_spool:
+            try:
+                metadata = await loop.run_in_executor(None, encode_pyramid, tile_spool)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            finally:
+                os.unlink(spooled["path"])
+            
+            # Nothing has been written yet; the pyramid is complete on disk
+            pyramid = metadata["pyramid"]
+            preview_tile = None
+            for part in tile_spool.parts:
+                part_module_data = await loop.run_in_executor(
+                    None, lambda: build_tiled_image_module_data(tile_part_metadata(metadata, part), tile_spool.tiles(part))
+                )
+                result = await async_writer.add_module_data("addModuleToEncounter", encounter_uuid, TILED_IMAGE_SCHEMA_PATH, part_module_data)
+                if not result.has_value():
+                    written = [written_part["module_id"] for written_part in metadata["tileParts"]]
+                    # The C++ writer cannot remove modules; cancelling the edit discards them
+                    raise HTTPException(
+                        status_code=500,
+                        detail=f"Failed to write tiles: {result.error()}. Cancel the edit to discard the {len(written)} part modules already written: {written}"
+                    )
+                metadata["tileParts"].append({
+                    "module_id": result.value().toString(),
+                    "level": part["level"],
+                    "first": part["first"],
+                    "count": len(part["tiles"])
+                })
+                if part["level"] == pyramid["levelCount"] - 1:
+                    # The top level is a single tile - keep it as the module's preview
+                    preview_tile = next(tile_spool.tiles(part))
+        
+        module_data = build_tiled_image_module_data(metadata, [preview_tile] if preview_tile else [])
+        result = await async_writer.add_module_data("addModuleToEncounter", encounter_uuid, TILED_IMAGE_SCHEMA_PATH, module_data)
+        if not result.has_value():
+            raise HTTPException(status_code=500, detail=f"Failed to create module: {result.error()}. Cancel the edit to discard its part modules.")
+        
+        return {
+            "success": True,
+            "message": f"Imported {pyramid['width']}x{pyramid['height']} image as {pyramid['levelCount']} tiled levels",
+            "module_id": result.value().toString(),
+            "part_count": len(metadata["tileParts"]),
+            "pyramid": pyramid
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"=== DEBUG: Error in tiled image import: {e} ===")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Tiled image import failed: {e}")
+
+async def _get_tile_index(module_id: str) -> dict:
+    """Load (or reuse) the pyramid layout and tile part lookup of a tiled image module.
+    
+    Only the module's metadata and its single preview frame are read; tiles
+    are read one at a time from their part modules.
+    """
+    reader = umdf_importer.reader
+    if not reader or not reader.current_file:
+        raise HTTPException(status_code=400, detail="No file open")
+    
+    cache_key = (reader.current_file, module_id)
+    cached = tile_index_cache.get(cache_key)
+    if cached is not None:
+        tile_index_cache.move_to_end(cache_key)
+        return cached
+    
+    module_data = await umdf_importer.get_module_data(module_id)
+    if not module_data.has_value():
+        raise HTTPException(status_code=404, detail=module_data.error())
+    
+    metadata = module_data.value().get_metadata()
+    if isinstance(metadata, list):
+        metadata = metadata[0] if metadata else {}
+    if not isinstance(metadata, dict) or metadata.get("encoding") != "tiled" or "tileParts" not in metadata:
+        raise HTTPException(status_code=400, detail="Module is not a tiled image")
+    
+    cached = {
+        "metadata": metadata,
+        "pyramid": metadata["pyramid"],
+        "tile_format": metadata.get("tileFormat", "jpeg"),
+        "parts": index_tiles(metadata)
+    }
+    tile_index_cache[cache_key] = cached
+    while len(tile_index_cache) > TILE_CACHE_MODULES:
+        tile_index_cache.popitem(last=False)
+    return cached
+
+@app.get("/api/module/{module_id}/tiles")
+async def get_tile_pyramid(module_id: str):
+    """Get the pyramid layout (levels, tile size, tile grid) of a tiled image module."""
+    tile_index = await _get_tile_index(module_id)
+    return {
+        "success": True,
+        "tile_format": tile_index["tile_format"],
+        "pyramid": tile_index["pyramid"]
+    }
+
+@app.get("/api/module/{module_id}/tiles/{level}/{column}/{row}")
+async def get_tile(module_id: str, level: int, column: int, row: int):
+    """Get one encoded tile of a tiled image module."""
+    tile_index = await _get_tile_index(module_id)
+    location = locate_tile(tile_index["metadata"], tile_index["parts"], level, column, row)
+    if location is None:
+        raise HTTPException(status_code=404, detail=f"No tile at level {level}, column {column}, row {row}")
+    
+    part_id, frame_index = location
+    try:
+        frame_range = await umdf_importer.get_frames(part_id, frame_index, 1)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    if not frame_range["frames"]:
+        raise HTTPException(status_code=404, detail=f"Tile part {part_id} has no frame {frame_index}")
+    
+    return Response(
+        content=frame_buffer(frame_range["frames"][0]).tobytes(),
+        media_type=f"image/{tile_index['tile_format']}",
+        # Tiles of a module never change once written
+        headers={"Cache-Control": "private, max-age=86400"}
+    )
+
 # Catch-all route for React app (must be last)
 @app.get("/{full_path:path}")
 async def serve_react_app(request: Request, full_path: str):
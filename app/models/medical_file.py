@@ -5,7 +5,7 @@ import uuid
 
 class Module(BaseModel):
     """Represents a module in the medical file format."""
-    id: str
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     schema_id: str  # Reference to JSON schema
     data: Dict[str, Any]  # The actual data
@@ -2,12 +2,16 @@ import json
 from typing import Dict, Any, Optional
 from pathlib import Path
 
+from .validation import compile_schema, ValidationErrors
+
 
 class SchemaManager:
     """Manages JSON schema definitions for the medical file format."""
     
     def __init__(self):
         self.schemas = self._load_default_schemas()
+        # Compiled validators, built on first use of each schema
+        self._validators = {}
     
     def _load_default_schemas(self) -> Dict[str, Dict[str, Any]]:
         """Load default schema definitions."""
@@ -84,17 +88,22 @@ class SchemaManager:
     def add_schema(self, name: str, schema: Dict[str, Any]) -> None:
         """Add a new schema."""
         self.schemas[name] = schema
+        self._validators.pop(name, None)
     
     def validate_data(self, schema_name: str, data: Dict[str, Any]) -> bool:
-        """Basic validation of data against schema."""
+        """Validate data against a schema (types, enums, ranges and required fields)."""
+        return not self.validation_errors(schema_name, data)
+    
+    def validation_errors(self, schema_name: str, data: Dict[str, Any]) -> ValidationErrors:
+        """Validate data against a schema and return the errors found."""
+        errors = ValidationErrors()
         schema = self.get_schema(schema_name)
         if not schema:
-            return False
-        
-        # Basic validation - in a real implementation, you'd use a proper JSON schema validator
-        required_fields = schema.get("required", [])
-        for field in required_fields:
-            if field not in data:
-                return False
+            errors.add(schema_name, "unknown schema")
+            return errors
         
-        return True 
\ No newline at end of file
+        validator = self._validators.get(schema_name)
+        if validator is None:
+            validator = self._validators[schema_name] = compile_schema(schema)
+        validator(data, "", errors)
+        return errors 
\ No newline at end of file
@@ -0,0 +1,378 @@
+import os
+import copy
+import gzip
+import json
+import time
+import hashlib
+import posixpath
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+
+from .validation import ModuleValidator
+
+# Default schemas folder (the project's ./schemas, which module schema_paths refer to)
+DEFAULT_SCHEMAS_DIR = Path(__file__).resolve().parent.parent.parent / "schemas"
+
+# Seconds between checks of the schemas folder for added, changed or removed files
+SCHEMA_POLL_INTERVAL = float(os.getenv("UMDF_SCHEMA_POLL_INTERVAL", "2"))
+
+# Encoded bundles kept per registry (one per distinct set of requested schemas)
+SCHEMA_BUNDLE_CACHE_SIZE = 16
+
+
+class _SchemaEntry:
+    __slots__ = ("key", "mtime_ns", "size", "content", "schema", "error")
+
+    def __init__(self, key: str, mtime_ns: int, size: int, content: str):
+        self.key = key
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.content = content
+        try:
+            self.schema = json.loads(content)
+            self.error = None
+        except ValueError as e:
+            self.schema = None
+            self.error = str(e)
+
+
+class SchemaRegistry:
+    """In-memory index of the JSON schema files under the schemas folder.
+
+    Every schema is read and parsed once; titles, raw content and the schema
+    listing are then served from memory. The folder is re-checked (a stat of
+    each file, no reads) at most every ``poll_interval`` seconds, and only
+    files whose mtime or size changed are read again.
+
+    Schemas are looked up by their path relative to the schemas folder.
+    Module schema paths like ``./schemas/image/v1.0.json`` are accepted too.
+    """
+
+    def __init__(self, root: Optional[Path] = None, poll_interval: float = SCHEMA_POLL_INTERVAL):
+        self.root = Path(root or DEFAULT_SCHEMAS_DIR)
+        self.poll_interval = poll_interval
+        self._entries: Dict[str, _SchemaEntry] = {}
+        self._listing: Optional[List[Dict[str, Any]]] = None
+        # Precomputed on every reload: schemas with $refs inlined, and the
+        # schemas each one references (directly or not)
+        self._resolved: Dict[str, Any] = {}
+        self._dependencies: Dict[str, Set[str]] = {}
+        self._bundles: "OrderedDict[Tuple[int, Tuple[str, ...]], Dict[str, Any]]" = OrderedDict()
+        self._validators: Dict[str, ModuleValidator] = {}
+        self._generation = 0
+        self._checked_at = None
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def normalize(schema_path: str) -> str:
+        """Key of a schema path: relative to the schemas folder, forward slashes."""
+        key = str(schema_path).replace("\\", "/")
+        while key.startswith("./"):
+            key = key[2:]
+        if key.startswith("schemas/"):
+            key = key[len("schemas/"):]
+        return key.lstrip("/")
+
+    @property
+    def generation(self) -> int:
+        """Incremented whenever a schema is added, changed or removed."""
+        self.refresh()
+        return self._generation
+
+    def refresh(self, force: bool = False) -> bool:
+        """Pick up changes on disk if the poll interval has passed; return True if anything changed."""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._checked_at is not None and now - self._checked_at < self.poll_interval:
+                return False
+            self._checked_at = now
+
+            found = {}
+            for dirpath, _, filenames in os.walk(self.root, followlinks=True):
+                for filename in filenames:
+                    if not filename.endswith(".json"):
+                        continue
+                    path = os.path.join(dirpath, filename)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    found[Path(path).relative_to(self.root).as_posix()] = (path, stat.st_mtime_ns, stat.st_size)
+
+            changed = False
+            for key in set(self._entries) - set(found):
+                del self._entries[key]
+                changed = True
+            for key, (path, mtime_ns, size) in found.items():
+                entry = self._entries.get(key)
+                if entry and entry.mtime_ns == mtime_ns and entry.size == size:
+                    continue
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                except OSError as e:
+                    print(f"=== DEBUG: Error reading schema {path}: {e} ===")
+                    self._entries.pop(key, None)
+                    changed = True
+                    continue
+                self._entries[key] = _SchemaEntry(key, mtime_ns, size, content)
+                changed = True
+
+            if changed:
+                self._listing = None
+                self._bundles.clear()
+                self._validators.clear()
+                self._resolve_all()
+                self._generation += 1
+                print(f"=== DEBUG: Schema registry loaded {len(self._entries)} schemas ===")
+            return changed
+
+    def _entry(self, schema_path: str) -> Optional[_SchemaEntry]:
+        self.refresh()
+        return self._entries.get(self.normalize(schema_path))
+
+    def content(self, schema_path: str) -> Optional[str]:
+        """Raw text of a schema file, or None if there is no such schema."""
+        entry = self._entry(schema_path)
+        return entry.content if entry else None
+
+    def get(self, schema_path: str) -> Optional[Dict[str, Any]]:
+        """Parsed schema, or None if it is missing or not valid JSON.
+
+        The returned dict is shared - do not modify it.
+        """
+        entry = self._entry(schema_path)
+        return entry.schema if entry else None
+
+    def title(self, schema_path: str, default: str = "Unknown Schema") -> str:
+        schema = self.get(schema_path)
+        if not isinstance(schema, dict):
+            return default
+        return schema.get("title", default)
+
+    def resolved(self, schema_path: str) -> Optional[Dict[str, Any]]:
+        """Schema with every resolvable $ref inlined (see _resolve_node), or None.
+        
+        The returned dict is shared - do not modify it.
+        """
+        self.refresh()
+        return self._resolved.get(self.normalize(schema_path))
+
+    def validator(self, schema_path: str) -> Optional[ModuleValidator]:
+        """Compiled validator for a module schema ($refs resolved), or None if there is no such schema.
+
+        Compiled on first use and kept until a schema file changes.
+        """
+        with self._lock:
+            self.refresh()
+            key = self.normalize(schema_path)
+            validator = self._validators.get(key)
+            if validator is None:
+                schema = self._resolved.get(key)
+                if schema is None:
+                    return None
+                validator = self._validators[key] = ModuleValidator(schema)
+            return validator
+
+    def bundle(self, schema_paths: Iterable[str]) -> Dict[str, Any]:
+        """Everything a client needs to render the given schemas, in one object.
+
+        ``schemas`` holds the parsed schemas and every schema they reference,
+        ``resolved`` the same schemas with $refs inlined, and ``missing`` the
+        requested or referenced paths that do not exist.
+        """
+        with self._lock:
+            self.refresh()
+            keys, missing = self._closure(schema_paths)
+            return {
+                "generation": self._generation,
+                "schemas": {key: self._entries[key].schema for key in keys},
+                "resolved": {key: self._resolved.get(key) for key in keys},
+                "missing": missing
+            }
+
+    def encoded_bundle(self, schema_paths: Iterable[str]) -> Dict[str, Any]:
+        """bundle() serialised once and cached: {"json", "gzip", "etag"}.
+
+        Cached per set of schemas until any schema file changes.
+        """
+        with self._lock:
+            self.refresh()
+            schema_paths = list(schema_paths)
+            cache_key = (self._generation, tuple(sorted(self.normalize(path) for path in schema_paths)))
+            encoded = self._bundles.get(cache_key)
+            if encoded is not None:
+                self._bundles.move_to_end(cache_key)
+                return encoded
+
+            body = json.dumps(self.bundle(schema_paths), separators=(",", ":")).encode("utf-8")
+            encoded = {
+                "json": body,
+                "gzip": gzip.compress(body, compresslevel=6),
+                "etag": f'"{hashlib.sha1(body).hexdigest()}"'
+            }
+            self._bundles[cache_key] = encoded
+            while len(self._bundles) > SCHEMA_BUNDLE_CACHE_SIZE:
+                self._bundles.popitem(last=False)
+            return encoded
+
+    def _closure(self, schema_paths: Iterable[str]) -> Tuple[List[str], List[str]]:
+        keys: Set[str] = set()
+        missing = []
+        for schema_path in schema_paths:
+            key = self.normalize(schema_path)
+            if key not in self._entries:
+                missing.append(schema_path)
+                continue
+            keys.add(key)
+            keys.update(self._dependencies.get(key, ()))
+        for key in sorted(keys):
+            for ref_key in self._ref_keys(key):
+                if ref_key not in self._entries and ref_key not in missing:
+                    missing.append(ref_key)
+        return sorted(k for k in keys if k in self._entries), missing
+
+    def ref_key(self, ref: str, base_key: str) -> Tuple[str, str]:
+        """Split a $ref into (schema key, JSON pointer fragment).
+
+        Refs are written relative to the project root (``./schemas/...``,
+        the same convention as module schema paths); a ref that is not found
+        that way is tried relative to the referring schema's folder. An empty
+        path refers to the referring schema itself.
+        """
+        path, _, fragment = ref.partition("#")
+        if not path:
+            return base_key, fragment
+        key = self.normalize(path).replace("/schemas/", "/")
+        if key not in self._entries:
+            relative = posixpath.normpath(posixpath.join(posixpath.dirname(base_key), path))
+            if relative in self._entries:
+                key = relative
+        return key, fragment
+
+    def _ref_keys(self, key: str) -> Set[str]:
+        refs = set()
+
+        def walk(node):
+            if isinstance(node, dict):
+                ref = node.get("$ref")
+                if isinstance(ref, str):
+                    refs.add(self.ref_key(ref, key)[0])
+                for value in node.values():
+                    walk(value)
+            elif isinstance(node, list):
+                for value in node:
+                    walk(value)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            walk(entry.schema)
+        refs.discard(key)
+        return refs
+
+    def _resolve_all(self) -> None:
+        # Caller holds the lock
+        direct = {key: self._ref_keys(key) for key in self._entries}
+        self._dependencies = {}
+        for key in self._entries:
+            seen, stack = set(), list(direct[key])
+            while stack:
+                ref_key = stack.pop()
+                if ref_key in seen or ref_key == key:
+                    continue
+                seen.add(ref_key)
+                stack.extend(direct.get(ref_key, ()))
+            self._dependencies[key] = seen
+
+        self._resolved = {}
+        for key, entry in self._entries.items():
+            if entry.schema is not None:
+                self._resolved[key] = self._resolve_node(entry.schema, key, (f"{key}#",))
+
+    @staticmethod
+    def _pointer(document: Any, fragment: str) -> Any:
+        node = document
+        for part in [p for p in fragment.lstrip("/").split("/") if p] if fragment else []:
+            part = part.replace("~1", "/").replace("~0", "~")
+            node = node[int(part)] if isinstance(node, list) else node[part]
+        return node
+
+    def _resolve_node(self, node: Any, base_key: str, stack: Tuple[str, ...]) -> Any:
+        """Copy of node with $refs replaced by their targets.
+
+        The inlined target keeps the sibling keys of the $ref (such as
+        ``description``) and records the original ref as ``x-ref``. Refs that
+        cannot be resolved, or that would recurse forever, are left as they are.
+        """
+        if isinstance(node, list):
+            return [self._resolve_node(value, base_key, stack) for value in node]
+        if not isinstance(node, dict):
+            return node
+
+        ref = node.get("$ref")
+        if isinstance(ref, str):
+            key, fragment = self.ref_key(ref, base_key)
+            entry = self._entries.get(key)
+            marker = f"{key}#{fragment}"
+            if entry is not None and entry.schema is not None and marker not in stack:
+                try:
+                    target = self._pointer(entry.schema, fragment)
+                except (KeyError, IndexError, ValueError, TypeError):
+                    target = None
+                if isinstance(target, dict):
+                    resolved = self._resolve_node(target, key, stack + (marker,))
+                    siblings = {k: self._resolve_node(v, base_key, stack) for k, v in node.items() if k != "$ref"}
+                    return {**resolved, **siblings, "x-ref": ref}
+            return copy.deepcopy(node)
+
+        return {k: self._resolve_node(v, base_key, stack) for k, v in node.items()}
+
+    def paths(self) -> List[str]:
+        """Keys of every known schema."""
+        self.refresh()
+        return sorted(self._entries)
+
+    def listing(self) -> List[Dict[str, Any]]:
+        """Summary of every schema (path, title, description, type, version)."""
+        with self._lock:
+            self.refresh()
+            if self._listing is None:
+                self._listing = [self._summary(self._entries[key]) for key in sorted(self._entries)]
+            return list(self._listing)
+
+    @staticmethod
+    def _summary(entry: _SchemaEntry) -> Dict[str, Any]:
+        relative_path = Path(entry.key)
+        version = relative_path.parent.name if relative_path.parent.name != "schemas" else "v1.0"
+        schema = entry.schema if isinstance(entry.schema, dict) else None
+        if schema is None:
+            return {
+                "path": f"./schemas/{entry.key}",
+                "title": f"{relative_path.stem} Module",
+                "description": "Schema file (could not read details)",
+                "type": "unknown",
+                "version": version
+            }
+        return {
+            "path": f"./schemas/{entry.key}",
+            "title": schema.get("title", f"{relative_path.stem} Module"),
+            "description": schema.get("description", "No description available"),
+            "type": schema.get("module_type", "unknown"),
+            "version": version
+        }
+
+
+_registries: Dict[str, SchemaRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_schema_registry(root: Optional[Path] = None) -> SchemaRegistry:
+    """Shared registry for a schemas folder (the project's ./schemas by default)."""
+    key = str(Path(root or DEFAULT_SCHEMAS_DIR).resolve())
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None:
+            registry = _registries[key] = SchemaRegistry(Path(root or DEFAULT_SCHEMAS_DIR))
+        return registry
@@ -0,0 +1,325 @@
+import re
+from collections import Counter
+from datetime import date
+from typing import Dict, Any, Callable, List, Optional
+
+import numpy as np
+
+# Errors reported per validation; further errors are only counted
+MAX_REPORTED_ERRORS = 50
+
+_TYPE_CHECKS: Dict[str, Callable[[Any], bool]] = {
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool)) or (isinstance(v, float) and v.is_integer()),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "null": lambda v: v is None
+}
+
+# Python types that satisfy each JSON type without a per-value check
+_PLAIN_TYPES = {
+    "string": {str},
+    "integer": {int},
+    "number": {int, float},
+    "boolean": {bool},
+    "object": {dict},
+    "array": {list},
+    "null": {type(None)}
+}
+
+def _check_date(value: str) -> bool:
+    try:
+        date.fromisoformat(value)
+        return True
+    except ValueError:
+        return False
+
+
+_FORMAT_CHECKS = {"date": _check_date}
+
+
+class ValidationErrors:
+    """Collects validation errors, keeping the first MAX_REPORTED_ERRORS."""
+
+    def __init__(self, limit: int = MAX_REPORTED_ERRORS):
+        self.limit = limit
+        self.errors: List[Dict[str, str]] = []
+        self.count = 0
+
+    def add(self, path: str, message: str) -> None:
+        self.count += 1
+        if len(self.errors) < self.limit:
+            self.errors.append({"path": path, "message": message})
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    def summary(self, max_messages: int = 5) -> str:
+        shown = "; ".join(f"{e['path']}: {e['message']}" for e in self.errors[:max_messages])
+        more = self.count - min(self.count, max_messages)
+        return f"{shown} (and {more} more)" if more else shown
+
+
+def _schema_types(schema: Dict[str, Any]) -> Optional[List[str]]:
+    types = schema.get("type")
+    if types is None:
+        return None
+    return [types] if isinstance(types, str) else list(types)
+
+
+def compile_schema(schema: Any) -> Callable[[Any, str, ValidationErrors], None]:
+    """Compile a JSON schema node into a function check(value, path, errors).
+
+    Supports the keywords the module schemas use: type, enum, const,
+    required, properties, additionalProperties (false), items, minimum,
+    maximum, exclusiveMinimum, exclusiveMaximum, minLength, maxLength,
+    pattern, minItems, maxItems and format "date". Unknown keywords are ignored.
+    """
+    if not isinstance(schema, dict):
+        return lambda value, path, errors: None
+
+    checks = []
+
+    types = _schema_types(schema)
+    if types:
+        type_checks = [_TYPE_CHECKS[t] for t in types if t in _TYPE_CHECKS]
+        if type_checks:
+            expected = " or ".join(types)
+
+            def check_type(value, path, errors):
+                if not any(check(value) for check in type_checks):
+                    errors.add(path, f"expected {expected}, got {type(value).__name__}")
+                    return False
+                return True
+            checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.add(path, f"{value!r} is not one of {allowed}")
+            return True
+        checks.append(check_enum)
+
+    if "const" in schema:
+        constant = schema["const"]
+
+        def check_const(value, path, errors):
+            if value != constant:
+                errors.add(path, f"expected {constant!r}")
+            return True
+        checks.append(check_const)
+
+    bounds = [(key, schema[key]) for key in ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum")
+              if isinstance(schema.get(key), (int, float)) and not isinstance(schema.get(key), bool)]
+    if bounds:
+        def check_bounds(value, path, errors):
+            if not _TYPE_CHECKS["number"](value):
+                return True
+            for key, bound in bounds:
+                if ((key == "minimum" and value < bound) or (key == "maximum" and value > bound)
+                        or (key == "exclusiveMinimum" and value <= bound) or (key == "exclusiveMaximum" and value >= bound)):
+                    errors.add(path, f"{value} violates {key} {bound}")
+            return True
+        checks.append(check_bounds)
+
+    min_length, max_length = schema.get("minLength"), schema.get("maxLength")
+    pattern = re.compile(schema["pattern"]) if isinstance(schema.get("pattern"), str) else None
+    format_check = _FORMAT_CHECKS.get(schema.get("format"))
+    if min_length is not None or max_length is not None or pattern or format_check:
+        def check_string(value, path, errors):
+            if not isinstance(value, str):
+                return True
+            if min_length is not None and len(value) < min_length:
+                errors.add(path, f"shorter than minLength {min_length}")
+            if max_length is not None and len(value) > max_length:
+                errors.add(path, f"longer than maxLength {max_length}")
+            if pattern and not pattern.search(value):
+                errors.add(path, f"does not match pattern {pattern.pattern}")
+            if format_check and not format_check(value):
+                errors.add(path, f"is not a valid {schema['format']}")
+            return True
+        checks.append(check_string)
+
+    properties = {name: compile_schema(sub) for name, sub in (schema.get("properties") or {}).items()}
+    required = list(schema.get("required") or [])
+    closed = schema.get("additionalProperties") is False
+    if properties or required or closed:
+        def check_object(value, path, errors):
+            if not isinstance(value, dict):
+                return True
+            for name in required:
+                if name not in value:
+                    errors.add(f"{path}.{name}" if path else name, "is required")
+            for name, item in value.items():
+                item_path = f"{path}.{name}" if path else name
+                check = properties.get(name)
+                if check is not None:
+                    check(item, item_path, errors)
+                elif closed:
+                    errors.add(item_path, "is not allowed")
+            return True
+        checks.append(check_object)
+
+    items = compile_schema(schema["items"]) if isinstance(schema.get("items"), dict) else None
+    min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+    if items or min_items is not None or max_items is not None:
+        def check_array(value, path, errors):
+            if not isinstance(value, list):
+                return True
+            if min_items is not None and len(value) < min_items:
+                errors.add(path, f"fewer than minItems {min_items}")
+            if max_items is not None and len(value) > max_items:
+                errors.add(path, f"more than maxItems {max_items}")
+            if items:
+                for index, item in enumerate(value):
+                    items(item, f"{path}[{index}]", errors)
+            return True
+        checks.append(check_array)
+
+    def check(value, path, errors):
+        for step in checks:
+            # A type mismatch makes the remaining keyword errors noise
+            if step(value, path, errors) is False:
+                return
+
+    return check
+
+
+class ColumnValidator:
+    """Validates one column of a table (one property of the row schema) over all rows at once.
+
+    Type checks count the Python types of the whole column in one pass;
+    enum, range and length checks run as NumPy operations over the column.
+    Only columns that fail a vectorized check are walked value by value to
+    report the offending rows. Nested object/array columns fall back to the
+    compiled per-value check.
+    """
+
+    def __init__(self, name: str, schema: Dict[str, Any]):
+        self.name = name
+        self.schema = schema if isinstance(schema, dict) else {}
+        self.types = _schema_types(self.schema)
+        self.check_value = compile_schema(self.schema)
+        self.plain_types = set()
+        for t in self.types or []:
+            self.plain_types |= _PLAIN_TYPES.get(t, set())
+        self.nested = bool(self.types) and bool({"object", "array"} & set(self.types))
+        self.enum = self.schema.get("enum")
+        self.bounds = [(key, self.schema[key]) for key in ("minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum")
+                       if isinstance(self.schema.get(key), (int, float)) and not isinstance(self.schema.get(key), bool)]
+        self.min_length = self.schema.get("minLength")
+        self.max_length = self.schema.get("maxLength")
+        self.per_value = ("pattern" in self.schema or "format" in self.schema or "const" in self.schema
+                          or self.nested or not self.types)
+
+    def validate(self, values: List[Any], rows: List[int], path: str, errors: ValidationErrors) -> None:
+        """values[i] is the column value of row rows[i] (rows missing the column are left out)."""
+        if not values:
+            return
+        if self.per_value or not self._vector_valid(values):
+            for value, row in zip(values, rows):
+                self.check_value(value, f"{path}[{row}].{self.name}", errors)
+
+    def _vector_valid(self, values: List[Any]) -> bool:
+        """True if the whole column passes; False if any value needs a closer look."""
+        column_types = set(Counter(map(type, values)))
+        if not column_types <= self.plain_types:
+            # e.g. 1.5 in an integer column, or a bool in a number column
+            return False
+
+        if self.enum is not None:
+            try:
+                if not np.isin(np.array(values, dtype=object), np.array(self.enum, dtype=object)).all():
+                    return False
+            except TypeError:
+                # Values of mixed types cannot be sorted for isin
+                return False
+
+        if column_types <= {int, float} and self.bounds:
+            numbers = np.fromiter(values, dtype=np.float64, count=len(values))
+            for key, bound in self.bounds:
+                if key == "minimum" and (numbers < bound).any():
+                    return False
+                if key == "maximum" and (numbers > bound).any():
+                    return False
+                if key == "exclusiveMinimum" and (numbers <= bound).any():
+                    return False
+                if key == "exclusiveMaximum" and (numbers >= bound).any():
+                    return False
+
+        if column_types == {str} and (self.min_length is not None or self.max_length is not None):
+            lengths = np.fromiter(map(len, values), dtype=np.int64, count=len(values))
+            if self.min_length is not None and (lengths < self.min_length).any():
+                return False
+            if self.max_length is not None and (lengths > self.max_length).any():
+                return False
+        return True
+
+
+class TableValidator:
+    """Validates a list of row objects column by column (see ColumnValidator)."""
+
+    def __init__(self, row_schema: Dict[str, Any]):
+        row_schema = row_schema if isinstance(row_schema, dict) else {}
+        self.required = list(row_schema.get("required") or [])
+        self.closed = row_schema.get("additionalProperties") is False
+        self.columns = {name: ColumnValidator(name, sub) for name, sub in (row_schema.get("properties") or {}).items()}
+
+    def validate(self, rows: List[Any], path: str, errors: ValidationErrors) -> None:
+        columns: Dict[str, List[Any]] = {name: [] for name in self.columns}
+        present: Dict[str, List[int]] = {name: [] for name in self.columns}
+        for index, row in enumerate(rows):
+            if not isinstance(row, dict):
+                errors.add(f"{path}[{index}]", f"expected object, got {type(row).__name__}")
+                continue
+            for name in self.required:
+                if name not in row:
+                    errors.add(f"{path}[{index}].{name}", "is required")
+            for name, value in row.items():
+                if name in columns:
+                    columns[name].append(value)
+                    present[name].append(index)
+                elif self.closed:
+                    errors.add(f"{path}[{index}].{name}", "is not allowed")
+
+        for name, column in self.columns.items():
+            column.validate(columns[name], present[name], path, errors)
+
+
+class ModuleValidator:
+    """Validator for a module schema, compiled once and reused.
+
+    The module's ``metadata`` is checked against ``properties.metadata``.
+    Its ``data`` - a list of rows, or a single row object - is checked
+    column-wise against the row schema (``properties.data.items`` for array
+    data, otherwise ``properties.data``).
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        properties = schema.get("properties", {}) if isinstance(schema, dict) else {}
+        self.check_metadata = compile_schema(properties.get("metadata"))
+        data_schema = properties.get("data") if isinstance(properties.get("data"), dict) else {}
+        self.data_is_array = "array" in (_schema_types(data_schema) or [])
+        row_schema = data_schema.get("items", {}) if self.data_is_array else data_schema
+        self.table = TableValidator(row_schema)
+        self.check_data = compile_schema(data_schema)
+
+    def validate(self, metadata: Any, data: Any = None, validate_data: bool = True) -> ValidationErrors:
+        errors = ValidationErrors()
+        self.check_metadata(metadata, "metadata", errors)
+        if not validate_data or data is None:
+            return errors
+
+        if isinstance(data, list):
+            self.table.validate(data, "data", errors)
+        elif isinstance(data, dict):
+            # The module form sends a single row as an object
+            if data:
+                self.table.validate([data], "data", errors)
+        else:
+            self.check_data(data, "data", errors)
+        return errors
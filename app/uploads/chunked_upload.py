@@ -0,0 +1,243 @@
+import os
+import json
+import time
+import uuid
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Any, Optional, AsyncIterator
+
+# Directory where in-progress and assembled uploads live. Kept outside the
+# project tree so large files never end up next to the source.
+DEFAULT_UPLOAD_DIR = os.getenv("UMDF_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "umdf_uploads"))
+
+# Clients may pick their own chunk size within these bounds
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+
+# Incomplete uploads untouched for this long are removed on the next init
+STALE_UPLOAD_SECONDS = int(os.getenv("UMDF_UPLOAD_STALE_SECONDS", str(24 * 60 * 60)))
+
+# Size of the blocks read from the request body while writing a chunk
+WRITE_BLOCK_SIZE = 1024 * 1024
+
+
+class UploadError(Exception):
+    """Raised when an upload request is invalid or cannot be completed."""
+
+
+class ChunkedUploadManager:
+    """Resumable chunked uploads that stream straight to disk.
+
+    An upload is a sparse ``<id>.part`` file plus a ``<id>.json`` manifest
+    recording which chunks have been received and their SHA-256. Chunks are
+    written in place at ``index * chunk_size`` so the file is assembled as it
+    arrives and finalizing is only a rename. Because the manifest lives on
+    disk, an interrupted upload can be resumed (even after a server restart)
+    by asking for its status and sending the missing chunks.
+    """
+
+    def __init__(self, upload_dir: str = DEFAULT_UPLOAD_DIR):
+        self.upload_dir = upload_dir
+        self.files_dir = os.path.join(upload_dir, "files")
+        os.makedirs(self.upload_dir, exist_ok=True)
+        os.makedirs(self.files_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _manifest_path(self, upload_id: str) -> str:
+        return os.path.join(self.upload_dir, f"{upload_id}.json")
+
+    def _part_path(self, upload_id: str) -> str:
+        return os.path.join(self.upload_dir, f"{upload_id}.part")
+
+    def _load_manifest(self, upload_id: str) -> Dict[str, Any]:
+        # Upload IDs are generated by us; reject anything else before touching the filesystem
+        try:
+            uuid.UUID(upload_id)
+        except ValueError:
+            raise UploadError(f"Invalid upload id: {upload_id}")
+
+        manifest_path = self._manifest_path(upload_id)
+        if not os.path.exists(manifest_path):
+            raise UploadError(f"Unknown upload: {upload_id}")
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        # Write-then-rename so a crash never leaves a half-written manifest
+        manifest["updated_at"] = time.time()
+        manifest_path = self._manifest_path(manifest["upload_id"])
+        tmp_path = f"{manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+
+    def _expected_chunk_length(self, manifest: Dict[str, Any], index: int) -> int:
+        if index == manifest["chunk_count"] - 1:
+            return manifest["total_size"] - index * manifest["chunk_size"]
+        return manifest["chunk_size"]
+
+    def init_upload(
+        self,
+        filename: str,
+        total_size: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        file_sha256: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Start a new upload and return its manifest."""
+        if total_size <= 0:
+            raise UploadError("File is empty")
+        if chunk_size < MIN_CHUNK_SIZE or chunk_size > MAX_CHUNK_SIZE:
+            raise UploadError(f"Chunk size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes")
+
+        self.cleanup_stale()
+
+        upload_id = str(uuid.uuid4())
+        chunk_count = (total_size + chunk_size - 1) // chunk_size
+
+        # Pre-size the target file so chunks can be written at their offsets in any order
+        with open(self._part_path(upload_id), 'wb') as f:
+            f.truncate(total_size)
+
+        manifest = {
+            "upload_id": upload_id,
+            "filename": os.path.basename(filename),
+            "total_size": total_size,
+            "chunk_size": chunk_size,
+            "chunk_count": chunk_count,
+            "file_sha256": file_sha256.lower() if file_sha256 else None,
+            "chunks": {},
+            "created_at": time.time()
+        }
+        self._save_manifest(manifest)
+        print(f"=== DEBUG: Initialised upload {upload_id} for {filename}: {total_size} bytes in {chunk_count} chunks ===")
+        return self.get_status(upload_id)
+
+    def get_status(self, upload_id: str) -> Dict[str, Any]:
+        """Return the progress of an upload, including the chunks still missing."""
+        manifest = self._load_manifest(upload_id)
+        received = sorted(int(i) for i in manifest["chunks"])
+        received_set = set(received)
+        missing = [i for i in range(manifest["chunk_count"]) if i not in received_set]
+        return {
+            "upload_id": upload_id,
+            "filename": manifest["filename"],
+            "total_size": manifest["total_size"],
+            "chunk_size": manifest["chunk_size"],
+            "chunk_count": manifest["chunk_count"],
+            "received_chunks": received,
+            "missing_chunks": missing,
+            "complete": not missing
+        }
+
+    async def write_chunk(
+        self,
+        upload_id: str,
+        index: int,
+        body: AsyncIterator[bytes],
+        chunk_sha256: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Stream one chunk from ``body`` into place and verify it.
+
+        The chunk is hashed while it is written. If its length or hash does not
+        match, the chunk is not recorded and the client can simply retry it.
+        Re-sending a chunk that was already received overwrites it; the chunk
+        counts as missing until the re-send has been verified.
+        """
+        manifest = self._load_manifest(upload_id)
+        if index < 0 or index >= manifest["chunk_count"]:
+            raise UploadError(f"Chunk index {index} out of range (0-{manifest['chunk_count'] - 1})")
+
+        expected_length = self._expected_chunk_length(manifest, index)
+        offset = index * manifest["chunk_size"]
+        digest = hashlib.sha256()
+        written = 0
+
+        # The bytes at this offset are about to change: a re-send that is cut
+        # off or fails its hash must leave the chunk missing, not "received"
+        with self._lock:
+            manifest = self._load_manifest(upload_id)
+            if manifest["chunks"].pop(str(index), None) is not None:
+                self._save_manifest(manifest)
+
+        with open(self._part_path(upload_id), 'r+b') as f:
+            f.seek(offset)
+            async for block in body:
+                if not block:
+                    continue
+                written += len(block)
+                if written > expected_length:
+                    raise UploadError(f"Chunk {index} is larger than expected ({expected_length} bytes)")
+                digest.update(block)
+                f.write(block)
+
+        if written != expected_length:
+            raise UploadError(f"Chunk {index} is incomplete: received {written} of {expected_length} bytes")
+
+        actual_sha256 = digest.hexdigest()
+        if chunk_sha256 and chunk_sha256.lower() != actual_sha256:
+            raise UploadError(f"Chunk {index} checksum mismatch")
+
+        # Several chunks of the same upload may arrive concurrently, so the
+        # manifest update has to be a read-modify-write under the lock
+        with self._lock:
+            manifest = self._load_manifest(upload_id)
+            manifest["chunks"][str(index)] = actual_sha256
+            self._save_manifest(manifest)
+
+        return {"index": index, "size": written, "sha256": actual_sha256}
+
+    def finalize(self, upload_id: str) -> Dict[str, Any]:
+        """Check that every chunk arrived and move the assembled file into place."""
+        status = self.get_status(upload_id)
+        if not status["complete"]:
+            raise UploadError(f"Upload incomplete, missing chunks: {status['missing_chunks']}")
+
+        manifest = self._load_manifest(upload_id)
+        part_path = self._part_path(upload_id)
+
+        # The whole-file hash is optional because it costs a full read of the file
+        if manifest.get("file_sha256"):
+            digest = hashlib.sha256()
+            with open(part_path, 'rb') as f:
+                for block in iter(lambda: f.read(WRITE_BLOCK_SIZE), b''):
+                    digest.update(block)
+            if digest.hexdigest() != manifest["file_sha256"]:
+                raise UploadError("File checksum mismatch")
+
+        final_path = os.path.join(self.files_dir, f"{upload_id}_{manifest['filename']}")
+        os.replace(part_path, final_path)
+        os.unlink(self._manifest_path(upload_id))
+        print(f"=== DEBUG: Upload {upload_id} finalised at {final_path} ===")
+
+        return {
+            "upload_id": upload_id,
+            "filename": manifest["filename"],
+            "path": final_path,
+            "size": manifest["total_size"]
+        }
+
+    def abort(self, upload_id: str) -> None:
+        """Discard an upload and its partial data."""
+        self._load_manifest(upload_id)
+        for path in (self._part_path(upload_id), self._manifest_path(upload_id)):
+            if os.path.exists(path):
+                os.unlink(path)
+
+    def cleanup_stale(self, max_age: int = STALE_UPLOAD_SECONDS) -> int:
+        """Remove incomplete uploads that have not been touched for max_age seconds."""
+        removed = 0
+        cutoff = time.time() - max_age
+        for entry in os.scandir(self.upload_dir):
+            if not entry.is_file() or not entry.name.endswith(".json"):
+                continue
+            try:
+                if entry.stat().st_mtime >= cutoff:
+                    continue
+                upload_id = entry.name[:-len(".json")]
+                self.abort(upload_id)
+                removed += 1
+            except (OSError, UploadError, ValueError) as e:
+                print(f"Warning: Could not clean up stale upload {entry.name}: {e}")
+        return removed
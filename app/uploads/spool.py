@@ -0,0 +1,211 @@
+import os
+import uuid
+import hashlib
+from typing import Dict, Any, Optional, Iterable
+
+from multipart.multipart import MultipartParser, parse_options_header
+
+from .chunked_upload import DEFAULT_UPLOAD_DIR, UploadError
+
+# Uploads are stored content-addressed under this directory as <sha256><suffix>
+DEFAULT_SPOOL_DIR = os.path.join(DEFAULT_UPLOAD_DIR, "spool")
+
+# Number of spooled files kept around so re-opening a recent upload is free
+SPOOL_KEEP_FILES = int(os.getenv("UMDF_SPOOL_KEEP", "4"))
+
+
+class _SpoolWriter:
+    """Writes incoming bytes to a temp file while hashing them."""
+
+    def __init__(self, spool_dir: str, suffix: str = ".umdf"):
+        self.spool_dir = spool_dir
+        self.suffix = suffix
+        self.temp_path = os.path.join(spool_dir, f"incoming-{uuid.uuid4()}.tmp")
+        self.file = open(self.temp_path, 'wb')
+        self.digest = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data) -> None:
+        self.digest.update(data)
+        self.file.write(data)
+        self.size += len(data)
+
+    def commit(self, filename: str) -> Dict[str, Any]:
+        """Move the temp file to its content-addressed location."""
+        self.file.close()
+        sha256 = self.digest.hexdigest()
+        final_path = os.path.join(self.spool_dir, f"{sha256}{self.suffix}")
+
+        if os.path.exists(final_path):
+            # Same content was uploaded before - keep the existing file untouched
+            os.unlink(self.temp_path)
+        else:
+            os.replace(self.temp_path, final_path)
+
+        return {
+            "path": final_path,
+            "filename": filename,
+            "size": self.size,
+            "sha256": sha256
+        }
+
+    def discard(self) -> None:
+        if not self.file.closed:
+            self.file.close()
+        if os.path.exists(self.temp_path):
+            os.unlink(self.temp_path)
+
+
+def _check_extension(filename: str, extensions: Optional[tuple]) -> None:
+    if extensions and not filename.endswith(extensions):
+        raise UploadError(f"Only {', '.join(extensions)} files are supported")
+
+
+async def spool_request(
+    request,
+    field_name: str = "file",
+    spool_dir: str = DEFAULT_SPOOL_DIR,
+    suffix: str = ".umdf",
+    extensions: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """Stream an uploaded file from the request body to disk.
+
+    Accepts either a multipart form (the file in ``field_name``) or a raw body
+    with the filename in the ``X-Filename`` header or ``filename`` query
+    parameter. The body is consumed block by block as it arrives, so the file
+    is never held in memory and never goes through Starlette's own spool.
+
+    If ``extensions`` is given, a filename not ending in one of them raises
+    UploadError as soon as the name is known, before the content is read.
+
+    Returns a dict with the spooled ``path``, original ``filename``, ``size``
+    and ``sha256`` of the content.
+    """
+    os.makedirs(spool_dir, exist_ok=True)
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    extensions = tuple(extensions) if extensions else None
+
+    if content_type == b"multipart/form-data":
+        return await _spool_multipart(request, params, field_name, spool_dir, suffix, extensions)
+
+    filename = request.headers.get("x-filename") or request.query_params.get("filename")
+    if not filename:
+        raise UploadError("Missing filename for raw upload (X-Filename header or filename query parameter)")
+    _check_extension(filename, extensions)
+
+    writer = _SpoolWriter(spool_dir, suffix)
+    try:
+        async for block in request.stream():
+            if block:
+                writer.write(block)
+        if writer.size == 0:
+            raise UploadError("File is empty")
+        return writer.commit(os.path.basename(filename))
+    except BaseException:
+        writer.discard()
+        raise
+
+
+async def _spool_multipart(
+    request,
+    params: Dict[bytes, bytes],
+    field_name: str,
+    spool_dir: str,
+    suffix: str,
+    extensions: Optional[tuple] = None
+) -> Dict[str, Any]:
+    """Parse a multipart body incrementally, writing only the file part to disk."""
+    boundary = params.get(b"boundary")
+    if not boundary:
+        raise UploadError("Missing multipart boundary")
+
+    state = {
+        "header_field": b"",
+        "header_value": b"",
+        "headers": {},
+        "writer": None,
+        "filename": None,
+        "in_file_part": False
+    }
+
+    def on_part_begin():
+        state["headers"] = {}
+        state["in_file_part"] = False
+
+    def on_header_field(data, start, end):
+        state["header_field"] += data[start:end]
+
+    def on_header_value(data, start, end):
+        state["header_value"] += data[start:end]
+
+    def on_header_end():
+        state["headers"][state["header_field"].lower()] = state["header_value"]
+        state["header_field"] = b""
+        state["header_value"] = b""
+
+    def on_headers_finished():
+        _, options = parse_options_header(state["headers"].get(b"content-disposition", b""))
+        name = options.get(b"name", b"").decode("utf-8", errors="replace")
+        filename = options.get(b"filename")
+        if name == field_name and filename is not None and state["writer"] is None:
+            state["filename"] = os.path.basename(filename.decode("utf-8", errors="replace"))
+            _check_extension(state["filename"], extensions)
+            state["writer"] = _SpoolWriter(spool_dir, suffix)
+            state["in_file_part"] = True
+
+    def on_part_data(data, start, end):
+        # memoryview avoids copying the parser's buffer slice
+        if state["in_file_part"]:
+            state["writer"].write(memoryview(data)[start:end])
+
+    def on_part_end():
+        state["in_file_part"] = False
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end
+    })
+
+    try:
+        async for block in request.stream():
+            if block:
+                parser.write(block)
+        parser.finalize()
+
+        writer = state["writer"]
+        if writer is None:
+            raise UploadError(f"No file found in form field '{field_name}'")
+        if writer.size == 0:
+            raise UploadError("File is empty")
+        return writer.commit(state["filename"])
+    except BaseException:
+        if state["writer"] is not None:
+            state["writer"].discard()
+        raise
+
+
+def prune_directory(directory: str, keep: int, exclude: Optional[Iterable[str]] = None) -> int:
+    """Delete all but the ``keep`` most recently used files in directory."""
+    if not os.path.isdir(directory):
+        return 0
+
+    excluded = {os.path.abspath(p) for p in (exclude or [])}
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_file() and not entry.name.endswith(".tmp") and os.path.abspath(entry.path) not in excluded:
+            entries.append((entry.stat().st_mtime, entry.path))
+
+    entries.sort(reverse=True)
+    removed = 0
+    for _, path in entries[keep:]:
+        try:
+            os.unlink(path)
+            removed += 1
+        except OSError as e:
+            print(f"Warning: Could not remove spooled file {path}: {e}")
+    return removed
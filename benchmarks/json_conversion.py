@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark conversion of file info and module metadata from the UMDF bindings.
+
+Times only the conversion of getFileInfo() and of the metadata of every
+module (including every frame of image modules) to Python values. Modules
+are read once, before timing, so file reads and decompression are not
+counted. With the native json type caster the conversion happens in the
+getter, which returns dicts and lists directly; older builds return
+nlohmann::json handles, fetched before timing and then converted with
+json.loads(x.dump()). For comparison, the dump/parse round trip is also
+timed on the plain values (json.dumps + json.loads), which approximates the
+cost the caster removes.
+
+Usage:
+    python3 benchmarks/json_conversion.py FILE.umdf [--password PW] [--rounds 5]
+"""
+
+import sys
+import os
+import json
+import time
+import argparse
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from cpp_interface.umdf_interface import UMDFReader, plain_json
+
+
+def load_modules(raw_reader, module_ids: list) -> list:
+    """Read every module once; returns the ModuleData of each module and frame."""
+    loaded = []
+    for module_id in module_ids:
+        result = raw_reader.getModuleData(module_id)
+        if not result.has_value():
+            continue
+        module_data = result.value()
+        loaded.append(module_data)
+        data = module_data.get_data()
+        if isinstance(data, list) and data and hasattr(data[0], 'get_metadata'):
+            loaded.extend(data)
+    return loaded
+
+
+def conversion(getter, native: bool):
+    """A callable that does only the json conversion of getter's result.
+
+    Native bindings convert inside the getter; otherwise the handle is
+    fetched now and only plain_json is left to time.
+    """
+    if native:
+        return getter
+    handle = getter()
+    return lambda: plain_json(handle)
+
+
+def best_of(rounds: int, fn):
+    """Run fn ``rounds`` times; return (fastest time in seconds, last result)."""
+    best = None
+    result = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="UMDF file to read")
+    parser.add_argument("--password", default="", help="File password")
+    parser.add_argument("--rounds", type=int, default=5, help="Repetitions; the fastest is reported")
+    args = parser.parse_args()
+
+    reader = UMDFReader()
+    if not reader.read_file(args.file, args.password):
+        raise SystemExit(f"Could not open {args.file}")
+
+    try:
+        raw_reader = reader.reader
+        native = not hasattr(raw_reader.getFileInfo(), 'dump')
+        print(f"{args.file}: json conversion is {'native (type caster)' if native else 'dump/parse round trip'}\n")
+
+        info_time, file_info = best_of(args.rounds, conversion(raw_reader.getFileInfo, native))
+        module_ids = [module['uuid'] for module in file_info.get('modules', []) if 'uuid' in module]
+        converters = [conversion(module_data.get_metadata, native) for module_data in load_modules(raw_reader, module_ids)]
+        metadata_time, metadata = best_of(args.rounds, lambda: [convert() for convert in converters])
+
+        # Cost of serialising and parsing the same values once more
+        info_round_trip, _ = best_of(args.rounds, lambda: json.loads(json.dumps(file_info)))
+        metadata_round_trip, _ = best_of(args.rounds, lambda: [json.loads(json.dumps(m)) for m in metadata])
+
+        print(f"{'':<24} {'convert ms':>12} {'round trip ms':>14}")
+        print(f"{'file info':<24} {info_time * 1000:>12.2f} {info_round_trip * 1000:>14.2f}")
+        print(f"{f'metadata ({len(metadata)} items)':<24} {metadata_time * 1000:>12.2f} {metadata_round_trip * 1000:>14.2f}")
+    finally:
+        reader.close_file()
+
+
+if __name__ == "__main__":
+    main()
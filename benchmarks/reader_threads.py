@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark concurrent module reads through the UMDF Python bindings.
+
+Each thread opens its own reader on the file and reads every module in a
+loop. If the bindings hold the GIL during I/O and decryption the threads
+take turns and throughput stays flat; with the GIL released it scales with
+the number of threads (up to the number of cores).
+
+Usage:
+    python3 benchmarks/reader_threads.py FILE.umdf [--password PW] [--threads 1 2 4 8] [--rounds 3]
+"""
+
+import sys
+import os
+import time
+import argparse
+import threading
+
+# Add the project root to Python path
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from cpp_interface.umdf_interface import UMDFReader
+
+
+def list_module_ids(file_path: str, password: str) -> list:
+    reader = UMDFReader()
+    if not reader.read_file(file_path, password):
+        raise SystemExit(f"Could not open {file_path}")
+    try:
+        file_info = reader.get_file_info()
+        return [module['uuid'] for module in file_info.get('modules', []) if 'uuid' in module]
+    finally:
+        reader.close_file()
+
+
+def run(file_path: str, password: str, module_ids: list, thread_count: int, rounds: int) -> float:
+    """Read every module ``rounds`` times on each of ``thread_count`` threads; return reads per second."""
+    readers = []
+    for _ in range(thread_count):
+        reader = UMDFReader()
+        if not reader.read_file(file_path, password):
+            raise SystemExit(f"Could not open {file_path}")
+        readers.append(reader)
+
+    start_barrier = threading.Barrier(thread_count + 1)
+    errors = []
+
+    def worker(reader):
+        start_barrier.wait()
+        for _ in range(rounds):
+            for module_id in module_ids:
+                result = reader.reader.getModuleData(module_id)
+                if not result.has_value():
+                    errors.append(result.error())
+
+    threads = [threading.Thread(target=worker, args=(reader,)) for reader in readers]
+    for thread in threads:
+        thread.start()
+
+    start_barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    for reader in readers:
+        reader.close_file()
+
+    if errors:
+        print(f"  {len(errors)} reads failed, first error: {errors[0]}")
+    return thread_count * rounds * len(module_ids) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("file", help="UMDF file to read")
+    parser.add_argument("--password", default="", help="File password")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8], help="Thread counts to test")
+    parser.add_argument("--rounds", type=int, default=3, help="Times each thread reads every module")
+    args = parser.parse_args()
+
+    module_ids = list_module_ids(args.file, args.password)
+    if not module_ids:
+        raise SystemExit("File has no modules to read")
+    print(f"{args.file}: {len(module_ids)} modules, {args.rounds} rounds per thread\n")
+
+    print(f"{'threads':>8} {'reads/s':>10} {'speedup':>8}")
+    baseline = None
+    for thread_count in args.threads:
+        throughput = run(args.file, args.password, module_ids, thread_count, args.rounds)
+        baseline = baseline or throughput
+        print(f"{thread_count:>8} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
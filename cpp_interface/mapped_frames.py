@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Memory-mapped store of decoded UMDF frame payloads.
+
+The first read of an image module in mmap mode writes its decoded frames to
+a cache file; every later read (from any reader, pool thread or worker
+process) maps that file read-only and gets memoryviews over the mapping.
+The pages live in the OS page cache once, instead of as a private copy in
+each reader.
+"""
+
+import os
+import mmap
+import time
+import struct
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Optional
+
+# Cache files of decoded frames are written here
+MAPPED_FRAME_CACHE_DIR = os.getenv("UMDF_MMAP_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "umdf-frames")
+
+# Number of cache files kept mapped at once
+MAPPED_FRAME_MAX_OPEN = int(os.getenv("UMDF_MMAP_MAX_OPEN", "64"))
+
+# Total size of the cache files; the least recently used are removed beyond it
+MAPPED_FRAME_CACHE_MAX_BYTES = int(os.getenv("UMDF_MMAP_CACHE_SIZE", str(2 * 1024 ** 3)))
+
+# Seconds a cache file may go unused before it is removed
+MAPPED_FRAME_CACHE_MAX_AGE = float(os.getenv("UMDF_MMAP_CACHE_MAX_AGE", str(7 * 24 * 3600)))
+
+# Header: magic, frame count; then (offset, length) per frame; then payloads
+_MAGIC = b"UMDFFRM1"
+_HEADER = struct.Struct("<8sQ")
+_ENTRY = struct.Struct("<QQ")
+
+
+def mmap_mode_from_env() -> bool:
+    """Whether ``UMDF_MMAP_FRAMES`` enables the memory-mapped read mode."""
+    return os.getenv("UMDF_MMAP_FRAMES", "0").lower() in ("1", "true", "yes")
+
+
+class MappedFrameStore:
+    """Read-only memory-mapped cache of decoded frame payloads.
+
+    Entries are keyed by the file's path, size and mtime and the module id,
+    so a modified file never serves stale frames. Frames of encrypted files
+    are only cached when ``include_encrypted`` is set (``UMDF_MMAP_ENCRYPTED``),
+    since the cache holds them decrypted; cache files are private to the
+    user either way.
+
+    Entries unused for ``max_age`` seconds are removed, and the least
+    recently used ones beyond ``max_bytes`` in total, whenever an entry is
+    written (and once on start-up).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_open: int = MAPPED_FRAME_MAX_OPEN,
+        include_encrypted: Optional[bool] = None,
+        max_bytes: int = MAPPED_FRAME_CACHE_MAX_BYTES,
+        max_age: float = MAPPED_FRAME_CACHE_MAX_AGE
+    ):
+        self.cache_dir = cache_dir or MAPPED_FRAME_CACHE_DIR
+        self.max_open = max(1, max_open)
+        if include_encrypted is None:
+            include_encrypted = os.getenv("UMDF_MMAP_ENCRYPTED", "0").lower() in ("1", "true", "yes")
+        self.include_encrypted = include_encrypted
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._maps: "OrderedDict[str, mmap.mmap]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._make_private_dir()
+        self.evict()
+
+    def _make_private_dir(self) -> None:
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        # makedirs leaves an existing directory's mode alone
+        if hasattr(os, "getuid"):
+            if os.stat(self.cache_dir).st_uid != os.getuid():
+                raise PermissionError(f"Frame cache directory {self.cache_dir} belongs to another user")
+            os.chmod(self.cache_dir, 0o700)
+
+    def accepts(self, password: str = "") -> bool:
+        """Whether frames of a file opened with this password may be cached."""
+        return not password or self.include_encrypted
+
+    def _file_prefix(self, file_path: str) -> str:
+        return hashlib.sha1(os.path.realpath(file_path).encode("utf-8")).hexdigest()[:16]
+
+    def entry_path(self, file_path: str, module_id: str) -> str:
+        stat = os.stat(file_path)
+        version = hashlib.sha1(f"{stat.st_size}:{stat.st_mtime_ns}:{module_id}".encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.cache_dir, f"{self._file_prefix(file_path)}-{version}.frames")
+
+    def views(self, file_path: str, module_id: str, load: Callable[[], Iterable]) -> List[memoryview]:
+        """Read-only views of every frame of a module.
+
+        ``load`` is called on a cache miss and returns the decoded frame
+        payloads (any buffers); they are written once and mapped from then on.
+        """
+        path = self.entry_path(file_path, module_id)
+        mapping = self._mapping(path)
+        if mapping is None:
+            self._write(path, load())
+            self.evict(keep=path)
+            mapping = self._mapping(path)
+        return self._frame_views(mapping)
+
+    def purge(self, file_path: str) -> None:
+        """Delete every cache entry of a file (all versions)."""
+        prefix = self._file_prefix(file_path) + "-"
+        with self._lock:
+            for path in [p for p in self._maps if os.path.basename(p).startswith(prefix)]:
+                # Views handed out keep the mapping alive; just stop reusing it
+                del self._maps[path]
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        """Remove entries past max_age, then the least recently used beyond max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".frames"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        cutoff = time.time() - self.max_age
+        total = 0
+        # Newest first; mtime is refreshed whenever an entry is mapped
+        for mtime, size, path in sorted(entries, reverse=True):
+            if path != keep and (mtime < cutoff or total + size > self.max_bytes):
+                self._remove(path)
+            else:
+                total += size
+
+    def _remove(self, path: str) -> None:
+        with self._lock:
+            # Views handed out keep the mapping alive; just stop reusing it
+            self._maps.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _mapping(self, path: str) -> Optional[mmap.mmap]:
+        with self._lock:
+            mapping = self._maps.get(path)
+            if mapping is not None:
+                self._maps.move_to_end(path)
+        if mapping is not None:
+            self._touch(path)
+            return mapping
+
+        try:
+            with open(path, "rb") as f:
+                mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._touch(path)
+        except (FileNotFoundError, ValueError):
+            # Missing, or empty (mmap refuses zero-length files)
+            return None
+
+        with self._lock:
+            self._maps[path] = mapping
+            while len(self._maps) > self.max_open:
+                # Not closed explicitly: views handed out may still use it
+                self._maps.popitem(last=False)
+        return mapping
+
+    def _touch(self, path: str) -> None:
+        # Mark the entry as recently used for evict()
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _write(self, path: str, frames: Iterable) -> None:
+        buffers = [memoryview(frame).cast("B") for frame in frames]
+        offset = _HEADER.size + _ENTRY.size * len(buffers)
+        entries = []
+        for buffer in buffers:
+            entries.append(_ENTRY.pack(offset, buffer.nbytes))
+            offset += buffer.nbytes
+
+        # Write to a private temp file and rename, so concurrent readers and
+        # processes only ever map complete entries
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, len(buffers)))
+                f.write(b"".join(entries))
+                for buffer in buffers:
+                    f.write(buffer)
+            os.replace(temp_path, path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+    def _frame_views(self, mapping: mmap.mmap) -> List[memoryview]:
+        magic, count = _HEADER.unpack_from(mapping, 0)
+        if magic != _MAGIC:
+            raise ValueError("Not a UMDF frame cache file")
+        view = memoryview(mapping)
+        frames = []
+        for index in range(count):
+            offset, length = _ENTRY.unpack_from(mapping, _HEADER.size + index * _ENTRY.size)
+            frames.append(view[offset:offset + length])
+        return frames
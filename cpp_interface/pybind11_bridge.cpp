@@ -1,3 +1,9 @@
+// NOTE: this file is not built. setup.py compiles the bindings in
+// ../UMDF/pybind (the `umdf` module the app imports) and CMakeLists.txt
+// builds umdf_python_interface.cpp. The additions here (GIL release, native
+// json conversion, batched reads) have to be ported there to take effect;
+// until then cpp_interface/umdf_interface.py uses its fallbacks.
+#include <pybind11/pybind11.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 #include <pybind11/functional.h>
@@ -5,6 +11,10 @@
 #include <string>
 #include <vector>
 #include <map>
+#include <cstdint>
+#include <algorithm>
+#include <utility>
+#include <variant>
 #include <expected>
 
 // Include your C++ headers
@@ -16,6 +26,168 @@
 
 namespace py = pybind11;
 
+// nlohmann::json <-> Python conversion. File info and metadata are built
+// straight into dict/list/str/int/float/bool/None objects instead of being
+// dumped to a string in C++ and parsed again with json.loads in Python.
+namespace pybind11::detail {
+
+template <> struct type_caster<nlohmann::json> {
+public:
+    PYBIND11_TYPE_CASTER(nlohmann::json, const_name("object"));
+    
+    bool load(handle source, bool) {
+        try {
+            value = fromPython(source);
+            return true;
+        } catch (const std::exception&) {
+            return false;
+        }
+    }
+    
+    static handle cast(const nlohmann::json& source, return_value_policy, handle) {
+        return toPython(source).release();
+    }
+    
+private:
+    static object toPython(const nlohmann::json& j) {
+        switch (j.type()) {
+            case nlohmann::json::value_t::null:
+            case nlohmann::json::value_t::discarded:
+                return none();
+            case nlohmann::json::value_t::boolean:
+                return bool_(j.get<bool>());
+            case nlohmann::json::value_t::number_integer:
+                return int_(j.get<int64_t>());
+            case nlohmann::json::value_t::number_unsigned:
+                return int_(j.get<uint64_t>());
+            case nlohmann::json::value_t::number_float:
+                return float_(j.get<double>());
+            case nlohmann::json::value_t::string:
+                return str(j.get_ref<const std::string&>());
+            case nlohmann::json::value_t::binary: {
+                const auto& binary = j.get_binary();
+                return bytes(reinterpret_cast<const char*>(binary.data()), binary.size());
+            }
+            case nlohmann::json::value_t::array: {
+                list result(j.size());
+                size_t index = 0;
+                for (const auto& element : j) {
+                    result[index++] = toPython(element);
+                }
+                return std::move(result);
+            }
+            case nlohmann::json::value_t::object: {
+                dict result;
+                for (const auto& [key, element] : j.items()) {
+                    result[str(key)] = toPython(element);
+                }
+                return std::move(result);
+            }
+        }
+        return none();
+    }
+    
+    static nlohmann::json fromPython(handle source) {
+        if (source.is_none()) {
+            return nullptr;
+        }
+        if (isinstance<bool_>(source)) {
+            return source.cast<bool>();
+        }
+        if (isinstance<int_>(source)) {
+            // Negative values and anything that fits go through int64
+            try {
+                return source.cast<int64_t>();
+            } catch (const cast_error&) {
+                return source.cast<uint64_t>();
+            }
+        }
+        if (isinstance<float_>(source)) {
+            return source.cast<double>();
+        }
+        if (isinstance<str>(source)) {
+            return source.cast<std::string>();
+        }
+        if (isinstance<bytes>(source)) {
+            std::string raw = source.cast<std::string>();
+            return nlohmann::json::binary(std::vector<uint8_t>(raw.begin(), raw.end()));
+        }
+        if (isinstance<dict>(source)) {
+            nlohmann::json result = nlohmann::json::object();
+            for (auto item : reinterpret_borrow<dict>(source)) {
+                result[str(item.first).cast<std::string>()] = fromPython(item.second);
+            }
+            return result;
+        }
+        if (isinstance<list>(source) || isinstance<tuple>(source)) {
+            nlohmann::json result = nlohmann::json::array();
+            for (auto element : source) {
+                result.push_back(fromPython(element));
+            }
+            return result;
+        }
+        throw type_error("Object of type " + std::string(str(type::handle_of(source).attr("__name__"))) +
+                         " is not JSON serializable");
+    }
+};
+
+}  // namespace pybind11::detail
+
+// One entry of the module directory: everything needed to list a module
+// without decoding its payload
+struct ModuleRecord {
+    std::string uuid;
+    std::string schema_id;
+    std::string schema_path;
+    std::string type;
+    std::string encounter_id;
+    std::string parent_id;      // empty for top-level modules
+    std::string relationship;   // "", "variant" or "annotation"
+};
+
+namespace {
+
+template <typename T>
+T jsonValue(const nlohmann::json& object, const char* key, T fallback) {
+    auto it = object.find(key);
+    if (it == object.end() || it->is_null()) {
+        return fallback;
+    }
+    try {
+        return it->get<T>();
+    } catch (const nlohmann::json::exception&) {
+        return fallback;
+    }
+}
+
+// Record encounter and parent of every module in an encounter's module tree.
+// Children are listed under "variant"/"annotation" (or their plurals).
+void walkModuleTree(const nlohmann::json& nodes, const std::string& encounterId, const std::string& parentId,
+                    const std::string& relationship, std::map<std::string, ModuleRecord>& records) {
+    if (!nodes.is_array()) {
+        return;
+    }
+    for (const auto& node : nodes) {
+        std::string id = jsonValue<std::string>(node, "id", "");
+        if (id.empty()) {
+            continue;
+        }
+        auto& record = records[id];
+        record.uuid = id;
+        record.encounter_id = encounterId;
+        record.parent_id = parentId;
+        record.relationship = relationship;
+        for (const char* key : {"variant", "variants"}) {
+            if (node.contains(key)) walkModuleTree(node[key], encounterId, id, "variant", records);
+        }
+        for (const char* key : {"annotation", "annotations"}) {
+            if (node.contains(key)) walkModuleTree(node[key], encounterId, id, "annotation", records);
+        }
+    }
+}
+
+}  // namespace
+
 // Python wrapper for Writer
 class PyWriter {
 private:
@@ -80,6 +252,36 @@ public:
         return reader.getModuleData(moduleId);
     }
     
+    // Frames [start, start + count) of an image module together with the
+    // module's total frame count, so a viewer can page through frames without
+    // a Python round trip per frame. The requested range is clamped.
+    std::expected<std::pair<size_t, std::vector<ModuleData>>, std::string> getFrames(const std::string& moduleId, size_t start, size_t count) {
+        auto module = reader.getModuleData(moduleId);
+        if (!module) {
+            return std::unexpected(module.error());
+        }
+        
+        const auto* frames = std::get_if<std::vector<ModuleData>>(&module->getData());
+        if (!frames) {
+            return std::unexpected("Module " + moduleId + " has no frames");
+        }
+        
+        size_t total = frames->size();
+        size_t first = std::min(start, total);
+        size_t last = std::min(total, first + count);
+        return std::make_pair(total, std::vector<ModuleData>(frames->begin() + first, frames->begin() + last));
+    }
+    
+    // Several modules in one native call; each entry carries its own error
+    std::vector<std::expected<ModuleData, std::string>> getModulesData(const std::vector<std::string>& moduleIds) {
+        std::vector<std::expected<ModuleData, std::string>> modules;
+        modules.reserve(moduleIds.size());
+        for (const auto& moduleId : moduleIds) {
+            modules.push_back(reader.getModuleData(moduleId));
+        }
+        return modules;
+    }
+    
     std::expected<std::vector<ModuleTrail>, std::string> getAuditTrail(const UUID& moduleId) {
         return reader.getAuditTrail(moduleId);
     }
@@ -88,21 +290,48 @@ public:
         return reader.getAuditData(module);
     }
     
+    // Historical versions of several trail entries in one native call; each
+    // entry carries its own error
+    std::vector<std::expected<ModuleData, std::string>> getAuditDataBatch(const std::vector<ModuleTrail>& trails) {
+        std::vector<std::expected<ModuleData, std::string>> versions;
+        versions.reserve(trails.size());
+        for (const auto& trail : trails) {
+            versions.push_back(reader.getAuditData(trail));
+        }
+        return versions;
+    }
+    
     Result closeFile() {
         return reader.closeFile();
     }
     
-    // Additional convenience method for getting all modules
-    std::map<std::string, py::object> getAllModules() {
-        std::map<std::string, py::object> modules;
-        try {
-            auto fileInfo = reader.getFileInfo();
-            // This would need to be implemented based on your specific needs
-            // For now, return empty map
-            return modules;
-        } catch (const std::exception& e) {
-            return modules;
+    // Directory of every module in the open file, built from the header and
+    // module graph only - no payload is read or decrypted
+    std::vector<ModuleRecord> getAllModules() {
+        nlohmann::json fileInfo = reader.getFileInfo();
+        
+        std::map<std::string, ModuleRecord> records;
+        const auto& graph = fileInfo.contains("module_graph") ? fileInfo["module_graph"] : nlohmann::json::object();
+        if (graph.contains("encounters") && graph["encounters"].is_array()) {
+            for (const auto& encounter : graph["encounters"]) {
+                walkModuleTree(encounter.value("module_tree", nlohmann::json::array()),
+                               jsonValue<std::string>(encounter, "encounter_id", ""), "", "", records);
+            }
         }
+        
+        std::vector<ModuleRecord> directory;
+        const auto& modules = fileInfo.contains("modules") ? fileInfo["modules"] : nlohmann::json::array();
+        directory.reserve(modules.size());
+        for (const auto& module : modules) {
+            std::string uuid = jsonValue<std::string>(module, "uuid", "");
+            ModuleRecord record = records.count(uuid) ? records[uuid] : ModuleRecord{};
+            record.uuid = uuid;
+            record.schema_id = jsonValue<std::string>(module, "schema_id", "");
+            record.schema_path = jsonValue<std::string>(module, "schema_path", "");
+            record.type = jsonValue<std::string>(module, "type", "");
+            directory.push_back(std::move(record));
+        }
+        return directory;
     }
 };
 
@@ -121,27 +350,45 @@ PYBIND11_MODULE(umdf_cpp, m) {
     m.doc() = "Python bindings for UMDF C++ reader/writer - matching current API";
     
     // PyWriter class - updated to match current Writer API
+    // File I/O, encryption and compression run without the GIL so other
+    // Python threads keep running. Arguments and results are converted
+    // before and after the guard, while the GIL is held.
+    using release_gil = py::call_guard<py::gil_scoped_release>;
+    
     py::class_<PyWriter>(m, "Writer")
         .def(py::init<>())
-        .def("create_new_file", &PyWriter::createNewFile)
-        .def("openFile", &PyWriter::openFile)
-        .def("update_module", &PyWriter::updateModule)
-        .def("create_new_encounter", &PyWriter::createNewEncounter)
-        .def("add_module_to_encounter", &PyWriter::addModuleToEncounter)
-        .def("add_variant_module", &PyWriter::addVariantModule)
-        .def("add_annotation", &PyWriter::addAnnotation)
-        .def("closeFile", &PyWriter::closeFile);
+        .def("create_new_file", &PyWriter::createNewFile, release_gil())
+        .def("openFile", &PyWriter::openFile, release_gil())
+        .def("update_module", &PyWriter::updateModule, release_gil())
+        .def("create_new_encounter", &PyWriter::createNewEncounter, release_gil())
+        .def("add_module_to_encounter", &PyWriter::addModuleToEncounter, release_gil())
+        .def("add_variant_module", &PyWriter::addVariantModule, release_gil())
+        .def("add_annotation", &PyWriter::addAnnotation, release_gil())
+        .def("closeFile", &PyWriter::closeFile, release_gil());
     
     // PyReader class - matching UMDF project API
     py::class_<PyReader>(m, "Reader")
         .def(py::init<>())
-        .def("openFile", &PyReader::openFile, "Open a UMDF file")
-        .def("getFileInfo", &PyReader::getFileInfo, "Get file information")
-        .def("getModuleData", &PyReader::getModuleData, "Get data for a specific module")
-        .def("getAuditTrail", &PyReader::getAuditTrail, "Get audit trail for a module")
-        .def("getAuditData", &PyReader::getAuditData, "Get audit data for a module")
-        .def("closeFile", &PyReader::closeFile, "Close the currently open file")
-        .def("getAllModules", &PyReader::getAllModules, "Get all modules from the file");
+        .def("openFile", &PyReader::openFile, "Open a UMDF file", release_gil())
+        .def("getFileInfo", &PyReader::getFileInfo, "Get file information", release_gil())
+        .def("getModuleData", &PyReader::getModuleData, "Get data for a specific module", release_gil())
+        .def("getFrames", &PyReader::getFrames, "Get (total frame count, frames[start:start + count]) of an image module",
+             py::arg("moduleId"), py::arg("start") = 0, py::arg("count") = 1, release_gil())
+        .def("getModulesData", &PyReader::getModulesData, "Get data for several modules in one call", release_gil())
+        .def("getAuditTrail", &PyReader::getAuditTrail, "Get audit trail for a module", release_gil())
+        .def("getAuditData", &PyReader::getAuditData, "Get audit data for a module", release_gil())
+        .def("getAuditDataBatch", &PyReader::getAuditDataBatch, "Get audit data for several trail entries in one call", release_gil())
+        .def("closeFile", &PyReader::closeFile, "Close the currently open file", release_gil())
+        .def("getAllModules", &PyReader::getAllModules, "List every module without reading payloads", release_gil());
+    
+    py::class_<ModuleRecord>(m, "ModuleRecord")
+        .def_readonly("uuid", &ModuleRecord::uuid)
+        .def_readonly("schema_id", &ModuleRecord::schema_id)
+        .def_readonly("schema_path", &ModuleRecord::schema_path)
+        .def_readonly("type", &ModuleRecord::type)
+        .def_readonly("encounter_id", &ModuleRecord::encounter_id)
+        .def_readonly("parent_id", &ModuleRecord::parent_id)
+        .def_readonly("relationship", &ModuleRecord::relationship);
     
     // ModuleData class
     py::class_<ModuleData>(m, "ModuleData")
@@ -7,7 +7,16 @@ Provides a clean, Pythonic interface to the UMDF functionality
 import sys
 import os
 import json
-from typing import Dict, List, Any, Optional, Union
+import asyncio
+import functools
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Union, Callable
+
+import numpy as np
 
 # Import the main UMDF module
 try:
@@ -18,17 +27,72 @@ except ImportError as e:
     print("Make sure to run: pip install -e ../UMDF/python_package --force-reinstall")
     sys.exit(1)
 
+try:
+    from .mapped_frames import MappedFrameStore, mmap_mode_from_env
+except ImportError:
+    from mapped_frames import MappedFrameStore, mmap_mode_from_env
+
+# Audit trail entries returned per page
+AUDIT_PAGE_SIZE = 50
+
+# Bytes (as JSON) of reconstructed historical module versions kept per reader
+AUDIT_VERSION_CACHE_BYTES = int(os.getenv("UMDF_AUDIT_CACHE_BYTES", str(64 * 1024 ** 2)))
+
 class UMDFReader:
-    """High-level wrapper for reading UMDF files"""
+    """High-level wrapper for reading UMDF files
+    
+    Audit trails and the historical versions reconstructed from them are
+    cached until the file is closed; see get_audit_page and get_audit_versions.
+    """
     
     def __init__(self):
-        self.reader = umdf.Reader()
+        self._reader = umdf.Reader()
+        self._deferred = None
         self.current_file = None
+        self._audit_trails: Dict[str, list] = {}
+        # (module id, trail index) -> (version, its size in bytes as JSON)
+        self._audit_versions: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._audit_version_bytes = 0
+    
+    @property
+    def reader(self):
+        """The C++ reader; a file opened with defer_open is opened on first access."""
+        if self._deferred:
+            filepath, password = self._deferred
+            self._deferred = None
+            result = self._reader.openFile(filepath, password)
+            if not result.success:
+                self.current_file = None
+                raise RuntimeError(f"Failed to open file: {result.message}")
+        return self._reader
+    
+    def defer_open(self, filepath: str, password: str = "") -> None:
+        """Make filepath the current file without opening it yet.
+        
+        The C++ reader opens it the first time ``reader`` is used, so a
+        caller that already knows the file's listing pays nothing until
+        module data is actually read.
+        """
+        self._deferred = (filepath, password)
+        self.current_file = filepath
+        self._reset_audit_cache()
+    
+    def cancel_deferred_open(self) -> None:
+        """Forget a pending defer_open, e.g. before opening another file directly.
+        
+        Also drops the audit caches, which belong to the file opened before.
+        """
+        self._reset_audit_cache()
+        if self._deferred:
+            self._deferred = None
+            self.current_file = None
     
     def read_file(self, filepath: str, password: str = "") -> bool:
         """Open and read a UMDF file"""
+        self._deferred = None
+        self._reset_audit_cache()
         try:
-            result = self.reader.openFile(filepath, password)
+            result = self._reader.openFile(filepath, password)
             if result.success:
                 self.current_file = filepath
                 return True
@@ -45,9 +109,9 @@ class UMDFReader:
             raise RuntimeError("No file loaded. Call read_file() first.")
         
         try:
-            file_info = self.reader.getFileInfo()
-            # Convert nlohmann::json to Python dict
-            return json.loads(file_info.dump()) if hasattr(file_info, 'dump') else file_info
+            # The bindings convert nlohmann::json to a dict natively; older
+            # builds return a json handle that has to go through dump()
+            return plain_json(self.reader.getFileInfo())
         except Exception as e:
             print(f"Error getting file info: {e}")
             return {}
@@ -64,7 +128,7 @@ class UMDFReader:
                 # Convert ModuleData to Python dict
                 return {
                     'id': str(module_data.id) if hasattr(module_data, 'id') else module_id,
-                    'metadata': json.loads(module_data.metadata.dump()) if hasattr(module_data.metadata, 'dump') else {},
+                    'metadata': plain_json(module_data.get_metadata()),
                     'data': self._extract_module_data(module_data)
                 }
             else:
@@ -80,30 +144,114 @@ class UMDFReader:
             raise RuntimeError("No file loaded. Call read_file() first.")
         
         try:
-            # Convert string module_id to UUID if needed
-            uuid_obj = umdf.UUID.fromString(module_id) if isinstance(module_id, str) else module_id
-            result = self.reader.getAuditTrail(uuid_obj)
-            
-            if result.has_value():
-                trails = result.value()
-                audit_data = []
-                for trail in trails:
-                    trail_info = {
-                        'module_id': str(trail.moduleId) if hasattr(trail, 'moduleId') else '',
-                        'timestamp': str(trail.timestamp) if hasattr(trail, 'timestamp') else '',
-                        'action': str(trail.action) if hasattr(trail, 'action') else ''
-                    }
-                    audit_data.append(trail_info)
-                return audit_data
-            else:
-                print(f"Audit trail not found: {result.error()}")
-                return []
+            return [_trail_info(index, trail) for index, trail in enumerate(self._trails(module_id))]
         except Exception as e:
             print(f"Error getting audit trail for {module_id}: {e}")
             return []
     
+    def get_audit_page(self, module_id: str, offset: int = 0, limit: int = AUDIT_PAGE_SIZE) -> Dict[str, Any]:
+        """One page of a module's audit trail: ``{"total", "offset", "entries"}``.
+        
+        Each entry carries its ``index`` in the trail, which is what
+        get_audit_versions takes. Raises ValueError for a malformed module id
+        and LookupError if the module has no trail.
+        """
+        if not self.current_file:
+            raise RuntimeError("No file loaded. Call read_file() first.")
+        
+        trails = self._trails(module_id)
+        offset = max(0, offset)
+        limit = max(0, limit)
+        return {
+            "total": len(trails),
+            "offset": offset,
+            "entries": [_trail_info(index, trails[index]) for index in range(offset, min(len(trails), offset + limit))]
+        }
+    
+    def get_audit_versions(self, module_id: str, indices: List[int]) -> Dict[int, Dict[str, Any]]:
+        """The module as it was at the given audit trail entries.
+        
+        Returns {index: {"id", "metadata", "data"}} like get_module_data, or
+        {index: {"error": ...}} for entries that cannot be reconstructed.
+        Versions not in the cache are fetched with one batched call.
+        """
+        if not self.current_file:
+            raise RuntimeError("No file loaded. Call read_file() first.")
+        
+        trails = self._trails(module_id)
+        versions = {}
+        missing = []
+        for index in dict.fromkeys(indices):
+            key = (module_id, index)
+            if key in self._audit_versions:
+                self._audit_versions.move_to_end(key)
+                versions[index] = self._audit_versions[key][0]
+            elif 0 <= index < len(trails):
+                missing.append(index)
+            else:
+                versions[index] = {"error": f"Audit entry {index} out of range (trail has {len(trails)} entries)"}
+        
+        if missing:
+            results = read_audit_versions(self.reader, [trails[index] for index in missing])
+            for index, result in zip(missing, results):
+                if not result.has_value():
+                    # Not cached: a failed reconstruction may succeed on retry
+                    versions[index] = {"error": result.error()}
+                    continue
+                module_data = result.value()
+                version = {
+                    'id': str(module_data.id) if hasattr(module_data, 'id') else module_id,
+                    'metadata': plain_json(module_data.get_metadata()),
+                    'data': self._extract_module_data(module_data)
+                }
+                versions[index] = version
+                self._cache_audit_version((module_id, index), version)
+        
+        return {index: versions[index] for index in dict.fromkeys(indices)}
+    
+    def _cache_audit_version(self, key: tuple, version: Dict[str, Any]) -> None:
+        size = len(json.dumps(version, default=str))
+        if size > AUDIT_VERSION_CACHE_BYTES:
+            return
+        self._audit_versions[key] = (version, size)
+        self._audit_version_bytes += size
+        while self._audit_version_bytes > AUDIT_VERSION_CACHE_BYTES:
+            _, (_, evicted_size) = self._audit_versions.popitem(last=False)
+            self._audit_version_bytes -= evicted_size
+    
+    def _trails(self, module_id: str) -> list:
+        """The raw ModuleTrail entries of a module, read once per open file.
+        
+        Raises ValueError for a malformed module id and LookupError if the
+        module has no trail.
+        """
+        trails = self._audit_trails.get(module_id)
+        if trails is None:
+            # Convert string module_id to UUID if needed
+            try:
+                uuid_obj = umdf.UUID.fromString(module_id) if isinstance(module_id, str) else module_id
+            except Exception as e:
+                raise ValueError(f"Invalid module id {module_id!r}: {e}")
+            result = self.reader.getAuditTrail(uuid_obj)
+            if not result.has_value():
+                raise LookupError(f"Audit trail not found: {result.error()}")
+            trails = list(result.value())
+            self._audit_trails[module_id] = trails
+        return trails
+    
+    def _reset_audit_cache(self) -> None:
+        self._audit_trails = {}
+        self._audit_versions = OrderedDict()
+        self._audit_version_bytes = 0
+    
     def close_file(self) -> bool:
         """Close the currently open file"""
+        self._reset_audit_cache()
+        if self._deferred:
+            # Never actually opened
+            self._deferred = None
+            self.current_file = None
+            return True
         try:
             result = self.reader.closeFile()
             if result.success:
@@ -116,25 +264,445 @@ class UMDFReader:
             print(f"Error closing file: {e}")
             return False
     
+    def list_modules(self) -> List[Dict[str, Any]]:
+        """List every module of the open file without reading any payload"""
+        if not self.current_file:
+            raise RuntimeError("No file loaded. Call read_file() first.")
+        return module_directory(self.reader)
+    
     def _extract_module_data(self, module_data) -> Any:
         """Extract data from ModuleData object based on its type"""
         try:
-            # This is a simplified extraction - you might need to expand this
-            # based on your specific ModuleData structure
-            if hasattr(module_data, 'data'):
-                # Handle different data types (tabular, image, nested, etc.)
-                return "Data extracted"  # Placeholder
-            return None
+            data = module_data.get_data()
+            if isinstance(data, list) and data and hasattr(data[0], 'get_data'):
+                # Image modules: one nested ModuleData per frame. Pixel data
+                # stays in C++; fetch it with frame_buffer().
+                return {
+                    'type': 'image',
+                    'frame_count': len(data),
+                    'frames': [{'metadata': plain_json(frame.get_metadata())} for frame in data]
+                }
+            if isinstance(data, list):
+                return {'type': 'tabular', 'records': [plain_json(row) for row in data]}
+            return {'type': 'unknown', 'raw_data': plain_json(data)}
         except Exception as e:
             print(f"Error extracting module data: {e}")
             return None
 
+def plain_json(value) -> Any:
+    """Convert an nlohmann::json handle to plain Python values.
+    
+    Values the bindings already converted natively pass through untouched;
+    only builds without the json type caster pay for the dump/parse round trip.
+    """
+    return json.loads(value.dump()) if hasattr(value, 'dump') else value
+
+# Keys of a module directory record, in the order of the native ModuleRecord
+MODULE_RECORD_FIELDS = (
+    'uuid', 'schema_id', 'schema_path', 'type', 'encounter_id',
+    'parent_id', 'relationship'
+)
+
+def _module_graph_links(module_graph: Dict[str, Any]) -> Dict[str, Dict[str, str]]:
+    """Map module id to its encounter, parent and relationship from the module graph"""
+    links = {}
+    
+    def walk(nodes, encounter_id, parent_id, relationship):
+        for node in nodes or []:
+            module_id = node.get('id') if isinstance(node, dict) else None
+            if not module_id:
+                continue
+            links[module_id] = {'encounter_id': encounter_id, 'parent_id': parent_id, 'relationship': relationship}
+            for key in ('variant', 'variants'):
+                walk(node.get(key), encounter_id, module_id, 'variant')
+            for key in ('annotation', 'annotations'):
+                walk(node.get(key), encounter_id, module_id, 'annotation')
+    
+    for encounter in module_graph.get('encounters', []):
+        walk(encounter.get('module_tree'), encounter.get('encounter_id', ''), '', '')
+    return links
+
+def module_directory(reader) -> List[Dict[str, Any]]:
+    """List every module of the file open on a raw C++ reader.
+    
+    Each record holds the module's uuid, schema, type, encounter and parent
+    (with the relationship "variant" or "annotation"). Built from the file
+    header and module graph only, so no payload is read or decrypted. Uses the native
+    ``getAllModules`` listing when the bindings provide it.
+    """
+    native = reader.getAllModules() if hasattr(reader, 'getAllModules') else None
+    if isinstance(native, list):
+        return [{field: getattr(record, field) for field in MODULE_RECORD_FIELDS} for record in native]
+    
+    file_info = plain_json(reader.getFileInfo())
+    links = _module_graph_links(file_info.get('module_graph', {}))
+    directory = []
+    for module in file_info.get('modules', []):
+        uuid = module.get('uuid', '')
+        link = links.get(uuid, {})
+        directory.append({
+            'uuid': uuid,
+            'schema_id': module.get('schema_id', ''),
+            'schema_path': module.get('schema_path', ''),
+            'type': module.get('type', ''),
+            'encounter_id': link.get('encounter_id', ''),
+            'parent_id': link.get('parent_id', ''),
+            'relationship': link.get('relationship', '')
+        })
+    return directory
+
+def read_frames(reader, module_id: str, start: int = 0, count: int = 1) -> Dict[str, Any]:
+    """Read frames [start, start + count) of an image module on a raw C++ reader.
+    
+    Uses the native ``getFrames`` when the bindings provide it; otherwise the
+    module is read once and sliced. Returns ``{"total": frame count,
+    "start": start, "frames": [frame ModuleData, ...]}``.
+    
+    Raises LookupError for a negative start, which names no frame.
+    """
+    if start < 0:
+        raise LookupError(f"Frame {start} out of range")
+    count = max(0, count)
+    if hasattr(reader, 'getFrames'):
+        result = reader.getFrames(module_id, start, count)
+        if not result.has_value():
+            raise LookupError(result.error())
+        total, frames = result.value()
+        return {"total": total, "start": start, "frames": list(frames)}
+    
+    result = reader.getModuleData(module_id)
+    if not result.has_value():
+        raise LookupError(result.error())
+    frames = result.value().get_data()
+    if not isinstance(frames, list) or (frames and not hasattr(frames[0], 'get_data')):
+        raise LookupError(f"Module {module_id} has no frames")
+    return {"total": len(frames), "start": start, "frames": frames[start:start + count]}
+
+def frame_views(reader, file_path: str, module_id: str, frame_store: Optional[MappedFrameStore] = None) -> List[memoryview]:
+    """Binary data of every frame of an image module on a raw C++ reader.
+    
+    With a frame store the frames are decoded once, written to the store and
+    returned as views over its memory mapping, shared with every other reader
+    and process using the same store. Without one they are views of the
+    decoded frames (see frame_buffer).
+    
+    Raises LookupError if the module cannot be read or has no frames.
+    """
+    def load():
+        frames = read_frames(reader, module_id, 0, sys.maxsize)["frames"]
+        return [frame_buffer(frame) for frame in frames]
+    
+    if frame_store is None:
+        return load()
+    return frame_store.views(file_path, module_id, load)
+
+def _trail_info(index: int, trail) -> Dict[str, Any]:
+    return {
+        'index': index,
+        'module_id': str(trail.moduleId) if hasattr(trail, 'moduleId') else '',
+        'timestamp': str(trail.timestamp) if hasattr(trail, 'timestamp') else '',
+        'action': str(trail.action) if hasattr(trail, 'action') else ''
+    }
+
+def read_audit_versions(reader, trails: list) -> list:
+    """Reconstruct the module versions of several audit trail entries on a raw C++ reader.
+    
+    Returns one ExpectedModuleData per trail entry, using the native
+    ``getAuditDataBatch`` when available.
+    """
+    if hasattr(reader, 'getAuditDataBatch'):
+        return list(reader.getAuditDataBatch(list(trails)))
+    return [reader.getAuditData(trail) for trail in trails]
+
+def read_modules_data(reader, module_ids: List[str]) -> Dict[str, Any]:
+    """Read several modules on a raw C++ reader in one call.
+    
+    Returns {module_id: ExpectedModuleData}, using the native
+    ``getModulesData`` when available.
+    """
+    if hasattr(reader, 'getModulesData'):
+        return dict(zip(module_ids, reader.getModulesData(list(module_ids))))
+    return {module_id: reader.getModuleData(module_id) for module_id in module_ids}
+
+class UMDFReaderPool:
+    """Pool of readers on the same file for concurrent module reads.
+    
+    A single C++ reader is not safe to share between threads, so each read
+    checks out a reader of its own. Readers are opened lazily, up to
+    ``size`` (``UMDF_READER_POOL_SIZE``, default min(4, cpu count)), the
+    first time concurrent reads need them, and reads are dispatched to a
+    thread pool of the same size so independent module reads run in
+    parallel instead of blocking the event loop.
+    
+    Reopening the pool on another file (or closing it) retires the current
+    readers; readers still checked out are closed when they are returned.
+    
+    In memory-mapped read mode (``mmap_mode``, default ``UMDF_MMAP_FRAMES``)
+    frame payloads are served from a MappedFrameStore shared by all readers.
+    The cached frames of a file are purged when the pool leaves it.
+    """
+    
+    def __init__(self, size: Optional[int] = None, mmap_mode: Optional[bool] = None):
+        self.size = max(1, size or int(os.getenv("UMDF_READER_POOL_SIZE", "0")) or min(4, os.cpu_count() or 1))
+        if mmap_mode is None:
+            mmap_mode = mmap_mode_from_env()
+        self.frame_store = MappedFrameStore() if mmap_mode else None
+        self.file_path = None
+        self._password = ""
+        self._generation = 0
+        self._idle: List[UMDFReader] = []
+        self._opened = 0
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="umdf-read")
+    
+    def open(self, file_path: str, password: str = "") -> None:
+        """Point the pool at a file; readers are opened on first use."""
+        with self._condition:
+            retired = self._retire()
+            previous, self.file_path = self.file_path, file_path
+            self._password = password
+        self._close_readers(retired)
+        self._purge_frames(previous)
+    
+    def close(self) -> None:
+        """Close every idle reader; checked-out readers close when returned."""
+        with self._condition:
+            retired = self._retire()
+            previous, self.file_path = self.file_path, None
+            self._password = ""
+        self._close_readers(retired)
+        self._purge_frames(previous)
+    
+    @property
+    def mapped(self) -> bool:
+        """Whether frames of the open file are served from the memory-mapped store."""
+        return bool(self.file_path) and self.frame_store is not None and self.frame_store.accepts(self._password)
+    
+    def _retire(self) -> List[UMDFReader]:
+        # Caller holds the condition
+        retired = self._idle
+        self._idle = []
+        self._opened = 0
+        self._generation += 1
+        self._condition.notify_all()
+        return retired
+    
+    def _close_readers(self, readers: List[UMDFReader]) -> None:
+        for reader in readers:
+            reader.close_file()
+    
+    def _purge_frames(self, file_path: Optional[str]) -> None:
+        # Also drops entries of earlier versions of the file (before a save)
+        if file_path and self.frame_store is not None:
+            self.frame_store.purge(file_path)
+    
+    @contextmanager
+    def reader(self, timeout: Optional[float] = None):
+        """Check out a reader for the open file, waiting if all of them are busy."""
+        with self._condition:
+            if not self.file_path:
+                raise RuntimeError("No file open in reader pool")
+            generation = self._generation
+            file_path, password = self.file_path, self._password
+            
+            while not self._idle and self._opened >= self.size:
+                if not self._condition.wait(timeout):
+                    raise TimeoutError("Timed out waiting for a free UMDF reader")
+                if self._generation != generation:
+                    raise RuntimeError("UMDF file was closed while waiting for a reader")
+            
+            reader = self._idle.pop() if self._idle else None
+            if reader is None:
+                # Reserve the slot before opening outside the lock
+                self._opened += 1
+        
+        if reader is None:
+            reader = UMDFReader()
+            if not reader.read_file(file_path, password):
+                with self._condition:
+                    if self._generation == generation:
+                        self._opened -= 1
+                        self._condition.notify()
+                raise RuntimeError(f"Failed to open pooled reader for {file_path}")
+        
+        try:
+            yield reader
+        finally:
+            with self._condition:
+                current = self._generation == generation
+                if current:
+                    self._idle.append(reader)
+                    self._condition.notify()
+            if not current:
+                reader.close_file()
+    
+    def _call(self, fn: Callable, args: tuple) -> Any:
+        with self.reader() as pooled:
+            return fn(pooled.reader, *args)
+    
+    def call(self, fn: Callable, *args) -> Any:
+        """Run fn(raw C++ reader, *args) on a pooled reader in the calling thread."""
+        return self._call(fn, args)
+    
+    async def run(self, fn: Callable, *args) -> Any:
+        """Run fn(raw C++ reader, *args) on a pooled reader in the read thread pool."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn, args)
+    
+    async def get_module_data(self, module_id: str):
+        """Read a module's ExpectedModuleData on a pooled reader."""
+        return await self.run(lambda reader: reader.getModuleData(module_id))
+    
+    async def get_frames(self, module_id: str, start: int = 0, count: int = 1) -> Dict[str, Any]:
+        """Read a frame range of an image module on a pooled reader (see read_frames)."""
+        return await self.run(read_frames, module_id, start, count)
+    
+    async def get_modules_data(self, module_ids: List[str]) -> Dict[str, Any]:
+        """Read several modules on one pooled reader (see read_modules_data)."""
+        return await self.run(read_modules_data, module_ids)
+    
+    async def get_frame_view(self, module_id: str, index: int):
+        """Return (frame count, read-only view of frame ``index`` or None if out of range).
+        
+        In memory-mapped mode the view is over the shared mapping; otherwise
+        only the requested frame is read.
+        """
+        if self.mapped:
+            file_path = self.file_path
+            views = await self.run(lambda reader: frame_views(reader, file_path, module_id, self.frame_store))
+            return len(views), views[index] if 0 <= index < len(views) else None
+        
+        frame_range = await self.get_frames(module_id, index, 1)
+        frames = frame_range["frames"]
+        return frame_range["total"], frame_buffer(frames[0]) if frames else None
+
+# Queued operations that trigger a flush of a batching writer
+WRITER_BATCH_SIZE = int(os.getenv("UMDF_WRITER_BATCH_SIZE", "64"))
+
+# Seconds the oldest queued operation may wait before the next queue call flushes
+WRITER_FLUSH_INTERVAL = float(os.getenv("UMDF_WRITER_FLUSH_INTERVAL", "2"))
+
+# Frame bytes of modules written in an edit session kept readable before the file is saved
+PENDING_FRAME_BYTES = int(os.getenv("UMDF_PENDING_FRAME_BYTES", str(512 * 1024 ** 2)))
+
+def _as_uuid(value):
+    return umdf.UUID.fromString(value) if isinstance(value, str) else value
+
+def _frames(module_data) -> list:
+    data = module_data.get_data()
+    return data if isinstance(data, list) and data and hasattr(data[0], 'get_data') else []
+
+def _without_frame_payloads(module_data):
+    """Copy of an image ModuleData with its metadata and frame metadata but no frame data."""
+    stripped = umdf.ModuleData()
+    stripped.set_metadata(plain_json(module_data.get_metadata()))
+    frames = []
+    for frame in _frames(module_data):
+        frame_module_data = umdf.ModuleData()
+        frame_module_data.set_metadata(plain_json(frame.get_metadata()))
+        frames.append(frame_module_data)
+    stripped.set_nested_data(frames)
+    return stripped
+
+def tabular_module_data(metadata: dict, data: list, author: str = None):
+    """Build a tabular ModuleData from metadata and a list of rows."""
+    module_data = umdf.ModuleData()
+    
+    if hasattr(module_data, 'set_metadata'):
+        module_data.set_metadata(metadata)
+    elif hasattr(module_data, 'setMetadata'):
+        module_data.setMetadata(metadata)
+    
+    if hasattr(module_data, 'set_tabular_data'):
+        module_data.set_tabular_data(data)
+    elif hasattr(module_data, 'setTabularData'):
+        module_data.setTabularData(data)
+    
+    if author and hasattr(module_data, 'set_author'):
+        module_data.set_author(author)
+    elif author and hasattr(module_data, 'setAuthor'):
+        module_data.setAuthor(author)
+    return module_data
+
+class WriterOperation:
+    """A writer call queued by a batching UMDFWriter, and its outcome once flushed.
+    
+    ``status`` is "queued" until the operation is flushed, then "applied"
+    (``result`` holds the new encounter or module id) or "failed" (``error``
+    says why). Operations dropped by cancel_and_close() end up "discarded".
+    A queued operation can be passed as the encounter or parent id of a
+    later one; it is resolved to its id when the batch is applied.
+    """
+    
+    QUEUED = "queued"
+    APPLIED = "applied"
+    FAILED = "failed"
+    DISCARDED = "discarded"
+    
+    def __init__(self, sequence: int, kind: str, args: Dict[str, Any]):
+        self.sequence = sequence
+        self.kind = kind
+        self.args = args
+        self.status = self.QUEUED
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.queued_at = time.monotonic()
+    
+    @property
+    def done(self) -> bool:
+        return self.status != self.QUEUED
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sequence": self.sequence,
+            "operation": self.kind,
+            "status": self.status,
+            "id": self.result,
+            "error": self.error
+        }
+    
+    def __repr__(self) -> str:
+        return f"WriterOperation(#{self.sequence} {self.kind}, {self.status})"
+
+class FailedOperationsError(RuntimeError):
+    """Raised by UMDFWriter.close_file() while queued operations have failed."""
+    
+    def __init__(self, operations: List[WriterOperation]):
+        self.operations = list(operations)
+        super().__init__(f"{len(self.operations)} queued writer operations failed: "
+                         + "; ".join(f"{op.kind} #{op.sequence}: {op.error}" for op in self.operations))
+
 class UMDFWriter:
-    """High-level wrapper for writing UMDF files"""
+    """High-level wrapper for writing UMDF files
     
-    def __init__(self):
+    Besides the immediate calls, the writer can queue operations with
+    queue_new_encounter(), queue_module_to_encounter() and
+    queue_variant_module(). Queued operations are applied to the C++ writer
+    in order, in one go, when ``batch_size`` operations are waiting, when
+    the oldest has waited ``flush_interval`` seconds (checked on every
+    queue call and by flush_if_due()), on flush(), and before any immediate
+    call or close_file(). They become durable when the file is closed;
+    close_file() refuses to close while any of them has failed.
+    """
+    
+    def __init__(self, batch_size: Optional[int] = None, flush_interval: Optional[float] = None):
         self.writer = umdf.Writer()
         self.current_file = None
+        self.batch_size = max(1, batch_size or WRITER_BATCH_SIZE)
+        self.flush_interval = WRITER_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self._queue: List[WriterOperation] = []
+        self._sequence = 0
+        # Operations that failed since the file was opened
+        self.failed_operations: List[WriterOperation] = []
+        # ModuleData written since the file was opened, by module id; the C++
+        # writer has no read path, so edit sessions read new modules here.
+        # Past PENDING_FRAME_BYTES of frame data the oldest modules keep only
+        # their metadata; their ids are in stripped_modules.
+        self.pending_modules: Dict[str, Any] = {}
+        self.stripped_modules = set()
+        # Frame bytes held by each pending module that still has them, oldest first
+        self._pending_frame_bytes: "OrderedDict[str, int]" = OrderedDict()
+        self._pending_frame_total = 0
     
     def open_file(self, filename: str, author: str, password: str = "") -> bool:
         """Open an existing UMDF file for editing"""
@@ -143,6 +711,7 @@ class UMDFWriter:
             
             if result.success:
                 self.current_file = filename
+                self._clear_pending()
                 return True
             else:
                 print(f"Failed to open file: {result.message}")
@@ -157,6 +726,7 @@ class UMDFWriter:
             result = self.writer.createNewFile(filename, author, password)
             if result.success:
                 self.current_file = filename
+                self._clear_pending()
                 return True
             else:
                 print(f"Failed to create file: {result.message}")
@@ -170,6 +740,9 @@ class UMDFWriter:
         if not self.current_file:
             raise RuntimeError("No file open. Call create_new_file() first.")
         
+        # Keep queued operations ahead of this one
+        self.flush()
+        
         try:
             result = self.writer.createNewEncounter()
             if result.has_value():
@@ -187,6 +760,9 @@ class UMDFWriter:
         if not self.current_file:
             raise RuntimeError("No file open. Call create_new_file() first.")
         
+        # Keep queued operations ahead of this one
+        self.flush()
+        
         try:
             # Convert string parent_module_id to UUID if needed
             try:
@@ -200,25 +776,7 @@ class UMDFWriter:
             
             # Create a ModuleData object
             try:
-                module_data = umdf.ModuleData()
-                
-                # Set the metadata and data
-                if hasattr(module_data, 'set_metadata'):
-                    module_data.set_metadata(metadata)
-                elif hasattr(module_data, 'setMetadata'):
-                    module_data.setMetadata(metadata)
-                
-                if hasattr(module_data, 'set_tabular_data'):
-                    module_data.set_tabular_data(data)
-                elif hasattr(module_data, 'setTabularData'):
-                    module_data.setTabularData(data)
-                
-                # Set author if available
-                if author and hasattr(module_data, 'set_author'):
-                    module_data.set_author(author)
-                elif author and hasattr(module_data, 'setAuthor'):
-                    module_data.setAuthor(author)
-                    
+                module_data = tabular_module_data(metadata, data, author)
             except Exception as create_error:
                 print(f"Error creating ModuleData object: {create_error}")
                 return None
@@ -226,8 +784,7 @@ class UMDFWriter:
             result = self.writer.addVariantModule(uuid_obj, schema_path, module_data)
             
             if result.has_value():
-                module_id = result.value()
-                return str(module_id)
+                return self._remember_module(result.value(), module_data)
             else:
                 print(f"Failed to add variant module: {result.error()}")
                 return None
@@ -240,6 +797,9 @@ class UMDFWriter:
         if not self.current_file:
             raise RuntimeError("No file open. Call create_new_file() first.")
         
+        # Keep queued operations ahead of this one
+        self.flush()
+        
         try:
             # Convert string encounter_id to UUID if needed
             try:
@@ -299,8 +859,7 @@ class UMDFWriter:
             result = self.writer.addModuleToEncounter(uuid_obj, schema_path, module_data)
             
             if result.has_value():
-                module_id = result.value()
-                return str(module_id)
+                return self._remember_module(result.value(), module_data)
             else:
                 print(f"Failed to add module: {result.error()}")
                 return None
@@ -308,8 +867,141 @@ class UMDFWriter:
             print(f"Error adding module to encounter: {e}")
             return None
     
+    def add_module_data(self, method: str, target, schema_path: str, module_data):
+        """Write a prebuilt ModuleData with addModuleToEncounter, addVariantModule or addAnnotation.
+        
+        ``target`` is the encounter or parent module UUID. Returns the C++
+        result unchanged; a new module is also kept in pending_modules.
+        """
+        if not self.current_file:
+            raise RuntimeError("No file open. Call create_new_file() first.")
+        
+        # Keep queued operations ahead of this one
+        self.flush()
+        
+        result = getattr(self.writer, method)(target, schema_path, module_data)
+        if result.has_value():
+            self._remember_module(result.value(), module_data)
+        return result
+    
+    def _remember_module(self, module_id, module_data) -> str:
+        module_id = module_id.toString() if hasattr(module_id, 'toString') else str(module_id)
+        if hasattr(module_data, 'get_metadata'):
+            self.pending_modules[module_id] = module_data
+            size = sum(len(frame_buffer(frame)) for frame in _frames(module_data))
+            if size:
+                self._pending_frame_bytes[module_id] = size
+                self._pending_frame_total += size
+            while self._pending_frame_total > PENDING_FRAME_BYTES and self._pending_frame_bytes:
+                stripped_id, stripped_size = self._pending_frame_bytes.popitem(last=False)
+                self._pending_frame_total -= stripped_size
+                self.pending_modules[stripped_id] = _without_frame_payloads(self.pending_modules[stripped_id])
+                self.stripped_modules.add(stripped_id)
+        return module_id
+    
+    def _clear_pending(self) -> None:
+        self.pending_modules = {}
+        self.stripped_modules = set()
+        self._pending_frame_bytes = OrderedDict()
+        self._pending_frame_total = 0
+    
+    def queue_new_encounter(self) -> WriterOperation:
+        """Queue the creation of an encounter; pass the operation as encounter_id to add modules to it"""
+        return self._enqueue("create_encounter", {})
+    
+    def queue_module_to_encounter(self, encounter_id, schema_path: str, metadata: dict, data: list, author: str = None) -> WriterOperation:
+        """Queue adding a tabular module to an encounter (an id or a queued encounter operation)"""
+        return self._enqueue("add_module_to_encounter", {
+            "encounter_id": encounter_id, "schema_path": schema_path,
+            "metadata": metadata, "data": data, "author": author
+        })
+    
+    def queue_variant_module(self, parent_module_id, schema_path: str, metadata: dict, data: list, author: str = None) -> WriterOperation:
+        """Queue adding a variant of a module (an id or a queued module operation)"""
+        return self._enqueue("add_variant_module", {
+            "parent_module_id": parent_module_id, "schema_path": schema_path,
+            "metadata": metadata, "data": data, "author": author
+        })
+    
+    @property
+    def pending_operations(self) -> int:
+        return len(self._queue)
+    
+    def flush_if_due(self) -> List[WriterOperation]:
+        """Flush if the batch is full or its oldest operation has waited flush_interval seconds."""
+        if not self._queue:
+            return []
+        if len(self._queue) >= self.batch_size or time.monotonic() - self._queue[0].queued_at >= self.flush_interval:
+            return self.flush()
+        return []
+    
+    def flush(self) -> List[WriterOperation]:
+        """Apply every queued operation to the C++ writer, in order.
+        
+        A failing operation does not stop the batch: it is marked failed with
+        the error, and so is every later operation that refers to it. Returns
+        the flushed operations.
+        """
+        if not self._queue:
+            return []
+        batch, self._queue = self._queue, []
+        
+        for operation in batch:
+            try:
+                operation.result = self._apply(operation)
+                operation.status = WriterOperation.APPLIED
+            except Exception as e:
+                operation.status = WriterOperation.FAILED
+                operation.error = str(e)
+                self.failed_operations.append(operation)
+                print(f"Failed to apply queued {operation.kind} #{operation.sequence}: {e}")
+        
+        return batch
+    
+    def _enqueue(self, kind: str, args: Dict[str, Any]) -> WriterOperation:
+        if not self.current_file:
+            raise RuntimeError("No file open. Call create_new_file() first.")
+        
+        self._sequence += 1
+        operation = WriterOperation(self._sequence, kind, args)
+        self._queue.append(operation)
+        self.flush_if_due()
+        return operation
+    
+    def _resolve_id(self, value):
+        if isinstance(value, WriterOperation):
+            if value.status != WriterOperation.APPLIED:
+                raise RuntimeError(f"depends on {value.kind} #{value.sequence}, which {value.status}")
+            value = value.result
+        return _as_uuid(value)
+    
+    def _apply(self, operation: WriterOperation) -> str:
+        args = operation.args
+        if operation.kind == "create_encounter":
+            result = self.writer.createNewEncounter()
+            if not result.has_value():
+                raise RuntimeError(result.error())
+            return str(result.value())
+        
+        module_data = tabular_module_data(args["metadata"], args["data"], args["author"])
+        if operation.kind == "add_module_to_encounter":
+            result = self.writer.addModuleToEncounter(self._resolve_id(args["encounter_id"]), args["schema_path"], module_data)
+        else:
+            result = self.writer.addVariantModule(self._resolve_id(args["parent_module_id"]), args["schema_path"], module_data)
+        
+        if not result.has_value():
+            raise RuntimeError(result.error())
+        return self._remember_module(result.value(), module_data)
+    
+    def _discard_queue(self) -> None:
+        for operation in self._queue:
+            operation.status = WriterOperation.DISCARDED
+        self._queue = []
+    
     def cancel_then_close(self) -> bool:
         """Cancel the current operation and close the file without saving changes"""
+        # Queued operations were never applied; there is nothing to undo
+        self._discard_queue()
         try:
             # Debug: check what methods are available on the writer
             print(f"=== DEBUG: Available methods on writer: {dir(self.writer)}")
@@ -327,10 +1019,12 @@ class UMDFWriter:
             else:
                 print("=== DEBUG: No cancel method found on writer")
                 # Just close the file without canceling
-                return self.close_file()
+                return self.close_file(discard_failed=True)
             
             if result.success:
                 self.current_file = None
+                self.failed_operations = []
+                self._clear_pending()
                 return True
             else:
                 print(f"Failed to cancel and close file: {result.message}")
@@ -343,12 +1037,22 @@ class UMDFWriter:
         """Alias for cancel_then_close() to match backend expectations"""
         return self.cancel_then_close()
 
-    def close_file(self) -> bool:
-        """Close and finalize the current file"""
+    def close_file(self, discard_failed: bool = False) -> bool:
+        """Close and finalize the current file, applying any queued operations first
+        
+        Raises FailedOperationsError, leaving the file open, if any queued
+        operation failed since the file was opened, unless discard_failed is
+        set to save the file without them.
+        """
+        self.flush()
+        if self.failed_operations and not discard_failed:
+            raise FailedOperationsError(self.failed_operations)
         try:
             result = self.writer.closeFile()
             if result.success:
                 self.current_file = None
+                self.failed_operations = []
+                self._clear_pending()
                 return True
             else:
                 print(f"Failed to close file: {result.message}")
@@ -358,6 +1062,189 @@ class UMDFWriter:
             return False
     
 
+class _PendingModuleResult:
+    """Same interface as the C++ ExpectedModuleData, for a module written in the edit session."""
+    
+    def __init__(self, module_data):
+        self._module_data = module_data
+    
+    def has_value(self) -> bool:
+        return True
+    
+    def value(self):
+        return self._module_data
+    
+    def error(self) -> str:
+        return ""
+
+class EditSessionReader:
+    """Reads module data while a file is open in a UMDFWriter.
+    
+    Modules that existed when editing started are read from ``reader``,
+    the reader the file was viewed with, which stays open on it during the
+    edit session. Modules added during the session come from the writer's
+    pending_modules, so the file is never opened a second time; frames of
+    those in the writer's stripped_modules have no data until the file is
+    saved. Calls must be serialised with the reader's other calls
+    (AsyncUMDFReader.run).
+    """
+    
+    def __init__(self, writer: UMDFWriter, reader: UMDFReader):
+        self.writer = writer
+        self.reader = reader
+    
+    @property
+    def current_file(self) -> Optional[str]:
+        return self.reader.current_file
+    
+    def open(self, file_path: str, password: str = "") -> bool:
+        """Make sure the reader is on file_path; it is only (re)opened if it is not."""
+        if self.reader.current_file == file_path:
+            return True
+        return self.reader.read_file(file_path, password)
+    
+    def get_module_data(self, module_id: str):
+        """The module as the C++ reader returns it (an ExpectedModuleData-like result)."""
+        module_data = self.writer.pending_modules.get(module_id)
+        if module_data is not None:
+            return _PendingModuleResult(module_data)
+        if not self.reader.current_file:
+            raise RuntimeError("No edit session open")
+        return self.reader.reader.getModuleData(module_id)
+
+class AsyncUMDFBridge:
+    """Runs blocking C++ reader/writer calls on a dedicated thread pool.
+    
+    The event loop never waits on the C++ library: every call is awaited
+    from a worker thread. A reader or writer object holds one open file and
+    is not thread-safe, so calls on the same object are serialised with a
+    per-object lock while calls on different objects (another file, or the
+    pooled readers) run in parallel. Pool size comes from
+    ``UMDF_BRIDGE_WORKERS`` (default 4).
+    """
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or int(os.getenv("UMDF_BRIDGE_WORKERS", "4"))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="umdf-bridge")
+        self._locks: Dict[int, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+    
+    def _lock_for(self, target) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(id(target), threading.Lock())
+    
+    def _call_serialized(self, target, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        with self._lock_for(target):
+            return fn(*args, **kwargs)
+    
+    async def run(self, target, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) off the event loop, serialised with other calls on target."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(self._call_serialized, target, fn, args, kwargs)
+        )
+    
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
+
+class AsyncUMDFReader:
+    """Async facade over a UMDFReader; all calls go through an AsyncUMDFBridge."""
+    
+    def __init__(self, reader: UMDFReader, bridge: AsyncUMDFBridge):
+        self.sync = reader
+        self.bridge = bridge
+    
+    @property
+    def current_file(self) -> Optional[str]:
+        return self.sync.current_file
+    
+    async def call(self, fn: Callable, *args) -> Any:
+        """Run fn(raw C++ reader, *args) serialised with the reader's other calls."""
+        return await self.bridge.run(self.sync, fn, self.sync.reader, *args)
+    
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run any callable that uses this reader (e.g. an importer method) serialised with its other calls."""
+        return await self.bridge.run(self.sync, fn, *args, **kwargs)
+    
+    async def read_file(self, filepath: str, password: str = "") -> bool:
+        return await self.run(self.sync.read_file, filepath, password)
+    
+    async def get_file_info(self) -> Dict[str, Any]:
+        return await self.run(self.sync.get_file_info)
+    
+    async def get_audit_trail(self, module_id: str) -> List[Dict[str, Any]]:
+        return await self.run(self.sync.get_audit_trail, module_id)
+    
+    async def get_audit_page(self, module_id: str, offset: int = 0, limit: int = AUDIT_PAGE_SIZE) -> Dict[str, Any]:
+        return await self.run(self.sync.get_audit_page, module_id, offset, limit)
+    
+    async def get_audit_versions(self, module_id: str, indices: List[int]) -> Dict[int, Dict[str, Any]]:
+        return await self.run(self.sync.get_audit_versions, module_id, indices)
+    
+    async def list_modules(self) -> List[Dict[str, Any]]:
+        return await self.run(self.sync.list_modules)
+    
+    async def close_file(self) -> bool:
+        return await self.run(self.sync.close_file)
+
+class AsyncUMDFWriter:
+    """Async facade over a UMDFWriter; all calls go through an AsyncUMDFBridge."""
+    
+    def __init__(self, writer: UMDFWriter, bridge: AsyncUMDFBridge):
+        self.sync = writer
+        self.bridge = bridge
+    
+    @property
+    def current_file(self) -> Optional[str]:
+        return self.sync.current_file
+    
+    async def call(self, fn: Callable, *args) -> Any:
+        """Run fn(raw C++ writer, *args) serialised with the writer's other calls."""
+        return await self.bridge.run(self.sync, fn, self.sync.writer, *args)
+    
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run any callable that uses this writer serialised with its other calls."""
+        return await self.bridge.run(self.sync, fn, *args, **kwargs)
+    
+    async def open_file(self, filename: str, author: str, password: str = "") -> bool:
+        return await self.run(self.sync.open_file, filename, author, password)
+    
+    async def create_new_file(self, filename: str, author: str, password: str = "") -> bool:
+        return await self.run(self.sync.create_new_file, filename, author, password)
+    
+    async def create_new_encounter(self) -> Optional[str]:
+        return await self.run(self.sync.create_new_encounter)
+    
+    async def add_module_to_encounter(self, encounter_id: str, schema_path: str, metadata: dict, data: list, author: str = None) -> Optional[str]:
+        return await self.run(self.sync.add_module_to_encounter, encounter_id, schema_path, metadata, data, author)
+    
+    async def add_variant_module(self, parent_module_id: str, schema_path: str, metadata: dict, data: list, author: str = None) -> Optional[str]:
+        return await self.run(self.sync.add_variant_module, parent_module_id, schema_path, metadata, data, author)
+    
+    async def add_module_data(self, method: str, target, schema_path: str, module_data):
+        return await self.run(self.sync.add_module_data, method, target, schema_path, module_data)
+    
+    async def queue_new_encounter(self) -> WriterOperation:
+        return await self.run(self.sync.queue_new_encounter)
+    
+    async def queue_module_to_encounter(self, encounter_id, schema_path: str, metadata: dict, data: list, author: str = None) -> WriterOperation:
+        return await self.run(self.sync.queue_module_to_encounter, encounter_id, schema_path, metadata, data, author)
+    
+    async def queue_variant_module(self, parent_module_id, schema_path: str, metadata: dict, data: list, author: str = None) -> WriterOperation:
+        return await self.run(self.sync.queue_variant_module, parent_module_id, schema_path, metadata, data, author)
+    
+    async def flush(self) -> List[WriterOperation]:
+        return await self.run(self.sync.flush)
+    
+    async def flush_if_due(self) -> List[WriterOperation]:
+        return await self.run(self.sync.flush_if_due)
+    
+    async def cancel_and_close(self) -> bool:
+        return await self.run(self.sync.cancel_and_close)
+    
+    async def close_file(self, discard_failed: bool = False) -> bool:
+        return await self.run(self.sync.close_file, discard_failed)
 
 # Convenience functions for backward compatibility
 def read_umdf_file(filepath: str, password: str = "") -> Dict[str, Any]:
@@ -378,9 +1265,99 @@ def get_module_data(filepath: str, module_id: str, password: str = "") -> Option
         return module_data
     return None
 
+# Whether ModuleData.set_binary_data accepts buffers (memoryview, NumPy arrays)
+# directly; detected on first use, older bindings only take bytes
+_binary_buffers_supported = None
+
+def frame_buffer(frame_module_data) -> memoryview:
+    """Binary data of a frame ModuleData as a read-only memoryview.
+    
+    Bindings that expose ``get_data_view`` hand out a view of the frame's
+    own buffer (no copy); otherwise the bytes from ``get_data`` are wrapped.
+    """
+    get_view = getattr(frame_module_data, 'get_data_view', None)
+    data = get_view() if get_view else frame_module_data.get_data()
+    return memoryview(data if data is not None else b'')
+
+def set_frame_buffer(frame_module_data, data) -> None:
+    """Set a frame's binary data from bytes or any buffer (memoryview, NumPy array).
+    
+    Buffers are passed to the binding as-is when it supports the buffer
+    protocol, so no intermediate bytes object is built.
+    """
+    global _binary_buffers_supported
+    if isinstance(data, bytes):
+        frame_module_data.set_binary_data(data)
+        return
+    
+    if isinstance(data, np.ndarray) and not data.flags.c_contiguous:
+        data = np.ascontiguousarray(data)
+    view = memoryview(data).cast('B')
+    
+    if _binary_buffers_supported is not False:
+        try:
+            frame_module_data.set_binary_data(view)
+            _binary_buffers_supported = True
+            return
+        except TypeError:
+            _binary_buffers_supported = False
+    frame_module_data.set_binary_data(view.tobytes())
+
+def build_image_module_data(metadata: dict, frames: list, unwrap_metadata: bool = False):
+    """Build an image ModuleData from converter output.
+    
+    ``frames`` is the DICOM converter's frame list: each frame is a dict whose
+    ``pixelData`` is a 2D list of 16-bit values and whose other fields become
+    the frame metadata. With ``unwrap_metadata`` the frame's inner
+    ``metadata`` dict is used instead, when present. Frames are attached to
+    the returned ModuleData as nested data.
+    """
+    frame_module_data_list = []
+    for frame in frames:
+        if unwrap_metadata and isinstance(frame.get('metadata'), dict):
+            frame_metadata = frame['metadata']
+        else:
+            frame_metadata = {k: v for k, v in frame.items() if k != 'pixelData'}
+        pixel_data = frame.get('pixelData', [])
+        
+        frame_module_data = umdf.ModuleData()
+        frame_module_data.set_metadata(frame_metadata)
+        if pixel_data:
+            # Little-endian uint16, same layout as struct.pack('<...H')
+            set_frame_buffer(frame_module_data, np.asarray(pixel_data, dtype='<u2'))
+        frame_module_data_list.append(frame_module_data)
+    
+    module_data = umdf.ModuleData()
+    module_data.set_metadata(metadata)
+    if frame_module_data_list:
+        module_data.set_nested_data(frame_module_data_list)
+    return module_data
+
+def build_tiled_image_module_data(metadata: dict, tiles):
+    """Build an image ModuleData whose frames are tiles of an image pyramid.
+    
+    ``tiles`` yields (tile metadata, encoded tile bytes) pairs, e.g. one part
+    from ``app.importers.tiled_image.iter_tile_parts``. Each tile becomes one
+    frame; its metadata records the level, column and row it covers.
+    """
+    frame_module_data_list = []
+    for tile_metadata, tile_bytes in tiles:
+        frame_module_data = umdf.ModuleData()
+        frame_module_data.set_metadata(tile_metadata)
+        set_frame_buffer(frame_module_data, tile_bytes)
+        frame_module_data_list.append(frame_module_data)
+    
+    module_data = umdf.ModuleData()
+    module_data.set_metadata(metadata)
+    if frame_module_data_list:
+        module_data.set_nested_data(frame_module_data_list)
+    return module_data
+
 # Export the main classes
 __all__ = [
-    'UMDFReader', 'UMDFWriter', 'read_umdf_file', 'get_module_data',
+    'UMDFReader', 'UMDFReaderPool', 'UMDFWriter', 'WriterOperation', 'EditSessionReader', 'tabular_module_data', 'AsyncUMDFBridge', 'AsyncUMDFReader', 'AsyncUMDFWriter', 'read_umdf_file', 'get_module_data', 'build_image_module_data',
+    'build_tiled_image_module_data', 'frame_buffer', 'set_frame_buffer',
+    'read_frames', 'read_modules_data', 'read_audit_versions', 'module_directory', 'plain_json', 'frame_views', 'MappedFrameStore',
     'Reader', 'Writer', 'ModuleData', 'UUID', 'Result'
 ]
 
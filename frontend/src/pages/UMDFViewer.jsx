@@ -4,6 +4,39 @@ import ProcessingModal from '../components/ProcessingModal';
 import CustomSlider from '../components/CustomSlider';
 import './UMDFViewer.css';
 
+// Schemas of the open file, fetched once per file as a single bundle
+let schemaBundlePromise = null;
+
+const loadSchemaBundle = () => {
+  if (!schemaBundlePromise) {
+    schemaBundlePromise = fetch('/api/schemas/bundle')
+      .then(response => (response.ok ? response.json() : null))
+      .catch(() => null);
+  }
+  return schemaBundlePromise;
+};
+
+// Call when the open file changes so the next schema lookup fetches its bundle
+const resetSchemaBundle = () => {
+  schemaBundlePromise = null;
+};
+
+// Parsed schema for a path relative to the schemas folder, from the bundle
+// when it has it, otherwise fetched on its own
+const fetchSchemaJson = async (schemaPath) => {
+  const bundle = await loadSchemaBundle();
+  if (bundle && bundle.schemas && bundle.schemas[schemaPath]) {
+    return bundle.schemas[schemaPath];
+  }
+  
+  const response = await fetch(`/schemas/${schemaPath}`);
+  if (!response.ok) {
+    throw new Error(`Failed to fetch schema: ${response.status} ${response.statusText}`);
+  }
+  const result = await response.json();
+  return JSON.parse(result.content);
+};
+
 // Helper function to resolve $ref references in schemas
 const resolveSchemaReference = async (refPath, baseSchemaPath) => {
   try {
@@ -26,13 +59,7 @@ const resolveSchemaReference = async (refPath, baseSchemaPath) => {
     console.log('🔗 Resolved path:', resolvedPath);
     
     // Fetch the referenced schema - the backend expects paths relative to current directory
-    const response = await fetch(`/schemas/${resolvedPath}`);
-    if (!response.ok) {
-      throw new Error(`Failed to fetch referenced schema: ${response.status} ${response.statusText}`);
-    }
-    
-    const result = await response.json();
-    const referencedSchema = JSON.parse(result.content);
+    const referencedSchema = await fetchSchemaJson(resolvedPath);
     console.log('🔗 Successfully loaded referenced schema:', referencedSchema.title || resolvedPath);
     
     return referencedSchema;
@@ -52,15 +79,7 @@ const parseSchemaForForm = async (schemaPath) => {
     
     console.log('🔍 Fetching schema from backend:', schemaPathForBackend);
     
-    const response = await fetch(`/schemas/${schemaPathForBackend}`);
-    if (!response.ok) {
-      throw new Error(`Failed to fetch schema: ${response.status} ${response.statusText}`);
-    }
-    
-    const result = await response.json();
-    console.log('🔍 Raw response from backend:', result);
-    
-    const schema = JSON.parse(result.content);
+    const schema = await fetchSchemaJson(schemaPathForBackend);
     console.log('🔍 Parsed schema object:', schema);
     
     // Parse the actual schema structure to create form fields
@@ -2004,6 +2023,7 @@ const UMDFViewer = () => {
       }
       
       // Send to backend for C++ processing
+      resetSchemaBundle();
       const response = await fetch('/api/upload/umdf', {
         method: 'POST',
         body: formData
@@ -3807,6 +3827,7 @@ const UMDFViewer = () => {
       
       // First, close the current file in the backend
       console.log('🔄 Change File: Closing current file in backend...');
+      resetSchemaBundle();
       const closeResponse = await fetch('/api/close', {
         method: 'POST',
         headers: {
@@ -3927,6 +3948,7 @@ const UMDFViewer = () => {
       setIsProcessing(true);
       
       // Call the backend to save the file and close the writer
+      resetSchemaBundle();
       const response = await fetch('/api/save-file', {
         method: 'POST',
         headers: {
@@ -5026,6 +5048,7 @@ const UMDFViewer = () => {
                               
                               // First, close the current file in the backend to clear any cached data
                               console.log('🔄 Change User: Closing current file in backend...');
+                              resetSchemaBundle();
                               const closeResponse = await fetch('/api/close', {
                                 method: 'POST',
                                 headers: {
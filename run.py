@@ -22,6 +22,8 @@ def main():
     print(f"Server: http://{host}:{port}")
     print(f"API Docs: http://{host}:{port}/docs")
     print(f"Reload: False")  # Changed from True to False
+    if os.getenv("UMDF_WATCH_DIRS"):
+        print(f"DICOM watch folders: {os.getenv('UMDF_WATCH_DIRS')} -> {os.getenv('UMDF_WATCH_TARGET', '(no target set)')}")
     print("-" * 50)
     
     # Start the server